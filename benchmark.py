@@ -0,0 +1,623 @@
+#!/usr/bin/env python3
+"""
+Бенчмарки производительности: генерация карт, расстановка врагов, ходы, бой, отрисовка,
+автоматическое исследование и автосохранение.
+
+Результаты (время одной операции в секундах) можно сохранить в JSON и сравнить
+с сохраненной ранее базой: замедление больше допуска считается регрессией.
+
+Запуск: python benchmark.py [--sections automaton,regions,...] [--sizes 64,256,1024,2048] [--seed 42]
+                            [--quick] [--json results.json] [--compare baseline.json --tolerance 0.2]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+
+import map_generator
+from map_generator import apply_cellular_automaton, connect_regions, is_connected, FloorConnectivity
+from map_generator import generate_standard_map, generate_random_map
+from map_batch import generate_maps
+from map_cache import MapCache, GENERATORS
+from tiles import TileGrid, TILE_FLOOR, TILE_WALL
+from combat import process_combat
+from engine import GameConfig, new_game, MAP_STANDARD, MAP_RANDOM, MAP_WORLD
+from entities import Player, Enemy, ENEMY_GOBLIN, ENEMY_ORC, ENEMY_TROLL, ENEMY_SKELETON
+from entity_store import EntityStore, COLUMNS
+from event_log import EventLog
+from game import Game
+from renderer import FrameRenderer, MapLayer
+import savegame
+from savegame import Autosave, load_game
+
+# Формат файла результатов
+RESULTS_FORMAT_VERSION = 1
+
+# Допуск замедления относительно базы по умолчанию (0.2 - на 20%)
+DEFAULT_TOLERANCE = 0.2
+
+# Повторы замера (берется лучшее время): не меньше REPEAT запусков и не меньше
+# REPEAT_MIN_TIME секунд, чтобы короткие замеры не попали целиком в паузу системы,
+# но не больше REPEAT_MAX_RUNS запусков и не дольше REPEAT_BUDGET секунд
+REPEAT = 5
+REPEAT_MIN_TIME = 0.5
+REPEAT_MAX_RUNS = 1000
+REPEAT_BUDGET = 3.0
+
+
+def reference_automaton(walls, width, height, passes=3):
+    """
+    Исходная реализация клеточного автомата с вложенными циклами.
+    
+    Используется только для проверки, что новые реализации дают тот же результат.
+    """
+    game_map = [['#' if walls[y * width + x] else ' ' for x in range(width)] for y in range(height)]
+    
+    for _ in range(passes):
+        new_map = [row[:] for row in game_map]
+        
+        for y in range(1, height - 1):
+            for x in range(1, width - 1):
+                wall_count = 0
+                for ny in range(y - 1, y + 2):
+                    for nx in range(x - 1, x + 2):
+                        if 0 <= ny < height and 0 <= nx < width and game_map[ny][nx] == '#':
+                            wall_count += 1
+                            
+                if game_map[y][x] == '#':
+                    if wall_count < 4:
+                        new_map[y][x] = ' '
+                else:
+                    if wall_count > 5:
+                        new_map[y][x] = '#'
+                        
+        game_map = new_map
+        
+    return bytearray(1 if cell == '#' else 0 for row in game_map for cell in row)
+
+
+def random_walls(width, height, seed):
+    """Случайное начальное заполнение, как в generate_random_map."""
+    rng = random.Random(seed)
+    walls = bytearray(b'\x01') * (width * height)
+    for y in range(1, height - 1):
+        for x in range(1, width - 1):
+            if rng.random() < 0.6:
+                walls[y * width + x] = 0
+    return walls
+
+
+def timed(func, *args, **kwargs):
+    """Выполнить функцию и вернуть пару (результат, время в секундах)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def best_timed(func, *args, repeat=REPEAT, setup=None, **kwargs):
+    """
+    Результат и лучшее время из нескольких запусков функции.
+    
+    Лучшее время меньше всего искажено шумом системы. Функция запускается repeat
+    раз, а короткая - и больше, пока запуски не займут REPEAT_MIN_TIME секунд;
+    долгие замеры прекращаются раньше, если заняли больше REPEAT_BUDGET секунд.
+    
+    Args:
+        func (callable): Измеряемая функция
+        *args: Аргументы функции
+        repeat (int): Наименьшее количество запусков
+        setup (callable): Подготовка перед каждым запуском (в замер не входит)
+        **kwargs: Именованные аргументы функции
+        
+    Returns:
+        tuple: (результат последнего запуска, лучшее время в секундах)
+    """
+    best = None
+    spent = 0.0
+    runs = 0
+    while True:
+        if setup is not None:
+            setup()
+        result, elapsed = timed(func, *args, **kwargs)
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        runs += 1
+        if spent >= REPEAT_BUDGET or runs >= REPEAT_MAX_RUNS:
+            break
+        if runs >= repeat and spent >= REPEAT_MIN_TIME:
+            break
+    return result, best
+
+
+def best_of(func, repeat, *args, **kwargs):
+    """Лучшее время из repeat запусков функции (см. best_timed)."""
+    return best_timed(func, *args, repeat=repeat, **kwargs)[1]
+
+
+def bench_automaton(sizes, seed, reference_max, results):
+    """Сравнить реализации клеточного автомата на картах разного размера."""
+    print("Клеточный автомат (3 прохода), время в секундах")
+    print(f"{'размер':>11} | {'эталон':>8} | {'python':>8} | {'numpy':>8} | совпадение")
+    
+    for size in sizes:
+        walls = random_walls(size, size, seed)
+        outputs = {}
+        timings = {}
+        
+        if size <= reference_max:
+            outputs["эталон"], timings["эталон"] = timed(reference_automaton, walls, size, size)
+        outputs["python"], timings["python"] = best_timed(
+            apply_cellular_automaton, walls, size, size, use_numpy=False)
+        if map_generator.np is not None:
+            outputs["numpy"], timings["numpy"] = best_timed(
+                apply_cellular_automaton, walls, size, size, use_numpy=True)
+                
+        outputs = list(outputs.values())
+        identical = all(output == outputs[0] for output in outputs)
+        
+        def cell(name):
+            return f"{timings[name]:8.3f}" if name in timings else f"{'-':>8}"
+            
+        print(f"{size:>5}x{size:<5} | {cell('эталон')} | {cell('python')} | {cell('numpy')} | "
+              f"{'да' if identical else 'НЕТ'}")
+        for name, seconds in timings.items():
+            if name != "эталон":
+                results[f"automaton/{name}/{size}"] = seconds
+        if not identical:
+            raise SystemExit(f"Результаты реализаций различаются для {size}x{size}, seed={seed}")
+
+
+def fragmented_cave(width, height, seed):
+    """Пещера с большим числом изолированных регионов: редкое заполнение и автомат."""
+    walls = random_walls(width, height, seed)
+    rng = random.Random(seed + 1)
+    for index in range(len(walls)):
+        if rng.random() < 0.15:
+            walls[index] = 1
+    walls = apply_cellular_automaton(walls, width, height)
+    return TileGrid(width, height, cells=bytearray(TILE_WALL if cell else TILE_FLOOR for cell in walls))
+
+
+def bench_regions(sizes, seed, results):
+    """Время соединения регионов и проверка, что результат связен."""
+    print("Соединение регионов (connect_regions), время в секундах")
+    print(f"{'размер':>11} | {'регионов':>8} | {'python':>8} | {'numpy':>8} | связна | совпадение")
+    
+    for size in sizes:
+        game_map = fragmented_cave(size, size, seed)
+        regions = FloorConnectivity(game_map).components
+        outputs = {}
+        timings = {}
+        
+        numpy_module = map_generator.np
+        try:
+            map_generator.np = None
+            outputs["python"], timings["python"] = best_timed(lambda: connect_regions(game_map.copy()))
+        finally:
+            map_generator.np = numpy_module
+        if numpy_module is not None:
+            outputs["numpy"], timings["numpy"] = best_timed(lambda: connect_regions(game_map.copy()))
+            
+        outputs = list(outputs.values())
+        connected = all(is_connected(output) for output in outputs)
+        identical = all(output == outputs[0] for output in outputs)
+        numpy_time = f"{timings['numpy']:8.3f}" if "numpy" in timings else f"{'-':>8}"
+        
+        print(f"{size:>5}x{size:<5} | {regions:>8} | {timings['python']:8.3f} | {numpy_time} | "
+              f"{'да' if connected else 'НЕТ':>6} | {'да' if identical else 'НЕТ'}")
+        for name, seconds in timings.items():
+            results[f"connect_regions/{name}/{size}"] = seconds
+        if not connected or not identical:
+            raise SystemExit(f"Ошибка соединения регионов для {size}x{size}, seed={seed}")
+
+
+def bench_cache(sizes, seed, results):
+    """Сравнить генерацию карты с загрузкой той же карты из дискового кэша (mmap)."""
+    print("Кэш карт: холодная генерация против загрузки через mmap, время в секундах")
+    print(f"{'размер':>11} | {'генерация':>9} | {'загрузка':>9} | {'ускорение':>9} | совпадение")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        cache = MapCache(directory)
+        for size in sizes:
+            cold_map, cold_time = timed(cache.get_or_generate, 'random', size, size, seed)
+            warm_map, warm_time = best_timed(cache.get_or_generate, 'random', size, size, seed)
+            identical = cold_map == warm_map
+            
+            print(f"{size:>5}x{size:<5} | {cold_time:9.3f} | {warm_time:9.5f} | "
+                  f"{cold_time / max(warm_time, 1e-9):8.0f}x | {'да' if identical else 'НЕТ'}")
+            results[f"cache/load/{size}"] = warm_time
+            if not identical:
+                raise SystemExit(f"Карта из кэша отличается от сгенерированной для {size}x{size}")
+
+
+def bench_batch(size, count, seed, max_workers, results):
+    """Пропускная способность пакетной генерации на 1..N процессах."""
+    print(f"Пакетная генерация {count} карт {size}x{size}, карт в секунду")
+    print(f"{'процессов':>9} | {'время':>7} | {'карт/с':>8} | совпадение")
+    
+    specs = [('random', size, size, seed + index) for index in range(count)]
+    serial = [GENERATORS['random'](size, size, random.Random(seed + index)) for index in range(count)]
+    
+    for workers in range(1, max_workers + 1):
+        maps, elapsed = best_timed(generate_maps, specs, workers=workers)
+        identical = maps == serial
+        print(f"{workers:>9} | {elapsed:7.3f} | {count / elapsed:8.1f} | {'да' if identical else 'НЕТ'}")
+        results[f"batch/{workers}"] = elapsed / count
+        if not identical:
+            raise SystemExit(f"Пакетная генерация на {workers} процессах отличается от последовательной")
+
+
+def bench_generate(sizes, seed, results):
+    """Время генерации карт и проверки связности."""
+    print("Генерация карт и проверка связности, время в секундах")
+    print(f"{'размер':>11} | {'генерация':>9} | {'is_connected':>12}")
+    
+    standard_time = best_of(generate_standard_map, 20, rng=random.Random(seed))
+    print(f"{'стандартная':>11} | {standard_time:9.5f} | {'-':>12}")
+    results["generate/standard"] = standard_time
+    
+    for size in sizes:
+        repeat = 3 if size <= 256 else 1
+        generate_time = best_of(generate_random_map, repeat, size, size, random.Random(seed))
+        game_map = generate_random_map(size, size, random.Random(seed))
+        connected_time = best_of(is_connected, repeat, game_map)
+        print(f"{size:>5}x{size:<5} | {generate_time:9.3f} | {connected_time:12.4f}")
+        results[f"generate/random/{size}"] = generate_time
+        results[f"is_connected/{size}"] = connected_time
+
+
+def bench_spawn(size, densities, seed, results):
+    """Время расстановки врагов (spawn_enemies) при разной плотности."""
+    print(f"Расстановка врагов на случайной карте {size}x{size}, время в секундах")
+    print(f"{'плотность':>9} | {'врагов':>7} | {'время':>8}")
+    
+    engine = new_game(GameConfig(MAP_RANDOM, size, size), seed=seed)
+    floor = engine.current_map.count(TILE_FLOOR)
+    
+    def reset():
+        # Новое хранилище и индексы: каждый запуск расставляет врагов на пустой карте
+        engine.enemies = EntityStore()
+        engine.attach_map(engine.current_map)
+        
+    for density in densities:
+        count = int(floor * density)
+        _, elapsed = best_timed(engine.spawn_enemies, count, setup=reset)
+        print(f"{density:>9.3f} | {count:>7} | {elapsed:8.4f}")
+        results[f"spawn/{density}"] = elapsed
+
+
+def bench_turns(counts, seed, results):
+    """Время хода врагов (complete_turn) в зависимости от их количества."""
+    # Карта с запасом: около шести клеток пола на врага
+    side = max(64, int((max(counts) * 8) ** 0.5))
+    print(f"Ход врагов (complete_turn) на случайной карте {side}x{side}, время хода в секундах")
+    print(f"{'врагов':>7} | {'ходов':>5} | {'время хода':>10}")
+    
+    rng = random.Random(seed)
+    game_map = generate_random_map(side, side, random.Random(seed))
+    width = game_map.width
+    floor_cells = [(index % width, index // width)
+                   for index, tile in enumerate(game_map.cells) if tile == TILE_FLOOR]
+    enemy_types = (ENEMY_GOBLIN, ENEMY_ORC, ENEMY_TROLL, ENEMY_SKELETON)
+    
+    engine = new_game(GameConfig(MAP_STANDARD), seed=seed)
+    engine.attach_map(game_map)
+    player_x, player_y = floor_cells[len(floor_cells) // 2]
+    engine.player.position = (player_x, player_y)
+    engine.player.hp = 10 ** 9  # Игрок не должен погибнуть во время замера
+    
+    for count in counts:
+        positions = [cell for cell in rng.sample(floor_cells, count + 1) if cell != (player_x, player_y)][:count]
+        engine.enemies = EntityStore()
+        engine.enemies.add_entities(Enemy.spawn_many(rng.choices(enemy_types, k=count), positions, rng=rng))
+        turns = max(3, min(50, 20000 // count))
+        _, elapsed = best_timed(lambda: [engine.complete_turn() for _ in range(turns)])
+        print(f"{count:>7} | {turns:>5} | {elapsed / turns:10.5f}")
+        results[f"complete_turn/{count}"] = elapsed / turns
+
+
+def bench_combat(count, seed, results):
+    """Пропускная способность process_combat (с журналом событий и без)."""
+    print(f"Бой (process_combat), {count} ударов")
+    print(f"{'журнал':>6} | {'время удара':>11} | {'ударов/с':>9}")
+    
+    rng = random.Random(seed)
+    player = Player("Игрок", "Разбойник", 0, 0)
+    enemy = Enemy("Орк", 1, 0, rng=rng)
+    
+    def fight(log):
+        for _ in range(count):
+            enemy.hp = enemy.max_hp
+            player.hp = player.max_hp
+            process_combat(player, enemy, rng=rng, log=log)
+            process_combat(enemy, player, rng=rng, log=log)
+            
+    for name, log in (("нет", None), ("да", EventLog())):
+        _, elapsed = best_timed(fight, log)
+        per_hit = elapsed / (2 * count)
+        print(f"{name:>6} | {per_hit:11.7f} | {1 / per_hit:9.0f}")
+        results[f"combat/{'log' if log is not None else 'no_log'}"] = per_hit
+
+
+class _TerminalBuffer(io.StringIO):
+    """Вывод в память, который рендерер принимает за терминал."""
+    
+    def isatty(self):
+        return True
+
+
+def bench_render(seed, results):
+    """Время построения и вывода кадра (render) для разных карт."""
+    print("Отрисовка кадра (render), время в секундах")
+    print(f"{'карта':>11} | {'полный':>8} | {'разность':>8} | {'байт/кадр':>9}")
+    
+    configs = {
+        "standard": GameConfig(MAP_STANDARD),
+        "random": GameConfig(MAP_RANDOM, 50, 50),
+        "world": GameConfig(MAP_WORLD),
+    }
+    for name, config in configs.items():
+        game = Game(seed=seed)
+        game.engine = new_game(config, seed=seed)
+        game.explored = bytearray(game.engine.map_width * game.engine.map_height)
+        
+        def reset():
+            # Без кэша слоя карты и прошлого кадра: каждый запуск строит кадр целиком
+            game.renderer = FrameRenderer()
+            game.map_layer = MapLayer()
+            
+        # Кадр выводится в память: измеряется построение кадра, а не скорость терминала
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, full_time = best_timed(game.render, repeat=20, setup=reset)
+            
+        # Вывод в терминал: после каждого хода выводятся только изменения кадра.
+        # Одна и та же последовательность ходов повторяется с начала партии, берется
+        # лучшая по суммарному времени отрисовки
+        frames = 50
+        diff_time = None
+        for _ in range(REPEAT):
+            reset()
+            game.engine = new_game(config, seed=seed)
+            game.explored = bytearray(game.engine.map_width * game.engine.map_height)
+            terminal = _TerminalBuffer()
+            game.renderer.stream = terminal
+            game.renderer.screen_lines = 1000  # Кадр целиком помещается на экран
+            game.render()
+            rng = random.Random(seed)
+            elapsed = 0.0
+            written = 0
+            for _ in range(frames):
+                game.engine.step(rng.choice("wasd"))
+                terminal.seek(0)
+                terminal.truncate()
+                elapsed += timed(game.render)[1]
+                written += len(terminal.getvalue().encode('utf-8'))
+            diff_time = elapsed / frames if diff_time is None else min(diff_time, elapsed / frames)
+        print(f"{name:>11} | {full_time:8.5f} | {diff_time:8.5f} | {written // frames:>9}")
+        results[f"render/{name}"] = full_time
+        results[f"render_diff/{name}"] = diff_time
+
+
+def bench_explore(turns, seed, results):
+    """Сквозная скорость ходов при автоматическом исследовании (ход, поле зрения, поиск пути)."""
+    print(f"Автоматическое исследование (explore) без отрисовки, {turns} ходов")
+    print(f"{'карта':>11} | {'ходов':>5} | {'исследовано':>11} | {'время хода':>10} | {'ходов/с':>7}")
+    
+    configs = {
+        "random": GameConfig(MAP_RANDOM, 256, 256),
+        "world": GameConfig(MAP_WORLD),
+    }
+    for name, config in configs.items():
+        game = Game(seed=seed)
+        
+        def reset():
+            # Каждый запуск начинает новую партию с тем же зерном
+            game.engine = new_game(config, seed=seed)
+            game.explored = bytearray(game.engine.map_width * game.engine.map_height)
+            game.engine.player.hp = 10 ** 9  # Игрок не должен погибнуть во время замера
+            
+        def play():
+            # Исследование останавливается у каждого замеченного врага: игрок идет к нему и бьет
+            engine = game.engine
+            while engine.running and engine.turn < turns:
+                start_turn = engine.turn
+                game.perform_action('explore')
+                enemies = engine.visible_enemies()
+                if enemies:
+                    game.perform_action(('travel', enemies[0].x, enemies[0].y))
+                if engine.turn == start_turn:
+                    break  # Исследовать больше нечего
+                    
+        _, elapsed = best_timed(play, setup=reset)
+        engine = game.engine
+        per_turn = elapsed / max(1, engine.turn)
+        print(f"{name:>11} | {engine.turn:>5} | {sum(game.explored):>11} | {per_turn:10.6f} | {1 / per_turn:7.0f}")
+        results[f"explore/{name}"] = per_turn
+
+
+def _save_round_trip(config, seed, directory, use_numpy):
+    """
+    Совпадают ли враги после загрузки с врагами партии, если между автосохранениями
+    один враг добавлен, а другой удален (на его место переносится последний).
+    """
+    saved_np = savegame.np
+    if not use_numpy:
+        savegame.np = None
+    try:
+        engine = new_game(config, seed=seed)
+        path = os.path.join(directory, f"round_trip_{int(use_numpy)}.sav")
+        autosave = Autosave(engine, path)
+        enemies = engine.enemies
+        x, y = enemies.x[0], enemies.y[0]
+        enemies.remove(enemies.handle(enemies.ids[0]))
+        enemies.add("Орк", x, y, 10, 10, 0, 0, 3, 1, ENEMY_ORC)
+        enemies.remove(enemies.handle(enemies.ids[0]))
+        autosave.close()
+        loaded = load_game(path).enemies
+    finally:
+        savegame.np = saved_np
+    return loaded.ids == enemies.ids and all(getattr(loaded, column) == getattr(enemies, column)
+                                             for column in COLUMNS)
+
+
+def bench_save(turns, seed, results):
+    """Время записи автосохранения (журнал изменений) после хода."""
+    print(f"Автосохранение (Autosave.save) после хода, {turns} ходов")
+    print(f"{'карта':>11} | {'врагов':>7} | {'время':>8} | {'байт/ход':>8}")
+    
+    configs = {
+        "random": GameConfig(MAP_RANDOM, 256, 256),
+        "world": GameConfig(MAP_WORLD),
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, config in configs.items():
+            # Удаление переставляет врагов, а добавление дописывает новых: загрузка должна
+            # восстановить их одинаково с NumPy и без него
+            for use_numpy in (True, False) if savegame.np is not None else (False,):
+                if not _save_round_trip(config, seed, directory, use_numpy):
+                    raise SystemExit(f"Загруженные враги отличаются от сохраненных для {name} "
+                                     f"({'NumPy' if use_numpy else 'без NumPy'})")
+                                     
+            engine = new_game(config, seed=seed)
+            engine.player.hp = 10 ** 9  # Игрок не должен погибнуть во время замера
+            autosave = Autosave(engine, os.path.join(directory, f"{name}.sav"))
+            rng = random.Random(seed)
+            # Измеряется только запись: ходы между автосохранениями в замер не входят
+            elapsed = None
+            for _ in range(REPEAT):
+                save_time = 0.0
+                written = 0
+                for _ in range(turns):
+                    engine.step(rng.choice("wasd"))
+                    size, save_elapsed = timed(autosave.save)
+                    save_time += save_elapsed
+                    written += size
+                elapsed = save_time if elapsed is None else min(elapsed, save_time)
+            autosave.close()
+            print(f"{name:>11} | {len(engine.enemies):>7} | {elapsed / turns:8.6f} | {written // turns:>8}")
+            results[f"save/{name}"] = elapsed / turns
+
+
+def write_results(path, results, seed):
+    """Сохранить результаты в JSON вместе с описанием окружения."""
+    data = {
+        "format": RESULTS_FORMAT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": map_generator.np is not None,
+        "seed": seed,
+        "results": results,
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def compare_results(results, baseline_path, tolerance):
+    """
+    Сравнить результаты с базой.
+    
+    Args:
+        results (dict): Время операций по ключам
+        baseline_path (str): Файл JSON с базовыми результатами
+        tolerance (float): Допустимое замедление (0.2 - на 20%)
+        
+    Returns:
+        list: Ключи замеров, замедлившихся больше допуска
+    """
+    with open(baseline_path, encoding='utf-8') as file:
+        baseline = json.load(file)["results"]
+        
+    print(f"Сравнение с {baseline_path} (допуск {tolerance:.0%})")
+    print(f"{'замер':<28} | {'база':>10} | {'сейчас':>10} | {'изменение':>9} | статус")
+    regressions = []
+    for key in sorted(results):
+        if key not in baseline:
+            print(f"{key:<28} | {'-':>10} | {results[key]:10.3g} | {'-':>9} | новый")
+            continue
+        ratio = results[key] / max(baseline[key], 1e-12)
+        if ratio > 1 + tolerance:
+            status = "РЕГРЕССИЯ"
+            regressions.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            status = "ускорение"
+        else:
+            status = "без изменений"
+        print(f"{key:<28} | {baseline[key]:10.3g} | {results[key]:10.3g} | {ratio - 1:+9.1%} | {status}")
+    return regressions
+
+
+SECTIONS = {
+    "automaton": lambda args, results: bench_automaton(args.sizes, args.seed, args.reference_max, results),
+    "regions": lambda args, results: bench_regions(args.sizes, args.seed, results),
+    "cache": lambda args, results: bench_cache(args.sizes, args.seed, results),
+    "batch": lambda args, results: bench_batch(args.batch_size, args.batch_count, args.seed, args.workers, results),
+    "generate": lambda args, results: bench_generate(args.sizes, args.seed, results),
+    "spawn": lambda args, results: bench_spawn(args.spawn_size, args.densities, args.seed, results),
+    "turns": lambda args, results: bench_turns(args.enemies, args.seed, results),
+    "combat": lambda args, results: bench_combat(args.combat_count, args.seed, results),
+    "render": lambda args, results: bench_render(args.seed, results),
+    "explore": lambda args, results: bench_explore(args.explore_turns, args.seed, results),
+    "save": lambda args, results: bench_save(args.save_turns, args.seed, results),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки производительности")
+    parser.add_argument("--sizes", default="64,128,256,512,1024,2048",
+                        help="размеры квадратных карт через запятую")
+    parser.add_argument("--seed", type=int, default=42, help="зерно случайного заполнения")
+    parser.add_argument("--reference-max", type=int, default=256,
+                        help="максимальный размер, для которого запускается исходная реализация")
+    parser.add_argument("--batch-size", type=int, default=64, help="размер карт для раздела batch")
+    parser.add_argument("--batch-count", type=int, default=200, help="количество карт для раздела batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="максимальное количество процессов для раздела batch")
+    parser.add_argument("--spawn-size", type=int, default=256, help="размер карты для раздела spawn")
+    parser.add_argument("--densities", default="0.005,0.02,0.04",
+                        help="доли клеток пола, занятых врагами, для раздела spawn")
+    parser.add_argument("--enemies", default="10,100,1000,10000,100000",
+                        help="количества врагов для раздела turns")
+    parser.add_argument("--combat-count", type=int, default=50000, help="количество боев для раздела combat")
+    parser.add_argument("--explore-turns", type=int, default=5000,
+                        help="количество ходов для раздела explore")
+    parser.add_argument("--save-turns", type=int, default=200, help="количество ходов для раздела save")
+    parser.add_argument("--quick", action="store_true",
+                        help="быстрый прогон: небольшие карты и до 10000 врагов")
+    parser.add_argument("--sections", default=",".join(SECTIONS),
+                        help="разделы бенчмарка через запятую: " + ", ".join(SECTIONS))
+    parser.add_argument("--json", help="сохранить результаты в файл JSON")
+    parser.add_argument("--compare", help="сравнить результаты с базой (файл JSON) и отметить регрессии")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое замедление относительно базы (0.2 - на 20%%)")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.reference_max = "64,256", 64
+        args.batch_count, args.combat_count = 20, 5000
+        args.explore_turns, args.save_turns = 1000, 50
+        args.spawn_size, args.enemies = 128, "10,100,1000,10000"
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    args.densities = [float(density) for density in args.densities.split(",")]
+    args.enemies = [int(count) for count in args.enemies.split(",")]
+    
+    results = {}
+    for name in args.sections.split(","):
+        SECTIONS[name](args, results)
+        print()
+        
+    if args.json:
+        write_results(args.json, results, args.seed)
+        print(f"Результаты сохранены в {args.json}")
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            raise SystemExit(f"Регрессии: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
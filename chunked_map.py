@@ -0,0 +1,203 @@
+"""
+Модуль большой карты из фрагментов (чанков), генерируемых по требованию.
+"""
+import random
+from collections import OrderedDict
+
+from map_generator import generate_random_map
+from tiles import TILE_FLOOR, TILE_WALL
+from profiler import PROFILER
+
+# Количество проходов на каждой границе между соседними чанками
+SEAM_DOORS = 2
+
+
+def _seam_doors(seed, axis, cx, cy, chunk_size):
+    """
+    Позиции проходов на границе между чанками.
+    
+    Граница задается чанком (cx, cy) и осью: 'v' - левая граница чанка, 'h' - верхняя.
+    Оба соседних чанка вычисляют одни и те же позиции, поэтому проходы совпадают.
+    """
+    rng = random.Random(f"{seed}:{axis}:{cx}:{cy}")
+    return [rng.randint(1, chunk_size - 2) for _ in range(SEAM_DOORS)]
+
+
+def _dig_door(chunk, x, y, dx, dy):
+    """Пробить проход от клетки на краю чанка внутрь, пока не встретится пустое пространство."""
+    while chunk.in_bounds(x, y):
+        if chunk.is_floor(x, y):
+            return
+        chunk.set(x, y, TILE_FLOOR)
+        x += dx
+        y += dy
+
+
+@PROFILER.timed("map.chunk")
+def generate_chunk(seed, cx, cy, chunk_size, world_width=None, world_height=None):
+    """
+    Детерминированно создать чанк по зерну мира и координатам чанка.
+    
+    Args:
+        seed (int): Зерно мира
+        cx (int): X-координата чанка
+        cy (int): Y-координата чанка
+        chunk_size (int): Размер стороны чанка в клетках
+        world_width (int): Ширина мира в чанках (None - бесконечный мир)
+        world_height (int): Высота мира в чанках (None - бесконечный мир)
+        
+    Returns:
+        TileGrid: Карта чанка, связная и с проходами к соседним чанкам
+    """
+    chunk = generate_random_map(chunk_size, chunk_size, rng=random.Random(f"{seed}:{cx}:{cy}"))
+    last = chunk_size - 1
+    
+    # Проходы к соседям; на внешних границах конечного мира проходов нет
+    if world_width is None or cx > 0:
+        for y in _seam_doors(seed, 'v', cx, cy, chunk_size):
+            _dig_door(chunk, 0, y, 1, 0)
+    if world_width is None or cx < world_width - 1:
+        for y in _seam_doors(seed, 'v', cx + 1, cy, chunk_size):
+            _dig_door(chunk, last, y, -1, 0)
+    if world_height is None or cy > 0:
+        for x in _seam_doors(seed, 'h', cx, cy, chunk_size):
+            _dig_door(chunk, x, 0, 0, 1)
+    if world_height is None or cy < world_height - 1:
+        for x in _seam_doors(seed, 'h', cx, cy + 1, chunk_size):
+            _dig_door(chunk, x, last, 0, -1)
+            
+    return chunk
+
+
+class ChunkedMap:
+    """
+    Карта мира из чанков, которые создаются при приближении сущностей и хранятся в LRU-кэше.
+    
+    Предоставляет тот же интерфейс доступа к клеткам, что и TileGrid.
+    """
+    
+    def __init__(self, seed, chunk_size=32, world_width=None, world_height=None, cache_size=64):
+        """
+        Инициализация мира.
+        
+        Args:
+            seed (int): Зерно мира
+            chunk_size (int): Размер стороны чанка в клетках
+            world_width (int): Ширина мира в чанках (None - бесконечный мир)
+            world_height (int): Высота мира в чанках (None - бесконечный мир)
+            cache_size (int): Максимальное количество чанков в памяти
+        """
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.world_width = world_width
+        self.world_height = world_height
+        self.cache_size = cache_size
+        self.width = world_width * chunk_size if world_width is not None else None
+        self.height = world_height * chunk_size if world_height is not None else None
+        self.chunks = OrderedDict()
+        # Изменения клеток по чанкам: переживают вытеснение чанка из кэша
+        self.overrides = {}
+        self.generated = 0  # Сколько раз чанки создавались (включая повторные)
+        self.version = 0  # Увеличивается при каждом изменении через set()
+        
+    def in_bounds(self, x, y):
+        """Проверить, находится ли клетка в пределах мира."""
+        if self.width is not None and not 0 <= x < self.width:
+            return False
+        if self.height is not None and not 0 <= y < self.height:
+            return False
+        return True
+        
+    def chunk(self, cx, cy):
+        """
+        Получить чанк, создав его при необходимости.
+        
+        Args:
+            cx (int): X-координата чанка
+            cy (int): Y-координата чанка
+            
+        Returns:
+            TileGrid: Карта чанка
+        """
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+            
+        chunk = generate_chunk(self.seed, cx, cy, self.chunk_size, self.world_width, self.world_height)
+        for index, tile in self.overrides.get(key, {}).items():
+            chunk.cells[index] = tile
+        self.generated += 1
+        
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.cache_size:
+            self.chunks.popitem(last=False)
+        return chunk
+        
+    def prefetch(self, x, y, radius=None):
+        """
+        Загрузить чанки вокруг клетки, к которой приближается сущность.
+        
+        Args:
+            x (int): X-координата
+            y (int): Y-координата
+            radius (int): Радиус в клетках (по умолчанию половина чанка)
+        """
+        if radius is None:
+            radius = self.chunk_size // 2
+        size = self.chunk_size
+        for cy in range((y - radius) // size, (y + radius) // size + 1):
+            for cx in range((x - radius) // size, (x + radius) // size + 1):
+                if self.in_bounds(cx * size, cy * size):
+                    self.chunk(cx, cy)
+                    
+    def get(self, x, y):
+        """Получить код клетки."""
+        size = self.chunk_size
+        return self.chunk(x // size, y // size).cells[(y % size) * size + x % size]
+        
+    def set(self, x, y, tile):
+        """Установить код клетки (изменение сохраняется при вытеснении чанка)."""
+        size = self.chunk_size
+        key = (x // size, y // size)
+        index = (y % size) * size + x % size
+        self.chunk(*key).cells[index] = tile
+        self.overrides.setdefault(key, {})[index] = tile
+        self.version += 1
+        
+    def is_wall(self, x, y):
+        """Проверить, является ли клетка стеной."""
+        return self.get(x, y) == TILE_WALL
+        
+    def is_floor(self, x, y):
+        """Проверить, является ли клетка пустым пространством."""
+        return self.get(x, y) == TILE_FLOOR
+        
+    def region_lines(self, x, y, width, height):
+        """
+        Получить прямоугольную область мира как список строк.
+        
+        Args:
+            x (int): X-координата левого верхнего угла
+            y (int): Y-координата левого верхнего угла
+            width (int): Ширина области
+            height (int): Высота области
+            
+        Returns:
+            list: Строки области
+        """
+        size = self.chunk_size
+        lines = []
+        for row_y in range(y, y + height):
+            line = bytearray()
+            row_x = x
+            while row_x < x + width:
+                # Копируем строку чанка целиком, насколько позволяет область
+                take = min(size - row_x % size, x + width - row_x)
+                chunk = self.chunk(row_x // size, row_y // size)
+                start = (row_y % size) * size + row_x % size
+                line.extend(chunk.cells[start:start + take])
+                row_x += take
+            lines.append(line.decode('ascii'))
+        return lines
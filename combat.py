@@ -3,25 +3,31 @@
 """
 import random
 
+from entities import CLASS_MAGE, CLASS_ROGUE
+from event_log import EV_ATTACK, EV_ARMOR, EV_HP_LEFT, EV_SPELL, EV_CRIT
 
-def process_combat(attacker, defender):
+
+def process_combat(attacker, defender, rng=None, log=None):
     """
     Обработка боя между двумя сущностями.
     
     Args:
         attacker (Entity): Атакующая сущность
         defender (Entity): Защищающаяся сущность
+        rng (random.Random): Источник случайных чисел боя (по умолчанию модуль random)
+        log (EventLog): Журнал, в который добавляются события боя (None - не записывать)
         
     Returns:
         dict: Словарь, содержащий результаты боя
     """
-    messages = []
-    
+    if rng is None:
+        rng = random
+        
     # Расчет урона
     base_damage = attacker.dmg
     
     # Добавить случайности к урону (±20%)
-    damage_variation = random.uniform(0.8, 1.2)
+    damage_variation = rng.uniform(0.8, 1.2)
     raw_damage = int(base_damage * damage_variation)
     
     # Применить уменьшение брони (каждая единица брони уменьшает урон на 10%, максимум 80%)
@@ -31,37 +37,43 @@ def process_combat(attacker, defender):
     # Нанести урон защищающемуся
     defender.hp -= final_damage
     
-    # Создать сообщения боя
-    messages.append(f"{attacker.name} атакует {defender.name} и наносит {final_damage} урона!")
-    
-    if defender.arm > 0:
-        messages.append(f"Броня {defender.name} поглотила {raw_damage - final_damage} урона.")
-    
-    messages.append(f"У {defender.name} осталось {max(0, defender.hp)}/{defender.max_hp} ОЗ.")
+    # Записать события боя (текст сообщений форматируется только при показе)
+    if log is not None:
+        attacker_name = log.name_id(attacker.name)
+        defender_name = log.name_id(defender.name)
+        log.add(EV_ATTACK, attacker_name, defender_name, final_damage)
+        
+        if defender.arm > 0:
+            log.add(EV_ARMOR, defender_name, raw_damage - final_damage)
+            
+        log.add(EV_HP_LEFT, defender_name, max(0, defender.hp), defender.max_hp)
+        
+    # Особые эффекты в зависимости от класса персонажа (у врагов класса нет)
+    attacker_class = getattr(attacker, 'class_id', None)
     
-    # Особые эффекты в зависимости от типа персонажа
-    if hasattr(attacker, 'char_class') and (attacker.char_class.lower() == "маг" or attacker.char_class.lower() == "mage") and attacker.sp >= 5:
+    if attacker_class == CLASS_MAGE and attacker.sp >= 5:
         # У мага есть шанс сотворить заклинание, если у него достаточно очков заклинаний
-        if random.random() < 0.3:  # 30% шанс сотворить заклинание
-            spell_damage = random.randint(3, 8)
+        if rng.random() < 0.3:  # 30% шанс сотворить заклинание
+            spell_damage = rng.randint(3, 8)
             defender.hp -= spell_damage
             attacker.sp -= 5
-            messages.append(f"{attacker.name} творит магическую стрелу на {spell_damage} дополнительного урона!")
-            messages.append(f"У {defender.name} осталось {max(0, defender.hp)}/{defender.max_hp} ОЗ.")
-    
-    if hasattr(attacker, 'char_class') and (attacker.char_class.lower() == "разбойник" or attacker.char_class.lower() == "rogue"):
+            if log is not None:
+                log.add(EV_SPELL, attacker_name, spell_damage)
+                log.add(EV_HP_LEFT, defender_name, max(0, defender.hp), defender.max_hp)
+                
+    if attacker_class == CLASS_ROGUE:
         # У разбойника есть шанс на критический удар
-        if random.random() < 0.2:  # 20% шанс на критический удар
-            crit_damage = random.randint(2, 5)
+        if rng.random() < 0.2:  # 20% шанс на критический удар
+            crit_damage = rng.randint(2, 5)
             defender.hp -= crit_damage
-            messages.append(f"{attacker.name} наносит критический удар на {crit_damage} дополнительного урона!")
-            messages.append(f"У {defender.name} осталось {max(0, defender.hp)}/{defender.max_hp} ОЗ.")
-    
+            if log is not None:
+                log.add(EV_CRIT, attacker_name, crit_damage)
+                log.add(EV_HP_LEFT, defender_name, max(0, defender.hp), defender.max_hp)
+                
     # Return combat results
     return {
         "attacker": attacker.name,
         "defender": defender.name,
         "damage": final_damage,
-        "messages": messages,
         "defender_hp_remaining": max(0, defender.hp)
     }
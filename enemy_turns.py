@@ -0,0 +1,230 @@
+"""
+Модуль пакетного хода врагов.
+
+Намерения всех врагов вычисляются сразу (массивами NumPy, если он установлен),
+а конфликты разрешаются за один детерминированный проход по правилам:
+
+1. Враг, видящий игрока (расстояние по Манхэттену меньше SIGHT_RADIUS и, если задано
+   поле зрения FieldOfView, клетка врага видна игроку), шагает к нему
+   вниз по полю направлений FlowField (в обход стен), а вне поля - напрямую;
+   бросок выбирает, какая ось приоритетнее. Остальные враги шагают в случайную сторону.
+2. Враг, чья цель - клетка игрока, атакует его и остается на месте.
+3. Враг, чья цель за пределами карты или в стене, остается на месте.
+4. Если несколько врагов выбрали одну клетку, ее получает первый по порядку хранилища.
+5. Враг входит в клетку, если она свободна в начале хода или занимавший ее враг
+   уходит в этот же ход; по кругу враги не перемещаются. Враги не накладываются.
+"""
+from entity_store import cell_key
+from tiles import TileGrid, TILE_WALL
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+# Радиус, в пределах которого враг замечает игрока
+SIGHT_RADIUS = 5
+
+# Направления случайного движения (индекс - бросок 0..3)
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# С какого количества врагов массивы NumPy быстрее обычного Python
+NUMPY_THRESHOLD = 64
+
+
+def _plan_python(xs, ys, player_x, player_y, rolls, flow_field, fov):
+    """Цели шагов всех врагов (обычный Python)."""
+    target_x = []
+    target_y = []
+    for x, y, roll in zip(xs, ys, rolls):
+        roll &= 3
+        if (abs(x - player_x) + abs(y - player_y) >= SIGHT_RADIUS or
+                (fov is not None and not fov.is_visible(x, y))):
+            target_x.append(x + DIRECTIONS[roll][0])
+            target_y.append(y + DIRECTIONS[roll][1])
+            continue
+            
+        # Вниз по полю направлений, а вне поля - напрямую к игроку
+        step = flow_field.step(x, y, roll & 1) if flow_field is not None else None
+        if step is not None:
+            dx, dy = step
+        else:
+            dx = (x < player_x) - (x > player_x)
+            dy = (y < player_y) - (y > player_y)
+            # Приоритет горизонтального (нечетный бросок) или вертикального движения
+            use_x = dx != 0 if roll & 1 else dy == 0
+            if use_x:
+                dy = 0
+            else:
+                dx = 0
+        target_x.append(x + dx)
+        target_y.append(y + dy)
+    return target_x, target_y
+
+
+def _plan_numpy(xs, ys, player_x, player_y, rolls, flow_field, fov):
+    """Цели шагов всех врагов (NumPy)."""
+    rolls = np.frombuffer(rolls, dtype=np.uint8) & 3
+    dx = np.sign(player_x - xs)
+    dy = np.sign(player_y - ys)
+    chasing = np.abs(xs - player_x) + np.abs(ys - player_y) < SIGHT_RADIUS
+    if fov is not None:
+        # Видимость симметрична: враг видит игрока, если игрок видит клетку врага
+        chasing &= fov.visible_mask(xs, ys)
+    
+    # Приоритет горизонтального (нечетный бросок) или вертикального движения
+    x_first = (rolls & 1).astype(bool)
+    use_x = np.where(x_first, dx != 0, dy == 0)
+    chase_x = np.where(use_x, dx, 0)
+    chase_y = np.where(use_x, 0, dy)
+    
+    # Вдоль поля направлений шагают только преследующие враги внутри поля
+    if flow_field is not None and chasing.any():
+        chasers = np.flatnonzero(chasing)
+        field_x, field_y, found = flow_field.steps(xs[chasers], ys[chasers], x_first[chasers])
+        chase_x[chasers] = np.where(found, field_x, chase_x[chasers])
+        chase_y[chasers] = np.where(found, field_y, chase_y[chasers])
+    
+    directions = np.array(DIRECTIONS, dtype=np.int64)
+    step_x = np.where(chasing, chase_x, directions[rolls, 0])
+    step_y = np.where(chasing, chase_y, directions[rolls, 1])
+    return xs + step_x, ys + step_y
+
+
+def _passable_python(game_map, target_x, target_y):
+    """Признаки для каждой цели: в пределах карты и не в стене."""
+    return [game_map.in_bounds(x, y) and not game_map.is_wall(x, y)
+            for x, y in zip(target_x, target_y)]
+
+
+def _passable_numpy(game_map, target_x, target_y):
+    """Маска целей в пределах карты и не в стене."""
+    if not isinstance(game_map, TileGrid):
+        # Карта из чанков не представима одним массивом: проверяем по клеткам
+        return np.array(_passable_python(game_map, target_x.tolist(), target_y.tolist()), dtype=bool)
+    inside = ((target_x >= 0) & (target_x < game_map.width) &
+              (target_y >= 0) & (target_y < game_map.height))
+    passable = np.zeros(len(target_x), dtype=bool)
+    passable[inside] = game_map.as_array()[target_y[inside], target_x[inside]] != TILE_WALL
+    return passable
+
+
+def _cell_keys(xs, ys):
+    """Ключи cell_key для массивов координат."""
+    return (ys << 32) + xs
+
+
+def _resolve_python(enemies, game_map, player_x, player_y, rolls, flow_field, fov):
+    """Разрешение хода обычным Python. Возвращает (слоты, новые x, новые y, ключи или None, атакующие)."""
+    target_x, target_y = _plan_python(enemies.x, enemies.y, player_x, player_y, rolls, flow_field, fov)
+    passable = _passable_python(game_map, target_x, target_y)
+    
+    attackers = []
+    winners = {}  # Слот первого претендента на каждую клетку
+    for slot, (x, y, ok) in enumerate(zip(target_x, target_y, passable)):
+        if x == player_x and y == player_y:
+            attackers.append(slot)
+        elif ok:
+            winners.setdefault((x, y), slot)
+            
+    # Претендент на занятую клетку ждет, пока ее не освободит занимающий
+    occupancy = enemies.occupancy
+    slot_of = enemies.slot_of
+    ready = []
+    waiting = {}  # Слот занимающего -> слот ждущего
+    for cell, slot in winners.items():
+        occupant = occupancy.get(cell_key(*cell))
+        if occupant is None:
+            ready.append(slot)
+        else:
+            waiting[slot_of[occupant]] = slot
+            
+    moved = []
+    while ready:
+        slot = ready.pop()
+        moved.append(slot)
+        follower = waiting.get(slot)
+        if follower is not None:
+            ready.append(follower)
+    moved.sort()
+    return moved, [target_x[slot] for slot in moved], [target_y[slot] for slot in moved], None, attackers
+
+
+def _resolve_numpy(enemies, game_map, player_x, player_y, rolls, flow_field, fov):
+    """Разрешение хода массивами NumPy. Возвращает (слоты, новые x, новые y, ключи, атакующие)."""
+    xs = np.array(enemies.x, dtype=np.int64)
+    ys = np.array(enemies.y, dtype=np.int64)
+    target_x, target_y = _plan_numpy(xs, ys, player_x, player_y, rolls, flow_field, fov)
+    
+    attack = (target_x == player_x) & (target_y == player_y)
+    candidates = np.flatnonzero(_passable_numpy(game_map, target_x, target_y) & ~attack)
+    
+    # Первый по порядку претендент на каждую клетку (устойчивая сортировка сохраняет порядок)
+    keys = _cell_keys(target_x[candidates], target_y[candidates])
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    winners = candidates[order[first]]
+    winner_keys = keys[first]
+    
+    # Кто занимает клетки претендентов в начале хода
+    position_keys = _cell_keys(xs, ys)
+    position_order = np.argsort(position_keys)
+    position_keys = position_keys[position_order]
+    index = np.minimum(np.searchsorted(position_keys, winner_keys), len(position_keys) - 1)
+    occupied = position_keys[index] == winner_keys
+    occupant = position_order[index]
+    
+    # Свободные клетки занимаются сразу; занятые - когда уходит занимающий
+    moving = np.zeros(len(xs), dtype=bool)
+    moving[winners[~occupied]] = True
+    waiting = occupied
+    while True:
+        step = waiting & moving[occupant]
+        if not step.any():
+            break
+        moving[winners[step]] = True
+        waiting &= ~step
+        
+    moved = np.flatnonzero(moving)
+    keys = (_cell_keys(xs[moved], ys[moved]).tolist(), _cell_keys(target_x[moved], target_y[moved]).tolist())
+    return moved, target_x[moved], target_y[moved], keys, np.flatnonzero(attack).tolist()
+
+
+def resolve_enemy_turn(enemies, game_map, player_x, player_y, rng, flow_field=None, fov=None,
+                       use_numpy=None):
+    """
+    Выполнить ход всех врагов: переместить их и определить, кто атакует игрока.
+    
+    Результат не зависит от того, используется ли NumPy.
+    
+    Args:
+        enemies (EntityStore): Хранилище врагов
+        game_map (TileGrid или ChunkedMap): Карта
+        player_x (int): X-координата игрока
+        player_y (int): Y-координата игрока
+        rng (random.Random): Источник случайных чисел ИИ (один вызов на ход)
+        flow_field (FlowField): Поле направлений к игроку (None - преследовать напрямую)
+        fov (FieldOfView): Поле зрения игрока (None - враги видят сквозь стены)
+        use_numpy (bool): Использовать NumPy (None - если он установлен и врагов
+            не меньше NUMPY_THRESHOLD)
+        
+    Returns:
+        list: Описатели врагов, атакующих игрока, в порядке хранилища
+    """
+    if not enemies:
+        return []
+    rolls = rng.randbytes(len(enemies))
+    if use_numpy is None:
+        use_numpy = np is not None and len(enemies) >= NUMPY_THRESHOLD
+        
+    resolve = _resolve_numpy if use_numpy else _resolve_python
+    slots, new_x, new_y, keys, attackers = resolve(enemies, game_map, player_x, player_y, rolls, flow_field, fov)
+        
+    attackers = [enemies.handle(enemies.ids[slot]) for slot in attackers]
+    if keys is None:
+        enemies.move_slots(slots, new_x, new_y)
+    else:
+        enemies.move_slots(slots, new_x, new_y, *keys)
+    return attackers
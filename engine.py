@@ -0,0 +1,362 @@
+"""
+Модуль игрового движка без ввода-вывода.
+
+Движок хранит состояние партии и продвигает его по одному действию игрока:
+engine = new_game(config, seed); events = engine.step('d'). Он не читает ввод,
+не печатает и не обращается к диску (если не переданы кэш карт или файл журнала),
+поэтому партии можно проигрывать с машинной скоростью, а терминальный интерфейс
+(game.py) лишь переводит нажатия клавиш в действия и отображает состояние.
+"""
+import random
+
+from map_generator import STANDARD_WIDTH, STANDARD_HEIGHT
+from map_cache import GENERATORS
+from chunked_map import ChunkedMap
+from entities import Player, Enemy
+from entities import ENEMY_GOBLIN, ENEMY_ORC, ENEMY_TROLL, ENEMY_SKELETON
+from entity_store import EntityStore, cell_key
+from combat import process_combat
+from enemy_turns import resolve_enemy_turn, SIGHT_RADIUS
+from flow_field import FlowField
+from fov import FieldOfView
+from spawning import FreeCellIndex, find_free_cell, poisson_disk_positions
+from rng import GameRandom
+from event_log import EventLog, LOG_CAPACITY
+from profiler import PROFILER
+from event_log import (EV_MORE_ENEMIES, EV_GAME_STARTED, EV_PLAYER_CREATED, EV_WALL, EV_MOVED,
+                       EV_ENEMY_DEFEATED, EV_PLAYER_DEFEATED, EV_VICTORY, EV_FEWER_ENEMIES)
+
+# Ослабленные ограничения расстановки, если на маленькой карте врагам не хватило места:
+# враги не стоят рядом с игроком, но могут стоять вплотную друг к другу
+RELAXED_PLAYER_DISTANCE = 3
+RELAXED_ENEMY_DISTANCE = 1
+
+# Размер мира из чанков (в чанках)
+WORLD_CHUNKS = 16
+
+# Типы карт
+MAP_STANDARD = 'standard'
+MAP_RANDOM = 'random'
+MAP_WORLD = 'world'
+
+# Действия игрока: направления движения и выход
+MOVES = {
+    'w': (0, -1),  # Вверх
+    's': (0, 1),  # Вниз
+    'a': (-1, 0),  # Влево
+    'd': (1, 0),  # Вправо
+}
+ACTION_QUIT = 'q'
+ACTIONS = tuple(MOVES) + (ACTION_QUIT,)
+
+
+class GameConfig:
+    """Параметры новой партии."""
+    
+    def __init__(self, map_type=MAP_STANDARD, width=STANDARD_WIDTH, height=STANDARD_HEIGHT,
+                 more_enemies=False, player_name="Игрок", player_class="Воин"):
+        """
+        Инициализация параметров.
+        
+        Args:
+            map_type (str): Тип карты: MAP_STANDARD, MAP_RANDOM или MAP_WORLD
+            width (int): Ширина случайной карты
+            height (int): Высота случайной карты
+            more_enemies (bool): Режим с увеличенным количеством врагов
+            player_name (str): Имя игрока
+            player_class (str): Класс персонажа
+        """
+        self.map_type = map_type
+        self.width = width
+        self.height = height
+        self.more_enemies = more_enemies
+        self.player_name = player_name
+        self.player_class = player_class
+
+
+class GameEngine:
+    """
+    Состояние партии и правила игры без ввода-вывода.
+    """
+    
+    def __init__(self, config, seed=None, map_cache=None, log_path=None):
+        """
+        Создать партию: карту, игрока и врагов.
+        
+        Args:
+            config (GameConfig): Параметры партии
+            seed (int): Зерно игры, из которого выводятся все случайные события (None - случайное)
+            map_cache (MapCache): Дисковый кэш карт (None - генерировать в памяти)
+            log_path (str): Файл для полного журнала событий в формате JSON Lines (None - не писать)
+        """
+        self.config = config
+        self.rng = GameRandom(seed)
+        self.seed = self.rng.seed
+        self.running = True
+        self.won = False
+        self.turn = 0
+        self.enemies = EntityStore()
+        self.log = EventLog(LOG_CAPACITY, path=log_path)
+        
+        if config.more_enemies:
+            self.log.add(EV_MORE_ENEMIES)
+            
+        # Карта зависит только от зерна партии, поэтому ее можно брать из кэша
+        map_seed = self.rng.map.randrange(2 ** 32)
+        if config.map_type == MAP_WORLD:
+            # Большой мир, чанки которого создаются по мере приближения
+            game_map = ChunkedMap(map_seed, world_width=WORLD_CHUNKS, world_height=WORLD_CHUNKS)
+        else:
+            if config.map_type == MAP_STANDARD:
+                width, height = STANDARD_WIDTH, STANDARD_HEIGHT
+            else:
+                width, height = config.width, config.height
+            with PROFILER.phase("map.generate"):
+                if map_cache is not None:
+                    game_map = map_cache.get_or_generate(config.map_type, width, height, map_seed)
+                else:
+                    game_map = GENERATORS[config.map_type](width, height, random.Random(map_seed))
+        self.attach_map(game_map)
+        
+        # Поиск подходящей начальной позиции для игрока
+        player_x, player_y = self.find_valid_position()
+        self.player = Player(config.player_name, config.player_class, player_x, player_y)
+        
+        # Добавление врагов на карту
+        if config.more_enemies:
+            self.spawn_enemies(8 + self.rng.spawn.randint(0, 4))  # 8-12 врагов
+        else:
+            self.spawn_enemies(5 + self.rng.spawn.randint(0, 3))  # 5-8 врагов
+            
+        self.log.add(EV_GAME_STARTED)
+        self.log.add(EV_PLAYER_CREATED, self.log.name_id(config.player_name), self.log.name_id(config.player_class))
+        
+    def attach_map(self, game_map):
+        """
+        Установить карту партии и создать зависящие от нее индексы.
+        
+        Args:
+            game_map (TileGrid или ChunkedMap): Карта
+        """
+        self.current_map = game_map
+        self.map_width = game_map.width
+        self.map_height = game_map.height
+        
+        # Поле направлений к игроку, общее для всех преследующих врагов, и поле зрения игрока
+        self.flow_field = FlowField(game_map)
+        self.fov = FieldOfView(game_map)
+        self.free_cells = FreeCellIndex(game_map)
+        
+    def find_valid_position(self):
+        """Найти подходящую (пустую и не занятую врагом) позицию на карте за ограниченное время."""
+        return find_free_cell(self.free_cells, self.rng.spawn,
+                              (1, 1, self.map_width - 1, self.map_height - 1),
+                              is_free=lambda x, y: self.enemies.find_at(x, y) is None)
+                              
+    @PROFILER.timed("map.spawn")
+    def spawn_enemies(self, num_enemies):
+        """
+        Создать указанное количество врагов на случайных позициях на карте.
+        
+        Враги стоят не ближе 6 клеток к игроку и не ближе 3 клеток друг к другу. Если
+        на карте для этого не хватает места, ограничения ослабляются (RELAXED_*), а если
+        не хватает и тогда, врагов создается меньше и об этом пишется в журнал.
+        """
+        enemy_types = (ENEMY_GOBLIN, ENEMY_ORC, ENEMY_TROLL, ENEMY_SKELETON)
+        
+        # Разделим карту на секторы для более равномерного распределения
+        sectors = [
+            (0, 0, self.map_width // 2, self.map_height // 2),  # верхний левый
+            (self.map_width // 2, 0, self.map_width, self.map_height // 2),  # верхний правый
+            (0, self.map_height // 2, self.map_width // 2, self.map_height),  # нижний левый
+            (self.map_width // 2, self.map_height // 2, self.map_width, self.map_height),  # нижний правый
+        ]
+        
+        # Убедимся, что в каждом секторе будет примерно одинаковое количество врагов
+        enemies_per_sector = max(1, num_enemies // 4)
+        remaining = num_enemies - (enemies_per_sector * 4)
+        
+        enemies_count = []
+        for i in range(4):
+            count = enemies_per_sector
+            if remaining > 0:
+                count += 1
+                remaining -= 1
+            enemies_count.append(count)
+            
+        # Расставляем врагов в каждом секторе (без крайних клеток карты)
+        placed = set()
+        positions = []
+        for (x1, y1, x2, y2), count in zip(sectors, enemies_count):
+            region = (max(1, x1), max(1, y1), min(x2, self.map_width - 1), min(y2, self.map_height - 1))
+            positions += poisson_disk_positions(self.free_cells, count, self.rng.spawn, region,
+                                                self.enemies, self.player, placed=placed)
+                                                
+        # Если в секторе не хватило места, добираем врагов по всей карте
+        if len(positions) < num_enemies:
+            region = (1, 1, self.map_width - 1, self.map_height - 1)
+            positions += poisson_disk_positions(self.free_cells, num_enemies - len(positions),
+                                                self.rng.spawn, region, self.enemies, self.player,
+                                                placed=placed)
+        # Маленькая карта: остальных врагов можно ставить ближе к игроку и друг к другу
+        if len(positions) < num_enemies:
+            placed = {cell_key(x, y) for x, y in positions}
+            positions += poisson_disk_positions(self.free_cells, num_enemies - len(positions),
+                                                self.rng.spawn, region, self.enemies, self.player,
+                                                min_player_distance=RELAXED_PLAYER_DISTANCE,
+                                                min_distance=RELAXED_ENEMY_DISTANCE, placed=placed)
+        if len(positions) < num_enemies:
+            self.log.add(EV_FEWER_ENEMIES, len(positions), num_enemies)
+            
+        type_ids = self.rng.spawn.choices(enemy_types, k=len(positions))
+        self.enemies.add_entities(Enemy.spawn_many(type_ids, positions, rng=self.rng.spawn))
+        
+    def step(self, action):
+        """
+        Выполнить одно действие игрока и ход врагов.
+        
+        Args:
+            action (str): 'w', 'a', 's', 'd' - движение или атака, 'q' - выход;
+                остальные действия игнорируются
+                
+        Returns:
+            list: События (код, аргументы), добавленные в журнал за это действие
+        """
+        if not self.running:
+            return []
+        first_event = self.log.total
+        
+        if action in MOVES:
+            self.move_player(*MOVES[action])
+        elif action == ACTION_QUIT:
+            self.running = False
+            
+        # Проверка условия победы
+        if self.running and not self.enemies:
+            self.log.add(EV_VICTORY)
+            self.won = True
+            self.running = False
+            
+        return self.log.since(first_event)
+        
+    def move_player(self, dx, dy):
+        """
+        Попытка переместить игрока в указанном направлении.
+        
+        Args:
+            dx (int): Изменение x-координаты
+            dy (int): Изменение y-координаты
+        """
+        new_x = self.player.x + dx
+        new_y = self.player.y + dy
+        
+        # Проверка, находится ли новая позиция в пределах карты
+        if self.current_map.in_bounds(new_x, new_y):
+            # Проверка столкновения со стеной
+            if self.current_map.is_wall(new_x, new_y):
+                self.log.add(EV_WALL)
+                return
+                
+            # Проверка столкновения с врагом
+            enemy_at_pos = self.get_enemy_at_position(new_x, new_y)
+            if enemy_at_pos:
+                # Начать бой с врагом
+                with PROFILER.phase("player.combat"):
+                    process_combat(self.player, enemy_at_pos, rng=self.rng.combat, log=self.log)
+                PROFILER.count("combat.player_attacks")
+                
+                # Проверка, побежден ли враг
+                if enemy_at_pos.hp <= 0:
+                    self.log.add(EV_ENEMY_DEFEATED, self.log.name_id(enemy_at_pos.name))
+                    self.enemies.remove(enemy_at_pos)
+                    
+                # Если игрок побежден, завершить игру
+                if self.player.hp <= 0:
+                    self.log.add(EV_PLAYER_DEFEATED)
+                    self.running = False
+                    return
+            else:
+                # Переместить игрока
+                self.player.position = (new_x, new_y)
+                self.log.add(EV_MOVED, new_x, new_y)
+                
+            # Игрок переместился или атаковал, завершить его ход
+            self.complete_turn()
+            
+    def get_enemy_at_position(self, x, y):
+        """
+        Проверить, есть ли враг на указанной позиции.
+        
+        Args:
+            x (int): X-координата
+            y (int): Y-координата
+            
+        Returns:
+            EntityHandle or None: Враг на позиции, или None если врага там нет
+        """
+        return self.enemies.find_at(x, y)
+        
+    def visible_enemies(self):
+        """
+        Враги, которых видит игрок.
+        
+        Проверяются только клетки окна поля зрения, а не все враги.
+        
+        Returns:
+            list: Описатели видимых врагов
+        """
+        fov = self.fov
+        fov.update(self.player.x, self.player.y)
+        return [enemy for enemy in self.enemies.in_rect(fov.left, fov.top, fov.left + fov.size, fov.top + fov.size)
+                if fov.is_visible(enemy.x, enemy.y)]
+                
+    def complete_turn(self):
+        """Завершить текущий ход и передать ход врагам."""
+        self.turn += 1
+        
+        # Подготовить чанки вокруг игрока заранее
+        if isinstance(self.current_map, ChunkedMap):
+            self.current_map.prefetch(self.player.x, self.player.y)
+            
+        # Поле зрения и поле направлений нужны, только если игрока может заметить хотя бы
+        # один враг, и перестраиваются, только если игрок переместился
+        if self.enemies.any_within(self.player.x, self.player.y, SIGHT_RADIUS - 1):
+            with PROFILER.phase("turn.fov"):
+                self.fov.update(self.player.x, self.player.y)
+                self.flow_field.update(self.player.x, self.player.y)
+                
+        # Ход врагов: все перемещения вычисляются разом, затем враги по очереди атакуют
+        with PROFILER.phase("turn.ai"):
+            attackers = resolve_enemy_turn(self.enemies, self.current_map, self.player.x, self.player.y,
+                                           self.rng.ai, flow_field=self.flow_field, fov=self.fov)
+        PROFILER.count("turns")
+        PROFILER.count("ai.enemies", len(self.enemies))
+        if not attackers:
+            return
+            
+        with PROFILER.phase("turn.combat"):
+            for enemy in attackers:
+                process_combat(enemy, self.player, rng=self.rng.combat, log=self.log)
+                PROFILER.count("combat.enemy_attacks")
+                
+                # Если игрок побежден, завершить игру
+                if self.player.hp <= 0:
+                    self.log.add(EV_PLAYER_DEFEATED)
+                    self.running = False
+                    break
+
+
+def new_game(config, seed=None, map_cache=None, log_path=None):
+    """
+    Начать новую партию.
+    
+    Args:
+        config (GameConfig): Параметры партии
+        seed (int): Зерно игры (None - случайное)
+        map_cache (MapCache): Дисковый кэш карт (None - генерировать в памяти)
+        log_path (str): Файл для полного журнала событий в формате JSON Lines (None - не писать)
+        
+    Returns:
+        GameEngine: Движок с новой партией
+    """
+    return GameEngine(config, seed=seed, map_cache=map_cache, log_path=log_path)
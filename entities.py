@@ -3,6 +3,72 @@
 """
 import random
 
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+
+# Идентификаторы классов персонажа
+CLASS_WARRIOR = 0
+CLASS_MAGE = 1
+CLASS_ROGUE = 2
+CLASS_DEFAULT = 3
+
+# Характеристики классов по идентификатору: (max_hp, max_sp, dmg, arm)
+CLASS_STATS = (
+    (30, 10, 3, 2),  # Воин
+    (15, 30, 5, 0),  # Маг
+    (20, 20, 4, 1),  # Разбойник
+    (20, 20, 2, 1),  # Класс по умолчанию
+)
+
+# Названия классов на русском и английском языках (в нижнем регистре)
+CLASS_ALIASES = {
+    "воин": CLASS_WARRIOR, "warrior": CLASS_WARRIOR,
+    "маг": CLASS_MAGE, "mage": CLASS_MAGE,
+    "разбойник": CLASS_ROGUE, "rogue": CLASS_ROGUE,
+}
+
+# Идентификаторы типов врагов
+ENEMY_GOBLIN = 0
+ENEMY_ORC = 1
+ENEMY_TROLL = 2
+ENEMY_SKELETON = 3
+ENEMY_DEFAULT = 4
+
+# Характеристики типов врагов по идентификатору: (max_hp, max_sp, dmg, arm)
+ENEMY_STATS = (
+    (10, 5, 2, 0),   # Гоблин
+    (20, 10, 3, 1),  # Орк
+    (30, 5, 4, 2),   # Тролль
+    (15, 0, 3, 1),   # Скелет
+    (15, 10, 2, 1),  # Враг по умолчанию
+)
+ENEMY_NAMES = ("Гоблин", "Орк", "Тролль", "Скелет", "Враг")
+ENEMY_CHARS = ('г', 'о', 'Т', 'с', 'В')
+
+ENEMY_ALIASES = {
+    "гоблин": ENEMY_GOBLIN, "goblin": ENEMY_GOBLIN,
+    "орк": ENEMY_ORC, "orc": ENEMY_ORC,
+    "тролль": ENEMY_TROLL, "troll": ENEMY_TROLL,
+    "скелет": ENEMY_SKELETON, "skeleton": ENEMY_SKELETON,
+}
+
+# Возможные значения разброса характеристик врага
+HP_JITTER = (-2, -1, 0, 1, 2)
+DMG_JITTER = (-1, 0, 1)
+
+
+def class_id(char_class):
+    """Идентификатор класса персонажа по названию (на русском или английском)."""
+    return CLASS_ALIASES.get(char_class.lower(), CLASS_DEFAULT)
+
+
+def enemy_type_id(enemy_type):
+    """Идентификатор типа врага по названию (на русском или английском)."""
+    return ENEMY_ALIASES.get(enemy_type.lower(), ENEMY_DEFAULT)
+
 
 class Entity:
     """Базовый класс для всех игровых сущностей."""
@@ -26,6 +92,15 @@ class Entity:
         self.sp = self.max_sp
         self.dmg = 1
         self.arm = 0  # Броня
+        
+    @property
+    def position(self):
+        """Клетка сущности (x, y)."""
+        return self.x, self.y
+        
+    @position.setter
+    def position(self, position):
+        self.x, self.y = position
 
 
 class Player(Entity):
@@ -44,42 +119,18 @@ class Player(Entity):
         super().__init__(name, x, y)
         self.char = '@'
         self.char_class = char_class
+        self.class_id = class_id(char_class)
         
         # Установка характеристик в зависимости от класса персонажа
-        if char_class.lower() == "воин" or char_class.lower() == "warrior":
-            self.max_hp = 30
-            self.hp = self.max_hp
-            self.max_sp = 10
-            self.sp = self.max_sp
-            self.dmg = 3
-            self.arm = 2
-        elif char_class.lower() == "маг" or char_class.lower() == "mage":
-            self.max_hp = 15
-            self.hp = self.max_hp
-            self.max_sp = 30
-            self.sp = self.max_sp
-            self.dmg = 5
-            self.arm = 0
-        elif char_class.lower() == "разбойник" or char_class.lower() == "rogue":
-            self.max_hp = 20
-            self.hp = self.max_hp
-            self.max_sp = 20
-            self.sp = self.max_sp
-            self.dmg = 4
-            self.arm = 1
-        else:  # Класс по умолчанию
-            self.max_hp = 20
-            self.hp = self.max_hp
-            self.max_sp = 20
-            self.sp = self.max_sp
-            self.dmg = 2
-            self.arm = 1
+        self.max_hp, self.max_sp, self.dmg, self.arm = CLASS_STATS[self.class_id]
+        self.hp = self.max_hp
+        self.sp = self.max_sp
 
 
 class Enemy(Entity):
     """Класс врага."""
     
-    def __init__(self, enemy_type, x, y):
+    def __init__(self, enemy_type, x, y, rng=None):
         """
         Инициализация врага.
         
@@ -87,50 +138,75 @@ class Enemy(Entity):
             enemy_type (str): Тип врага (например, Гоблин, Орк, Тролль)
             x (int): X-координата
             y (int): Y-координата
+            rng (random.Random): Источник случайных чисел для разброса характеристик
         """
         super().__init__(enemy_type, x, y)
         self.char = 'В'  # В - враг
+        self.type_id = enemy_type_id(enemy_type)
         
         # Установка характеристик в зависимости от типа врага
-        if enemy_type.lower() == "гоблин" or enemy_type.lower() == "goblin":
-            self.max_hp = 10
-            self.hp = self.max_hp
-            self.max_sp = 5
-            self.sp = self.max_sp
-            self.dmg = 2
-            self.arm = 0
-        elif enemy_type.lower() == "орк" or enemy_type.lower() == "orc":
-            self.max_hp = 20
-            self.hp = self.max_hp
-            self.max_sp = 10
-            self.sp = self.max_sp
-            self.dmg = 3
-            self.arm = 1
-        elif enemy_type.lower() == "тролль" or enemy_type.lower() == "troll":
-            self.max_hp = 30
-            self.hp = self.max_hp
-            self.max_sp = 5
-            self.sp = self.max_sp
-            self.dmg = 4
-            self.arm = 2
-        elif enemy_type.lower() == "скелет" or enemy_type.lower() == "skeleton":
-            self.max_hp = 15
-            self.hp = self.max_hp
-            self.max_sp = 0
-            self.sp = self.max_sp
-            self.dmg = 3
-            self.arm = 1
-        else:  # Враг по умолчанию
-            self.max_hp = 15
-            self.hp = self.max_hp
-            self.max_sp = 10
-            self.sp = self.max_sp
-            self.dmg = 2
-            self.arm = 1
-            
+        self.max_hp, self.max_sp, self.dmg, self.arm = ENEMY_STATS[self.type_id]
+        self.sp = self.max_sp
+        
         # Добавление случайности в характеристики врага
-        self.max_hp += random.randint(-2, 2)
+        if rng is None:
+            rng = random
+        self.max_hp += rng.randint(-2, 2)
         self.hp = self.max_hp
-        self.dmg += random.randint(-1, 1)
+        self.dmg += rng.randint(-1, 1)
         if self.dmg < 1:
             self.dmg = 1
+            
+    @classmethod
+    def spawn_many(cls, type_ids, positions, rng=None):
+        """
+        Создать множество врагов за один вызов.
+        
+        Характеристики берутся из таблицы шаблонов и вычисляются сразу для всех врагов;
+        разброс (±2 ОЗ, ±1 урона) выбирается из rng двумя вызовами на весь пакет.
+        
+        Args:
+            type_ids (list): Идентификаторы типов врагов (ENEMY_GOBLIN, ...)
+            positions (list): Позиции врагов [(x, y), ...]
+            rng (random.Random): Источник случайных чисел для разброса характеристик
+            
+        Returns:
+            list: Созданные враги
+        """
+        type_ids = list(type_ids)
+        positions = list(positions)
+        if len(type_ids) != len(positions):
+            raise ValueError("Количество типов врагов не совпадает с количеством позиций")
+        if rng is None:
+            rng = random
+        count = len(type_ids)
+        hp_jitter = rng.choices(HP_JITTER, k=count)
+        dmg_jitter = rng.choices(DMG_JITTER, k=count)
+        
+        if np is not None and count:
+            stats = np.array(ENEMY_STATS, dtype=np.int32)[np.array(type_ids, dtype=np.intp)]
+            max_hps = (stats[:, 0] + np.array(hp_jitter, dtype=np.int32)).tolist()
+            max_sps = stats[:, 1].tolist()
+            dmgs = np.maximum(stats[:, 2] + np.array(dmg_jitter, dtype=np.int32), 1).tolist()
+            arms = stats[:, 3].tolist()
+        else:
+            max_hps = [ENEMY_STATS[type_id][0] + jitter for type_id, jitter in zip(type_ids, hp_jitter)]
+            max_sps = [ENEMY_STATS[type_id][1] for type_id in type_ids]
+            dmgs = [max(1, ENEMY_STATS[type_id][2] + jitter) for type_id, jitter in zip(type_ids, dmg_jitter)]
+            arms = [ENEMY_STATS[type_id][3] for type_id in type_ids]
+            
+        enemies = []
+        for index, (type_id, (x, y)) in enumerate(zip(type_ids, positions)):
+            # Конструктор не вызывается: характеристики уже вычислены
+            enemy = cls.__new__(cls)
+            enemy.name = ENEMY_NAMES[type_id]
+            enemy.x = x
+            enemy.y = y
+            enemy.char = 'В'
+            enemy.type_id = type_id
+            enemy.max_hp = enemy.hp = max_hps[index]
+            enemy.max_sp = enemy.sp = max_sps[index]
+            enemy.dmg = dmgs[index]
+            enemy.arm = arms[index]
+            enemies.append(enemy)
+        return enemies
@@ -0,0 +1,442 @@
+"""
+Модуль хранения множества сущностей в параллельных массивах (структура массивов).
+"""
+from array import array
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+# Числовые характеристики сущности, хранящиеся в отдельных столбцах
+# (type_id - идентификатор шаблона характеристик, name_id - номер имени в хранилище)
+COLUMNS = ('x', 'y', 'hp', 'max_hp', 'sp', 'max_sp', 'dmg', 'arm', 'type_id', 'name_id')
+
+
+def cell_key(x, y):
+    """
+    Ключ клетки в индексе занятости: одно целое число вместо кортежа (x, y).
+    
+    Ключи различны для любых координат, по модулю меньших 2**31, включая отрицательные.
+    """
+    return (y << 32) + x
+
+
+def _column_property(column):
+    """Свойство описателя, читающее и записывающее значение в столбец хранилища."""
+    def getter(self):
+        store = self.store
+        return getattr(store, column)[store.slot_of[self.id]]
+        
+    def setter(self, value):
+        store = self.store
+        getattr(store, column)[store.slot_of[self.id]] = value
+        
+    return property(getter, setter)
+
+
+def _position_property(column):
+    """Свойство описателя для координаты: запись перемещает сущность в индексе занятости."""
+    def getter(self):
+        store = self.store
+        return getattr(store, column)[store.slot_of[self.id]]
+        
+    def setter(self, value):
+        # Меняется одна координата; чтобы сменить обе, нужен position (иначе сущность
+        # на промежуточной клетке (новый x, старый y) может столкнуться с другой)
+        if column == 'x':
+            self.store.move(self.id, value, self.y)
+        else:
+            self.store.move(self.id, self.x, value)
+            
+    return property(getter, setter)
+
+
+class EntityHandle:
+    """
+    Легковесный описатель сущности в хранилище.
+    
+    Предоставляет тот же набор атрибутов, что и Enemy, но сами данные лежат в столбцах
+    хранилища. Описатель остается верным после удаления других сущностей.
+    """
+    
+    __slots__ = ('store', 'id')
+    
+    char = 'В'
+    
+    def __init__(self, store, entity_id):
+        """
+        Инициализация описателя.
+        
+        Args:
+            store (EntityStore): Хранилище
+            entity_id (int): Постоянный идентификатор сущности
+        """
+        self.store = store
+        self.id = entity_id
+        
+    @property
+    def name(self):
+        """Имя сущности."""
+        return self.store.names[self.name_id]
+        
+    @property
+    def position(self):
+        """Клетка сущности (x, y)."""
+        store = self.store
+        slot = store.slot_of[self.id]
+        return store.x[slot], store.y[slot]
+        
+    @position.setter
+    def position(self, position):
+        # Обе координаты меняются одним перемещением в индексе занятости
+        self.store.move(self.id, *position)
+        
+    @property
+    def alive(self):
+        """Находится ли сущность все еще в хранилище."""
+        return self.id in self.store
+        
+    def __eq__(self, other):
+        if not isinstance(other, EntityHandle):
+            return NotImplemented
+        return self.store is other.store and self.id == other.id
+        
+    def __hash__(self):
+        return hash(self.id)
+        
+    def __repr__(self):
+        return f"EntityHandle({self.id}, {self.name} в ({self.x}, {self.y}))"
+
+
+for _column in COLUMNS:
+    if _column in ('x', 'y'):
+        setattr(EntityHandle, _column, _position_property(_column))
+    else:
+        setattr(EntityHandle, _column, _column_property(_column))
+
+
+class EntityStore:
+    """
+    Хранилище сущностей в параллельных массивах с удалением перестановкой за O(1).
+    
+    Сущность занимает одну позицию (слот) в каждом столбце; при удалении на ее место
+    переносится последняя сущность. Постоянные идентификаторы не переиспользуются.
+    
+    Индекс занятости (словарь клетка -> идентификатор) обновляется при добавлении,
+    перемещении и удалении; две сущности не могут занимать одну клетку.
+    """
+    
+    def __init__(self):
+        """Инициализация пустого хранилища."""
+        for column in COLUMNS:
+            setattr(self, column, array('i'))
+        self.ids = array('i')  # Идентификатор сущности в каждом слоте
+        self.slot_of = array('i')  # Слот по идентификатору, -1 для удаленных
+        self.names = []
+        self._name_ids = {}
+        self.occupancy = {}  # Идентификатор сущности по ключу клетки cell_key(x, y)
+        
+    @classmethod
+    def from_arrays(cls, ids, slot_of, columns, names):
+        """
+        Восстановить хранилище из готовых массивов (например, при загрузке сохранения).
+        
+        Args:
+            ids (array): Идентификатор сущности в каждом слоте
+            slot_of (array): Слот по идентификатору, -1 для удаленных
+            columns (dict): Массивы array('i') по именам столбцов COLUMNS
+            names (list): Имена сущностей по номерам name_id
+            
+        Returns:
+            EntityStore: Хранилище, использующее переданные массивы без копирования
+            
+        Raises:
+            ValueError: Если сущности занимают одну клетку
+        """
+        store = cls()
+        for column in COLUMNS:
+            setattr(store, column, columns[column])
+        store.ids = ids
+        store.slot_of = slot_of
+        for name in names:
+            store.register_name(name)
+        store.occupancy = dict(zip(map(cell_key, store.x, store.y), ids))
+        if len(store.occupancy) != len(ids):
+            raise ValueError("Сущности в сохранении накладываются друг на друга")
+        return store
+        
+    def __len__(self):
+        return len(self.ids)
+        
+    def __contains__(self, entity_id):
+        if isinstance(entity_id, EntityHandle):
+            entity_id = entity_id.id
+        return 0 <= entity_id < len(self.slot_of) and self.slot_of[entity_id] != -1
+        
+    def __iter__(self):
+        """Перебор описателей; хранилище можно менять во время перебора."""
+        for entity_id in self.ids.tolist():
+            if self.slot_of[entity_id] != -1:
+                yield EntityHandle(self, entity_id)
+                
+    def register_name(self, name):
+        """Номер имени сущности (имена регистрируются при первом обращении)."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self._name_ids[name] = name_id
+            self.names.append(name)
+        return name_id
+        
+    def add(self, name, x, y, hp, max_hp, sp, max_sp, dmg, arm, type_id):
+        """
+        Добавить сущность.
+        
+        Args:
+            name (str): Имя типа сущности
+            x (int): X-координата
+            y (int): Y-координата
+            hp, max_hp, sp, max_sp, dmg, arm (int): Характеристики
+            type_id (int): Идентификатор шаблона (например, ENEMY_GOBLIN)
+            
+        Returns:
+            EntityHandle: Описатель добавленной сущности
+        """
+        key = cell_key(x, y)
+        if key in self.occupancy:
+            raise ValueError(f"Клетка ({x}, {y}) уже занята")
+        entity_id = len(self.slot_of)
+        self.occupancy[key] = entity_id
+        self.slot_of.append(len(self.ids))
+        self.ids.append(entity_id)
+        values = (x, y, hp, max_hp, sp, max_sp, dmg, arm, type_id, self.register_name(name))
+        for column, value in zip(COLUMNS, values):
+            getattr(self, column).append(value)
+        return EntityHandle(self, entity_id)
+        
+    def add_entity(self, entity):
+        """
+        Перенести в хранилище характеристики готовой сущности (например, Enemy).
+        
+        Returns:
+            EntityHandle: Описатель добавленной сущности
+        """
+        return self.add(entity.name, entity.x, entity.y, entity.hp, entity.max_hp,
+                        entity.sp, entity.max_sp, entity.dmg, entity.arm, entity.type_id)
+                        
+    def add_entities(self, entities):
+        """
+        Перенести в хранилище пакет готовых сущностей (например, из Enemy.spawn_many).
+        
+        Столбцы дополняются целиком, а не по одной сущности.
+        
+        Returns:
+            list: Описатели добавленных сущностей
+        """
+        entities = list(entities)
+        first_id = len(self.slot_of)
+        cells = {}
+        for entity_id, entity in enumerate(entities, first_id):
+            key = cell_key(entity.x, entity.y)
+            if key in self.occupancy or key in cells:
+                raise ValueError(f"Клетка ({entity.x}, {entity.y}) уже занята")
+            cells[key] = entity_id
+        self.occupancy.update(cells)
+        first_slot = len(self.ids)
+        count = len(entities)
+        self.slot_of.extend(range(first_slot, first_slot + count))
+        self.ids.extend(range(first_id, first_id + count))
+        for column in COLUMNS:
+            if column == 'name_id':
+                values = [self.register_name(entity.name) for entity in entities]
+            else:
+                values = [getattr(entity, column) for entity in entities]
+            getattr(self, column).extend(values)
+        return [EntityHandle(self, entity_id) for entity_id in range(first_id, first_id + count)]
+        
+    def handle(self, entity_id):
+        """Описатель сущности по идентификатору."""
+        return EntityHandle(self, entity_id)
+        
+    def remove(self, entity):
+        """
+        Удалить сущность, переместив последнюю сущность на ее слот.
+        
+        Args:
+            entity (EntityHandle или int): Описатель или идентификатор сущности
+        """
+        entity_id = entity.id if isinstance(entity, EntityHandle) else entity
+        slot = self.slot_of[entity_id]
+        if slot == -1:
+            raise ValueError(f"Сущность {entity_id} отсутствует в хранилище")
+        del self.occupancy[cell_key(self.x[slot], self.y[slot])]
+        last = len(self.ids) - 1
+        if slot != last:
+            moved_id = self.ids[last]
+            self.ids[slot] = moved_id
+            self.slot_of[moved_id] = slot
+            for column in COLUMNS:
+                values = getattr(self, column)
+                values[slot] = values[last]
+        for column in COLUMNS:
+            getattr(self, column).pop()
+        self.ids.pop()
+        self.slot_of[entity_id] = -1
+        
+    def move(self, entity, x, y):
+        """
+        Переместить сущность на клетку, обновив индекс занятости.
+        
+        Args:
+            entity (EntityHandle или int): Описатель или идентификатор сущности
+            x (int): Новая X-координата
+            y (int): Новая Y-координата
+        """
+        entity_id = entity.id if isinstance(entity, EntityHandle) else entity
+        slot = self.slot_of[entity_id]
+        old_key = cell_key(self.x[slot], self.y[slot])
+        key = cell_key(x, y)
+        if old_key == key:
+            return
+        if key in self.occupancy:
+            raise ValueError(f"Клетка ({x}, {y}) уже занята")
+        del self.occupancy[old_key]
+        self.occupancy[key] = entity_id
+        self.x[slot] = x
+        self.y[slot] = y
+        
+    def move_slots(self, slots, new_x, new_y, old_keys=None, new_keys=None):
+        """
+        Переместить сразу несколько сущностей (например, после пакетного хода).
+        
+        Сначала освобождаются все старые клетки, затем занимаются новые, поэтому
+        сущность может войти в клетку, которую в этом же пакете покидает другая.
+        
+        Args:
+            slots (list или numpy.ndarray): Слоты перемещаемых сущностей
+            new_x (list или numpy.ndarray): Новые X-координаты
+            new_y (list или numpy.ndarray): Новые Y-координаты
+            old_keys (list): Ключи cell_key старых клеток, если уже вычислены
+            new_keys (list): Ключи cell_key новых клеток, если уже вычислены
+        """
+        xs, ys, ids = self.x, self.y, self.ids
+        if np is not None and isinstance(slots, np.ndarray):
+            # Столбцы записываются через представления NumPy без копирования
+            if old_keys is None:
+                old_keys = ((np.frombuffer(ys, dtype=np.intc)[slots].astype(np.int64) << 32) +
+                            np.frombuffer(xs, dtype=np.intc)[slots]).tolist()
+            if new_keys is None:
+                new_keys = ((np.asarray(new_y, dtype=np.int64) << 32) + new_x).tolist()
+            for column, values in ((xs, new_x), (ys, new_y)):
+                view = np.frombuffer(column, dtype=np.intc)
+                view[slots] = values
+                del view  # Пока представление существует, размер массива нельзя менять
+            moved_ids = np.frombuffer(ids, dtype=np.intc)[slots].tolist()
+        else:
+            if old_keys is None:
+                old_keys = [cell_key(xs[slot], ys[slot]) for slot in slots]
+            if new_keys is None:
+                new_keys = list(map(cell_key, new_x, new_y))
+            # Обход через map() без явного цикла заметно быстрее на десятках тысяч сущностей
+            deque(map(xs.__setitem__, slots, new_x), 0)
+            deque(map(ys.__setitem__, slots, new_y), 0)
+            moved_ids = [ids[slot] for slot in slots]
+            
+        occupancy = self.occupancy
+        deque(map(occupancy.__delitem__, old_keys), 0)
+        occupancy.update(zip(new_keys, moved_ids))
+        if len(occupancy) != len(ids):
+            raise ValueError("Перемещение привело к наложению сущностей")
+            
+    def find_at(self, x, y):
+        """
+        Найти сущность на клетке по индексу занятости за O(1).
+        
+        Returns:
+            EntityHandle: Описатель сущности или None
+        """
+        entity_id = self.occupancy.get(cell_key(x, y))
+        if entity_id is None:
+            return None
+        return EntityHandle(self, entity_id)
+        
+    def within(self, x, y, radius):
+        """
+        Найти сущности на расстоянии не больше radius (по Манхэттену) от клетки.
+        
+        Проверяются клетки ромба вокруг (x, y), поэтому время зависит от радиуса,
+        а не от количества сущностей.
+        
+        Args:
+            x (int): X-координата центра
+            y (int): Y-координата центра
+            radius (int): Радиус поиска
+            
+        Returns:
+            list: Описатели найденных сущностей
+        """
+        occupancy = self.occupancy
+        found = []
+        for dy in range(-radius, radius + 1):
+            span = radius - abs(dy)
+            for dx in range(-span, span + 1):
+                entity_id = occupancy.get(cell_key(x + dx, y + dy))
+                if entity_id is not None:
+                    found.append(EntityHandle(self, entity_id))
+        return found
+        
+    def in_rect(self, left, top, right, bottom):
+        """
+        Найти сущности в прямоугольнике left <= x < right, top <= y < bottom.
+        
+        Если сущностей меньше, чем клеток в прямоугольнике, перебираются сами
+        сущности, иначе клетки прямоугольника по индексу занятости, поэтому время
+        не превышает меньшего из двух.
+        
+        Args:
+            left (int): X-координата левого края
+            top (int): Y-координата верхнего края
+            right (int): X-координата за правым краем
+            bottom (int): Y-координата за нижним краем
+            
+        Returns:
+            list: Описатели найденных сущностей
+        """
+        if right <= left or bottom <= top:
+            return []
+        if len(self) <= (right - left) * (bottom - top):
+            return [EntityHandle(self, entity_id)
+                    for entity_id, x, y in zip(self.ids, self.x, self.y)
+                    if left <= x < right and top <= y < bottom]
+        occupancy = self.occupancy
+        found = []
+        for y in range(top, bottom):
+            # Ключи клеток одной строки идут подряд
+            row_start = cell_key(left, y)
+            for key in range(row_start, row_start + right - left):
+                entity_id = occupancy.get(key)
+                if entity_id is not None:
+                    found.append(EntityHandle(self, entity_id))
+        return found
+        
+    def any_within(self, x, y, radius):
+        """
+        Есть ли хотя бы одна сущность на расстоянии не больше radius (по Манхэттену).
+        
+        Если сущностей меньше, чем клеток в ромбе, дешевле перебрать сами сущности,
+        иначе проверяются клетки ромба по индексу занятости.
+        
+        Args:
+            x (int): X-координата центра
+            y (int): Y-координата центра
+            radius (int): Радиус поиска
+            
+        Returns:
+            bool: Найдена ли сущность
+        """
+        if len(self) <= 2 * radius * (radius + 1) + 1:
+            return any(abs(entity_x - x) + abs(entity_y - y) <= radius
+                       for entity_x, entity_y in zip(self.x, self.y))
+        return bool(self.within(x, y, radius))
@@ -0,0 +1,212 @@
+"""
+Модуль журнала событий игры.
+
+События хранятся компактно: код события и до EVENT_ARGS целых аргументов (имена
+сущностей - номерами в таблице имен журнала). Журнал - кольцевой буфер
+фиксированной емкости, поэтому память не растет со временем игры, а текст
+сообщения форматируется только тогда, когда его показывают или выгружают.
+Полный журнал при необходимости пишется на диск в формате JSON Lines.
+"""
+import json
+from array import array
+
+# Емкость кольцевого буфера по умолчанию (в событиях)
+LOG_CAPACITY = 256
+
+# Максимальное количество целых аргументов события
+EVENT_ARGS = 3
+
+_PADDING = (0,) * EVENT_ARGS
+
+# Коды событий
+EV_MORE_ENEMIES = 0
+EV_GAME_STARTED = 1
+EV_PLAYER_CREATED = 2
+EV_WALL = 3
+EV_MOVED = 4
+EV_ATTACK = 5
+EV_ARMOR = 6
+EV_HP_LEFT = 7
+EV_SPELL = 8
+EV_CRIT = 9
+EV_ENEMY_DEFEATED = 10
+EV_PLAYER_DEFEATED = 11
+EV_VICTORY = 12
+EV_DEBUG_ON = 13
+EV_DEBUG_OFF = 14
+EV_PRESS_ANY_KEY = 15
+EV_AUTO_ENEMY = 16
+EV_NO_PATH = 17
+EV_EXPLORED = 18
+EV_ARRIVED = 19
+EV_AUTO_STOPPED = 20
+EV_FEWER_ENEMIES = 21
+EV_OUTSIDE_MAP = 22
+
+# Описание событий: имя (для выгрузки), шаблон сообщения и номера аргументов-имен
+EVENTS = {
+    EV_MORE_ENEMIES: ("more_enemies", "Режим с увеличенным количеством врагов активирован!", ()),
+    EV_GAME_STARTED: ("game_started", "Игра началась. Используйте WASD или стрелки для перемещения.", ()),
+    EV_PLAYER_CREATED: ("player_created", "Игрок {0} создан как {1}.", (0, 1)),
+    EV_WALL: ("wall", "Вы не можете проходить сквозь стены!", ()),
+    EV_MOVED: ("moved", "Переместились в ({0}, {1})", ()),
+    EV_ATTACK: ("attack", "{0} атакует {1} и наносит {2} урона!", (0, 1)),
+    EV_ARMOR: ("armor", "Броня {0} поглотила {1} урона.", (0,)),
+    EV_HP_LEFT: ("hp_left", "У {0} осталось {1}/{2} ОЗ.", (0,)),
+    EV_SPELL: ("spell", "{0} творит магическую стрелу на {1} дополнительного урона!", (0,)),
+    EV_CRIT: ("crit", "{0} наносит критический удар на {1} дополнительного урона!", (0,)),
+    EV_ENEMY_DEFEATED: ("enemy_defeated", "{0} побежден!", (0,)),
+    EV_PLAYER_DEFEATED: ("player_defeated", "Вы побеждены!", ()),
+    EV_VICTORY: ("victory", "Поздравляем! Вы победили всех врагов!", ()),
+    EV_DEBUG_ON: ("debug_on", "Режим отладки включен", ()),
+    EV_DEBUG_OFF: ("debug_off", "Режим отладки выключен", ()),
+    EV_PRESS_ANY_KEY: ("press_any_key", "Нажмите любую клавишу для выхода...", ()),
+    EV_AUTO_ENEMY: ("auto_enemy", "Рядом враг - автоматическое перемещение остановлено.", ()),
+    EV_NO_PATH: ("no_path", "Путь в ({0}, {1}) не найден.", ()),
+    EV_EXPLORED: ("explored", "Все доступные места исследованы.", ()),
+    EV_ARRIVED: ("arrived", "Вы пришли в ({0}, {1}).", ()),
+    EV_AUTO_STOPPED: ("auto_stopped", "Автоматическое перемещение прервано (ходов: {0}).", ()),
+    EV_FEWER_ENEMIES: ("fewer_enemies", "На карте поместилось только {0} врагов из {1}.", ()),
+    EV_OUTSIDE_MAP: ("outside_map", "Путь не найден: такой клетки нет на карте.", ()),
+}
+
+
+class EventLog:
+    """
+    Кольцевой буфер последних событий игры.
+    
+    Каждое событие получает порядковый номер (seq); в буфере остаются последние
+    capacity событий, более старые вытесняются (но уже записаны в файл, если он задан).
+    """
+    
+    def __init__(self, capacity=LOG_CAPACITY, path=None):
+        """
+        Инициализация журнала.
+        
+        Args:
+            capacity (int): Сколько последних событий хранить в памяти
+            path (str): Файл для полного журнала в формате JSON Lines (None - не писать)
+        """
+        self.capacity = capacity
+        self.codes = bytearray(capacity)
+        self.args = array('i', [0]) * (capacity * EVENT_ARGS)
+        self.total = 0  # Сколько событий добавлено за все время (номер следующего события)
+        self.names = []
+        self._name_ids = {}
+        self.sink = open(path, 'w', encoding='utf-8') if path else None
+        
+    def name_id(self, name):
+        """Номер имени в таблице имен журнала (имя добавляется при первом обращении)."""
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_ids[name] = name_id
+        return name_id
+        
+    def add(self, code, *args):
+        """
+        Добавить событие.
+        
+        Args:
+            code (int): Код события EV_*
+            *args (int): Аргументы события (имена - номерами из name_id)
+        """
+        slot = self.total % self.capacity
+        self.codes[slot] = code
+        start = slot * EVENT_ARGS
+        # Неиспользуемые аргументы обнуляются, чтобы не осталось значений вытесненного события
+        self.args[start:start + EVENT_ARGS] = array('i', args + _PADDING[len(args):])
+        if self.sink is not None:
+            self._write(self.total, code, args)
+        self.total += 1
+        
+    def __len__(self):
+        return min(self.total, self.capacity)
+        
+    def event(self, seq):
+        """
+        Событие по порядковому номеру.
+        
+        Args:
+            seq (int): Номер события
+            
+        Returns:
+            tuple: (код, аргументы)
+            
+        Raises:
+            IndexError: Если событие еще не добавлено или уже вытеснено из буфера
+        """
+        if not (self.total - len(self) <= seq < self.total):
+            raise IndexError(f"События {seq} нет в журнале")
+        slot = seq % self.capacity
+        code = self.codes[slot]
+        start = slot * EVENT_ARGS
+        return code, tuple(self.args[start:start + EVENT_ARGS])
+        
+    def since(self, seq):
+        """
+        События, добавленные начиная с номера seq (вытесненные пропускаются).
+        
+        Returns:
+            list: События (код, аргументы) в порядке добавления
+        """
+        first = max(seq, self.total - len(self))
+        return [self.event(index) for index in range(first, self.total)]
+        
+    def recent(self, count):
+        """Последние count событий (код, аргументы) в порядке добавления."""
+        return self.since(self.total - count)
+        
+    def format(self, code, args):
+        """
+        Текст сообщения для события.
+        
+        Args:
+            code (int): Код события
+            args (tuple): Аргументы события
+            
+        Returns:
+            str: Сообщение
+        """
+        _, template, name_args = EVENTS[code]
+        if name_args:
+            args = list(args)
+            for index in name_args:
+                args[index] = self.names[args[index]]
+        return template.format(*args)
+        
+    def messages(self, count):
+        """Тексты последних count событий."""
+        return [self.format(code, args) for code, args in self.recent(count)]
+        
+    def _write(self, seq, code, args):
+        """Записать событие в файл журнала одной строкой JSON."""
+        name, _, name_args = EVENTS[code]
+        record = {
+            "seq": seq,
+            "event": name,
+            "args": [self.names[value] if index in name_args else value
+                     for index, value in enumerate(args)],
+            "text": self.format(code, args),
+        }
+        self.sink.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+    def open_sink(self, path):
+        """
+        Начать писать полный журнал в файл (например, после загрузки сохранения).
+        
+        Файл дописывается: номера событий продолжают номера сохраненной партии, поэтому
+        журнал, начатый до сохранения, продолжается в том же файле.
+        
+        Args:
+            path (str): Файл журнала в формате JSON Lines
+        """
+        self.close()
+        self.sink = open(path, 'a', encoding='utf-8')
+        
+    def close(self):
+        """Закрыть файл журнала (если он открыт)."""
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
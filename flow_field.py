@@ -0,0 +1,174 @@
+"""
+Модуль поля направлений (карты расстояний до игрока) для преследования врагами.
+"""
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+# Радиус поля в шагах: дальше игрока не преследуют, поэтому поле хранится только вокруг него
+FLOW_RADIUS = 16
+
+# Значение для клеток, недостижимых в пределах радиуса
+UNREACHABLE = 255
+
+
+class FlowField:
+    """
+    Расстояния (в шагах по полу) от каждой клетки окна вокруг игрока до самого игрока.
+    
+    Поле одно на всех врагов: преследующий враг просто шагает в соседнюю клетку,
+    которая на единицу ближе к игроку, поэтому стены он обходит, а стоимость хода
+    не зависит от количества врагов. Поле пересчитывается только при перемещении
+    игрока и только в квадратном окне радиуса radius, а не на всей карте.
+    """
+    
+    def __init__(self, game_map, radius=FLOW_RADIUS):
+        """
+        Инициализация поля.
+        
+        Args:
+            game_map (TileGrid или ChunkedMap): Карта
+            radius (int): Максимальное расстояние, которое хранит поле (не больше 254)
+        """
+        self.game_map = game_map
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.origin = None  # Позиция игрока, для которой построено поле
+        self.left = 0
+        self.top = 0
+        self.distances = bytearray([UNREACHABLE]) * (self.size * self.size)
+        self.updates = 0  # Сколько раз поле перестраивалось
+        
+    def update(self, x, y):
+        """
+        Обновить поле для позиции игрока (если игрок не перемещался, ничего не делается).
+        
+        Args:
+            x (int): X-координата игрока
+            y (int): Y-координата игрока
+            
+        Returns:
+            bool: Было ли поле перестроено
+        """
+        if self.origin == (x, y):
+            return False
+        self.origin = (x, y)
+        self.left = x - self.radius
+        self.top = y - self.radius
+        self.updates += 1
+        
+        size = self.size
+        game_map = self.game_map
+        distances = bytearray([UNREACHABLE]) * (size * size)
+        start = self.radius * size + self.radius
+        distances[start] = 0
+        
+        # Поиск в ширину от игрока, ограниченный радиусом
+        queue = deque([(x, y, start)])
+        while queue:
+            cell_x, cell_y, index = queue.popleft()
+            distance = distances[index] + 1
+            if distance > self.radius:
+                continue
+            for dx, dy, offset in ((0, -1, -size), (0, 1, size), (-1, 0, -1), (1, 0, 1)):
+                next_index = index + offset
+                next_x = cell_x + dx
+                next_y = cell_y + dy
+                # Окно достаточно велико: за радиус поиск не выходит, поэтому индексы корректны
+                if distances[next_index] != UNREACHABLE:
+                    continue
+                if not game_map.in_bounds(next_x, next_y) or game_map.is_wall(next_x, next_y):
+                    continue
+                distances[next_index] = distance
+                queue.append((next_x, next_y, next_index))
+                
+        self.distances = distances
+        return True
+        
+    def distance(self, x, y):
+        """
+        Расстояние от клетки до игрока.
+        
+        Returns:
+            int: Количество шагов или None, если клетка вне поля или недостижима
+        """
+        local_x = x - self.left
+        local_y = y - self.top
+        if not (0 <= local_x < self.size and 0 <= local_y < self.size):
+            return None
+        distance = self.distances[local_y * self.size + local_x]
+        return None if distance == UNREACHABLE else distance
+        
+    def _preferred_steps(self, x, y, x_first):
+        """Соседние шаги в порядке предпочтения: сначала к игроку по выбранной оси."""
+        origin_x, origin_y = self.origin
+        sx = 1 if x <= origin_x else -1
+        sy = 1 if y <= origin_y else -1
+        if x_first:
+            return (sx, 0), (0, sy), (-sx, 0), (0, -sy)
+        return (0, sy), (sx, 0), (0, -sy), (-sx, 0)
+        
+    def step(self, x, y, x_first):
+        """
+        Шаг вниз по полю из клетки.
+        
+        Args:
+            x (int): X-координата врага
+            y (int): Y-координата врага
+            x_first (bool): Предпочитать горизонтальный шаг, если подходят оба
+            
+        Returns:
+            tuple: Шаг (dx, dy) или None, если клетка вне поля
+        """
+        distance = self.distance(x, y)
+        if not distance:
+            return None
+        for dx, dy in self._preferred_steps(x, y, x_first):
+            if self.distance(x + dx, y + dy) == distance - 1:
+                return dx, dy
+        return None
+        
+    def steps(self, xs, ys, x_first):
+        """
+        Шаги вниз по полю сразу для массива клеток (NumPy).
+        
+        Args:
+            xs (numpy.ndarray): X-координаты
+            ys (numpy.ndarray): Y-координаты
+            x_first (numpy.ndarray): Предпочтение горизонтального шага для каждой клетки
+            
+        Returns:
+            tuple: Массивы (dx, dy) и маска клеток, для которых шаг найден
+        """
+        size = self.size
+        field = np.frombuffer(self.distances, dtype=np.uint8).reshape(size, size)
+        
+        def lookup(cell_x, cell_y):
+            local_x = cell_x - self.left
+            local_y = cell_y - self.top
+            inside = (local_x >= 0) & (local_x < size) & (local_y >= 0) & (local_y < size)
+            values = np.full(local_x.shape, UNREACHABLE, dtype=np.int64)
+            values[inside] = field[local_y[inside], local_x[inside]]
+            return values
+            
+        origin_x, origin_y = self.origin
+        distance = lookup(xs, ys)
+        sx = np.where(xs <= origin_x, 1, -1)
+        sy = np.where(ys <= origin_y, 1, -1)
+        zero = np.zeros_like(sx)
+        
+        # Четыре соседних шага в порядке предпочтения (как в _preferred_steps)
+        x_first = x_first[:, None]
+        step_x = np.where(x_first, np.stack([sx, zero, -sx, zero], axis=1),
+                          np.stack([zero, sx, zero, -sx], axis=1))
+        step_y = np.where(x_first, np.stack([zero, sy, zero, -sy], axis=1),
+                          np.stack([sy, zero, -sy, zero], axis=1))
+        descends = lookup(xs[:, None] + step_x, ys[:, None] + step_y) == (distance - 1)[:, None]
+        
+        found = descends.any(axis=1) & (distance != UNREACHABLE) & (distance > 0)
+        choice = np.argmax(descends, axis=1)
+        rows = np.arange(len(xs))
+        return step_x[rows, choice], step_y[rows, choice], found
@@ -0,0 +1,162 @@
+"""
+Модуль поля зрения (FOV) на основе рекурсивного отбрасывания теней (shadowcasting).
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+# Радиус обзора игрока в клетках (по евклидову расстоянию)
+FOV_RADIUS = 8
+
+# Преобразования координат для восьми октантов: (xx, xy, yx, yy)
+_OCTANTS = (
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+)
+
+
+class FieldOfView:
+    """
+    Клетки, видимые из позиции игрока, в квадратном окне радиуса radius вокруг него.
+    
+    Результат кэшируется: пересчет выполняется, только если игрок переместился или
+    карта изменилась (по счетчику version). Видимость считается симметричной: враг видит
+    игрока, если игрок видит клетку врага, поэтому проверка для врага - это чтение
+    одного байта, без отдельного луча для каждого врага.
+    """
+    
+    def __init__(self, game_map, radius=FOV_RADIUS):
+        """
+        Инициализация поля зрения.
+        
+        Args:
+            game_map (TileGrid или ChunkedMap): Карта
+            radius (int): Радиус обзора
+        """
+        self.game_map = game_map
+        self.radius = radius
+        self.size = 2 * radius + 1
+        self.origin = None  # Позиция, для которой вычислено поле зрения
+        self.map_version = None  # Версия карты, для которой вычислено поле зрения
+        self.left = 0
+        self.top = 0
+        self.visible = bytearray(self.size * self.size)
+        self.updates = 0  # Сколько раз поле зрения пересчитывалось
+        
+    def invalidate(self):
+        """Сбросить кэш (например, если карта изменилась в обход set())."""
+        self.origin = None
+        
+    def update(self, x, y):
+        """
+        Вычислить поле зрения из клетки, если кэш устарел.
+        
+        Args:
+            x (int): X-координата игрока
+            y (int): Y-координата игрока
+            
+        Returns:
+            bool: Было ли поле зрения пересчитано
+        """
+        version = getattr(self.game_map, 'version', 0)
+        if self.origin == (x, y) and self.map_version == version:
+            return False
+        self.origin = (x, y)
+        self.map_version = version
+        self.left = x - self.radius
+        self.top = y - self.radius
+        self.updates += 1
+        
+        self.visible = bytearray(self.size * self.size)
+        self._mark(x, y)
+        for xx, xy, yx, yy in _OCTANTS:
+            self._cast_light(x, y, 1, 1.0, 0.0, xx, xy, yx, yy)
+        return True
+        
+    def _mark(self, x, y):
+        """Отметить клетку как видимую."""
+        self.visible[(y - self.top) * self.size + (x - self.left)] = 1
+        
+    def _blocks_light(self, x, y):
+        """Непрозрачна ли клетка (стены и все за пределами карты)."""
+        return not self.game_map.in_bounds(x, y) or self.game_map.is_wall(x, y)
+        
+    def _cast_light(self, cx, cy, row, start, end, xx, xy, yx, yy):
+        """
+        Просмотреть один октант начиная со строки row между наклонами start и end.
+        
+        Встретив стену, функция рекурсивно продолжает просмотр для открытой части
+        октанта и сужает текущий диапазон наклонов до тени за стеной.
+        """
+        if start < end:
+            return
+        radius = self.radius
+        radius_squared = radius * radius
+        new_start = start
+        for distance in range(row, radius + 1):
+            dx = -distance - 1
+            dy = -distance
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                # Переход из координат октанта в координаты карты
+                map_x = cx + dx * xx + dy * xy
+                map_y = cy + dx * yx + dy * yy
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                    
+                if dx * dx + dy * dy <= radius_squared:
+                    self._mark(map_x, map_y)
+                    
+                if blocked:
+                    if self._blocks_light(map_x, map_y):
+                        new_start = right_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif self._blocks_light(map_x, map_y) and distance < radius:
+                    # Стена: открытую часть за ней просматриваем рекурсивно
+                    blocked = True
+                    self._cast_light(cx, cy, distance + 1, start, left_slope, xx, xy, yx, yy)
+                    new_start = right_slope
+            if blocked:
+                break
+                
+    def is_visible(self, x, y):
+        """Видна ли клетка из позиции игрока."""
+        local_x = x - self.left
+        local_y = y - self.top
+        if not (0 <= local_x < self.size and 0 <= local_y < self.size):
+            return False
+        return self.visible[local_y * self.size + local_x] == 1
+        
+    def visible_mask(self, xs, ys):
+        """
+        Видимость сразу для массива клеток (NumPy).
+        
+        Args:
+            xs (numpy.ndarray): X-координаты
+            ys (numpy.ndarray): Y-координаты
+            
+        Returns:
+            numpy.ndarray: Булева маска видимых клеток
+        """
+        size = self.size
+        local_x = xs - self.left
+        local_y = ys - self.top
+        inside = (local_x >= 0) & (local_x < size) & (local_y >= 0) & (local_y < size)
+        mask = np.zeros(len(xs), dtype=bool)
+        window = np.frombuffer(self.visible, dtype=np.uint8).reshape(size, size)
+        mask[inside] = window[local_y[inside], local_x[inside]] == 1
+        return mask
+        
+    def visible_cells(self):
+        """Все видимые клетки: список (x, y)."""
+        size = self.size
+        return [(self.left + index % size, self.top + index // size)
+                for index, flag in enumerate(self.visible) if flag]
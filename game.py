@@ -1,34 +1,76 @@
 """
-Игровой модуль, содержащий основной класс Game, который управляет состоянием игры.
+Игровой модуль, содержащий класс Game - терминальный интерфейс к игровому движку.
 """
-import os
-import sys
-import random
-from time import sleep
+from collections import deque
 
-from map_generator import generate_standard_map, generate_random_map
-from entities import Player, Enemy
+from map_cache import MapCache
+from entities import ENEMY_CHARS
 from ui import UI
-from combat import process_combat
+from engine import GameConfig, new_game, MAP_STANDARD, MAP_RANDOM, MAP_WORLD
+from rng import new_seed
+from event_log import EV_DEBUG_ON, EV_DEBUG_OFF, EV_PRESS_ANY_KEY
+from event_log import EV_AUTO_ENEMY, EV_NO_PATH, EV_EXPLORED, EV_ARRIVED, EV_AUTO_STOPPED, EV_OUTSIDE_MAP
+from savegame import Autosave, load_game
+from replay import ReplayRecorder
+from renderer import FrameRenderer, MapLayer, PROMPT_LINES
+from viewport import Viewport, Minimap, MIN_VIEW_WIDTH, MIN_VIEW_HEIGHT
+from tiles import TILE_FLOOR
+from profiler import PROFILER
+from travel import travel, explore
+from travel import STOP_ARRIVED, STOP_EXPLORED, STOP_NO_PATH, STOP_ENEMY, STOP_INTERRUPTED, STOP_LIMIT
+
+# Сколько нажатий может ждать выполнения (лишние отбрасываются)
+MAX_QUEUED_ACTIONS = 16
+
+# Сколько врагов перечислять в режиме отладки
+DEBUG_ENEMY_LIMIT = 10
+
+# Сколько ступеней сокращения у блока под картой (см. Game.status_lines)
+STATUS_COMPACT_LEVELS = 4
+
+# Через сколько ходов дописывать изменения в журнал автосохранения
+AUTOSAVE_INTERVAL = 10
+
+# Типы карт по выбору в меню
+MAP_CHOICES = {'1': MAP_STANDARD, '2': MAP_RANDOM, '3': MAP_WORLD}
 
 
 class Game:
     """
-    Основной игровой класс, управляющий состоянием игры, включая игрока, врагов,
-    карту и игровой цикл.
+    Основной игровой класс: получает ввод через UI, передает действия движку
+    GameEngine и отображает его состояние на консоли.
     """
-    def __init__(self):
-        """Инициализация игрового состояния."""
+    def __init__(self, seed=None, log_path=None, save_path=None, replay_path=None):
+        """
+        Инициализация игрового состояния.
+        
+        Args:
+            seed (int): Зерно игры, из которого выводятся все случайные события (None - случайное)
+            log_path (str): Файл для полного журнала событий в формате JSON Lines (None - не писать)
+            save_path (str): Файл автосохранения (None - не сохранять)
+            replay_path (str): Файл записи партии для воспроизведения (None - не записывать)
+        """
+        self.seed = seed if seed is not None else new_seed()
+        self.log_path = log_path
+        self.save_path = save_path
+        self.autosave = None
+        self.replay_path = replay_path
+        self.recorder = None
         self.running = False
-        self.current_map = None
-        self.map_width = 0
-        self.map_height = 0
-        self.player = None
-        self.enemies = []
-        self.turn = 0
+        self.engine = None
+        self.explored = None  # Клетки, которые игрок уже видел (по байту на клетку)
+        self.explored_fov_updates = -1  # Номер пересчета поля зрения, уже учтенного в explored
         self.ui = UI()
+        self.renderer = FrameRenderer()
+        self.map_layer = MapLayer()
+        self.viewport = Viewport()
+        self.minimap = None  # Строится при первом показе мини-карты
+        self.show_minimap = False
+        self.newly_explored = []  # Клетки, исследованные после прошлого кадра
+        self.pending_actions = deque()  # Нажатия, еще не выполненные как ходы
         self.debug_mode = False
-        self.message_log = []
+        self.debug_profiling = False  # Профилировщик включен режимом отладки
+        self.map_cache = MapCache()
         
     def start(self):
         """Начать новую игру."""
@@ -44,340 +86,353 @@ class Game:
         more_enemies = False
         if map_choice.lower() == 'more':
             more_enemies = True
-            self.message_log.append("Режим с увеличенным количеством врагов активирован!")
             map_choice = self.ui.get_map_choice()  # Получить выбор карты снова
-        
-        if map_choice == '1':
-            # Стандартная карта
-            self.current_map = generate_standard_map()
-            self.map_width = len(self.current_map[0])
-            self.map_height = len(self.current_map)
-        else:
+            
+        config = GameConfig(map_type=MAP_CHOICES.get(map_choice, MAP_RANDOM), more_enemies=more_enemies)
+        if config.map_type == MAP_RANDOM:
             # Случайная карта с размером, указанным игроком
-            width = self.ui.get_map_size("width")
-            height = self.ui.get_map_size("height")
-            self.current_map = generate_random_map(width, height)
-            self.map_width = width
-            self.map_height = height
+            config.width = self.ui.get_map_size("width")
+            config.height = self.ui.get_map_size("height")
             
         # Создание игрока
-        player_name = self.ui.get_player_name()
-        player_class = self.ui.get_player_class()
-        
-        # Поиск подходящей начальной позиции для игрока
-        player_x, player_y = self.find_valid_position()
-        self.player = Player(player_name, player_class, player_x, player_y)
-        
-        # Добавление врагов на карту
-        if more_enemies:
-            self.spawn_enemies(8 + random.randint(0, 4))  # 8-12 врагов
-        else:
-            self.spawn_enemies(5 + random.randint(0, 3))  # 5-8 врагов
-        
-        # Добавление сообщений в лог
-        self.message_log.append("Игра началась. Используйте WASD или стрелки для перемещения.")
-        self.message_log.append(f"Игрок {player_name} создан как {player_class}.")
-        
-    def find_valid_position(self):
-        """Найти подходящую (пустую) позицию на карте."""
-        while True:
-            x = random.randint(1, self.map_width - 2)
-            y = random.randint(1, self.map_height - 2)
-            if self.current_map[y][x] == ' ':
-                return x, y
-    
-    def spawn_enemies(self, num_enemies):
-        """Создать указанное количество врагов на случайных позициях на карте."""
-        enemy_types = ["Гоблин", "Орк", "Тролль", "Скелет"]
+        config.player_name = self.ui.get_player_name()
+        config.player_class = self.ui.get_player_class()
         
-        # Разделим карту на секторы для более равномерного распределения
-        sectors = [
-            (0, 0, self.map_width // 2, self.map_height // 2),  # верхний левый
-            (self.map_width // 2, 0, self.map_width, self.map_height // 2),  # верхний правый
-            (0, self.map_height // 2, self.map_width // 2, self.map_height),  # нижний левый
-            (self.map_width // 2, self.map_height // 2, self.map_width, self.map_height),  # нижний правый
-        ]
-        
-        # Убедимся, что в каждом секторе будет примерно одинаковое количество врагов
-        enemies_per_sector = max(1, num_enemies // 4)
-        remaining = num_enemies - (enemies_per_sector * 4)
-        
-        enemies_count = []
-        for i in range(4):
-            count = enemies_per_sector
-            if remaining > 0:
-                count += 1
-                remaining -= 1
-            enemies_count.append(count)
+        # Карты с одинаковым зерном берутся из дискового кэша, а не генерируются заново
+        self.engine = new_game(config, seed=self.seed, map_cache=self.map_cache, log_path=self.log_path)
+        self.explored = bytearray(self.engine.map_width * self.engine.map_height)
+        if self.save_path:
+            self.autosave = Autosave(self.engine, self.save_path)
+        if self.replay_path:
+            self.recorder = ReplayRecorder(self.engine, self.replay_path)
+            
+    def load(self, path):
+        """
+        Продолжить сохраненную игру (автосохранение продолжается в тот же файл,
+        если не задан другой).
         
-        # Создаем врагов в каждом секторе
-        for i, sector in enumerate(sectors):
-            x1, y1, x2, y2 = sector
-            for _ in range(enemies_count[i]):
-                enemy_type = random.choice(enemy_types)
-                
-                # Пытаемся найти подходящую позицию в текущем секторе
-                attempts = 0
-                while attempts < 50:  # Ограничение попыток, чтобы избежать бесконечного цикла
-                    enemy_x = random.randint(max(1, x1), min(x2 - 1, self.map_width - 2))
-                    enemy_y = random.randint(max(1, y1), min(y2 - 1, self.map_height - 2))
-                    
-                    # Проверка, что позиция валидна и не слишком близко к игроку
-                    if (self.current_map[enemy_y][enemy_x] == ' ' and 
-                        abs(enemy_x - self.player.x) + abs(enemy_y - self.player.y) >= 6):
-                        
-                        # Проверка, что враг не создается рядом с другими врагами
-                        too_close_to_others = False
-                        for other_enemy in self.enemies:
-                            if abs(enemy_x - other_enemy.x) + abs(enemy_y - other_enemy.y) < 3:
-                                too_close_to_others = True
-                                break
-                        
-                        if not too_close_to_others:
-                            enemy = Enemy(enemy_type, enemy_x, enemy_y)
-                            self.enemies.append(enemy)
-                            break
-                    
-                    attempts += 1
-                
-                # Если не удалось найти подходящую позицию в секторе, просто разместим где угодно
-                if attempts >= 50:
-                    enemy_x, enemy_y = self.find_valid_position()
-                    while abs(enemy_x - self.player.x) < 5 and abs(enemy_y - self.player.y) < 5:
-                        enemy_x, enemy_y = self.find_valid_position()
-                    
-                    enemy = Enemy(enemy_type, enemy_x, enemy_y)
-                    self.enemies.append(enemy)
+        Args:
+            path (str): Файл сохранения
+            
+        Raises:
+            ValueError: Если файл не является сохранением поддерживаемого формата
+        """
+        self.engine = load_game(path)
+        if self.log_path:
+            self.engine.log.open_sink(self.log_path)
+        # Партия, из которой вышли клавишей Q, продолжается; оконченная - нет
+        if not self.engine.won and self.engine.player.hp > 0:
+            self.engine.running = True
+        self.running = self.engine.running
+        self.explored = bytearray(self.engine.map_width * self.engine.map_height)
+        self.autosave = Autosave(self.engine, self.save_path or path)
+        if self.replay_path:
+            # Запись начинается с середины партии, поэтому первым идет снимок состояния
+            self.recorder = ReplayRecorder(self.engine, self.replay_path, initial_snapshot=True)
             
     def process_input(self):
-        """Обработка ввода игрока."""
-        action = self.ui.get_player_action()
+        """
+        Обработка ввода игрока.
         
-        # Направления движения
-        if action == 'w':  # Вверх
-            self.move_player(0, -1)
-        elif action == 's':  # Вниз
-            self.move_player(0, 1)
-        elif action == 'a':  # Влево
-            self.move_player(-1, 0)
-        elif action == 'd':  # Вправо
-            self.move_player(1, 0)
-        elif action == 'q':  # Выход
-            self.running = False
-        elif action == 'debug':  # Переключение режима отладки
-            self.debug_mode = not self.debug_mode
-            self.message_log.append(f"Режим отладки {'включен' if self.debug_mode else 'выключен'}")
-            
-    def move_player(self, dx, dy):
+        Нажатия, накопившиеся к моменту чтения и во время их выполнения, выполняются
+        подряд как отдельные ходы, а кадр выводится один раз - после последнего из них.
         """
-        Попытка переместить игрока в указанном направлении.
+        pending = self.pending_actions
+        with PROFILER.phase("loop.input"):
+            self.queue_actions(self.ui.get_player_actions())
+        while pending and self.engine.running:
+            self.perform_action(pending.popleft())
+            if not pending:
+                self.queue_actions(self.ui.poll_player_actions())
+        pending.clear()
         
-        Args:
-            dx (int): Изменение x-координаты
-            dy (int): Изменение y-координаты
+    def queue_actions(self, actions):
         """
-        new_x = self.player.x + dx
-        new_y = self.player.y + dy
+        Добавить действия в очередь.
         
-        # Проверка, находится ли новая позиция в пределах карты
-        if 0 <= new_x < self.map_width and 0 <= new_y < self.map_height:
-            # Проверка столкновения со стеной
-            if self.current_map[new_y][new_x] == '#':
-                self.message_log.append("Вы не можете проходить сквозь стены!")
-                return
+        Нажатия сверх MAX_QUEUED_ACTIONS отбрасываются, чтобы при удержании клавиши
+        на медленных ходах игрок не продолжал идти после ее отпускания.
+        """
+        free = MAX_QUEUED_ACTIONS - len(self.pending_actions)
+        self.pending_actions.extend(actions[:free])
+        PROFILER.count("input.actions", len(actions))
+        if len(actions) > free:
+            PROFILER.count("input.dropped", len(actions) - free)
             
-            # Проверка столкновения с врагом
-            enemy_at_pos = self.get_enemy_at_position(new_x, new_y)
-            if enemy_at_pos:
-                # Начать бой с врагом
-                combat_result = process_combat(self.player, enemy_at_pos)
-                for message in combat_result["messages"]:
-                    self.message_log.append(message)
-                
-                # Проверка, побежден ли враг
-                if enemy_at_pos.hp <= 0:
-                    self.message_log.append(f"{enemy_at_pos.name} побежден!")
-                    self.enemies.remove(enemy_at_pos)
-                
-                # Если игрок побежден, завершить игру
-                if self.player.hp <= 0:
-                    self.message_log.append("Вы побеждены!")
-                    self.running = False
-                    return
-            else:
-                # Переместить игрока
-                self.player.x = new_x
-                self.player.y = new_y
-                self.message_log.append(f"Переместились в ({new_x}, {new_y})")
-                
-            # Игрок переместился или атаковал, завершить его ход
-            self.complete_turn()
-    
-    def get_enemy_at_position(self, x, y):
+    def perform_action(self, action):
         """
-        Проверить, есть ли враг на указанной позиции.
+        Выполнить одно действие игрока.
         
         Args:
-            x (int): X-координата
-            y (int): Y-координата
-            
+            action (str или tuple): Ход ('w', 'a', 's', 'd', 'q'), команда 'debug'/'map',
+                автоматическое перемещение 'explore'/'travel' или ('travel', x, y)
+                
         Returns:
-            Enemy or None: Враг на позиции, или None если врага там нет
+            list: События хода (для команд без хода - пустой список)
         """
-        for enemy in self.enemies:
-            if enemy.x == x and enemy.y == y:
-                return enemy
-        return None
-        
-    def complete_turn(self):
-        """Завершить текущий ход и передать ход врагам."""
-        self.turn += 1
+        if isinstance(action, tuple):  # Перемещение в клетку, заданную вместе с командой
+            _, x, y = action
+            self.auto_travel(x, y)
+        elif action == 'travel':  # Перемещение в клетку, которую игрок введет
+            target = self.ui.get_travel_target()
+            if target is not None:
+                self.auto_travel(*target)
+        elif action == 'explore':
+            self.auto_explore()
+        elif action == 'map':  # Показать или скрыть мини-карту
+            self.show_minimap = not self.show_minimap
+        elif action == 'debug':  # Переключение режима отладки
+            self.debug_mode = not self.debug_mode
+            self.engine.log.add(EV_DEBUG_ON if self.debug_mode else EV_DEBUG_OFF)
+            # В режиме отладки показываются время фаз, поэтому профилировщик включается,
+            # если он не был включен заранее (и выключается вместе с режимом)
+            if self.debug_mode and not PROFILER.enabled:
+                PROFILER.enable()
+                self.debug_profiling = True
+            elif not self.debug_mode and self.debug_profiling:
+                PROFILER.disable()
+                self.debug_profiling = False
+        else:
+            with PROFILER.phase("loop.step"):
+                events = self.engine.step(action)
+                if self.recorder is not None:
+                    self.recorder.record(action)
+                # Клетки, увиденные на промежуточных ходах без кадра, тоже становятся исследованными
+                self.update_field_of_view()
+            return events
+        return []
         
-        # Ход врагов
-        for enemy in self.enemies:
-            self.move_enemy(enemy)
-            
-    def move_enemy(self, enemy):
+    def auto_travel(self, x, y):
         """
-        Переместить врага на основе простого ИИ.
+        Дойти до клетки по кратчайшему пути; промежуточные ходы не отрисовываются.
+        
+        Координаты вводит игрок, поэтому клетка вне карты отвергается до поиска пути и
+        до записи в журнал (аргументы событий - 32-битные целые).
         
         Args:
-            enemy (Enemy): Враг для перемещения
+            x (int): X-координата цели
+            y (int): Y-координата цели
         """
-        # Простой ИИ: Если игрок близко, двигаться к игроку, иначе двигаться случайно
-        player_distance = abs(enemy.x - self.player.x) + abs(enemy.y - self.player.y)
+        if not (0 <= x < self.engine.map_width and 0 <= y < self.engine.map_height):
+            self.engine.log.add(EV_OUTSIDE_MAP)
+            return
+        with PROFILER.phase("loop.auto"):
+            reason, turns = travel(self.engine, (x, y), self.perform_action, interrupted=self.ui.key_pressed)
+        self.report_auto_stop(reason, turns, (x, y))
         
-        if player_distance < 5:  # Если игрок в пределах "видимости"
-            # Двигаться к игроку
-            dx = 0
-            dy = 0
-            
-            if enemy.x < self.player.x:
-                dx = 1
-            elif enemy.x > self.player.x:
-                dx = -1
-                
-            if enemy.y < self.player.y:
-                dy = 1
-            elif enemy.y > self.player.y:
-                dy = -1
-                
-            # Приоритет горизонтального или вертикального движения
-            if random.choice([True, False]):
-                if dx != 0:
-                    self.try_move_enemy(enemy, dx, 0)
-                elif dy != 0:
-                    self.try_move_enemy(enemy, 0, dy)
-            else:
-                if dy != 0:
-                    self.try_move_enemy(enemy, 0, dy)
-                elif dx != 0:
-                    self.try_move_enemy(enemy, dx, 0)
-        else:
-            # Случайное движение
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-            dx, dy = random.choice(directions)
-            self.try_move_enemy(enemy, dx, dy)
-    
-    def try_move_enemy(self, enemy, dx, dy):
+    def auto_explore(self):
+        """Идти к ближайшим неисследованным местам; промежуточные ходы не отрисовываются."""
+        self.update_field_of_view()
+        with PROFILER.phase("loop.auto"):
+            reason, turns = explore(self.engine, self.explored, self.perform_action, interrupted=self.ui.key_pressed)
+        self.report_auto_stop(reason, turns)
+        
+    def report_auto_stop(self, reason, turns, goal=None):
         """
-        Попытка переместить врага в указанном направлении.
+        Записать в журнал, почему остановилось автоматическое перемещение.
+        
+        О бое, упоре в стену и конце партии уже сообщают события самого хода.
         
         Args:
-            enemy (Enemy): Враг для перемещения
-            dx (int): Изменение x-координаты
-            dy (int): Изменение y-координаты
+            reason (str): Причина остановки STOP_*
+            turns (int): Сколько ходов сделано
+            goal (tuple): Целевая клетка (x, y) для перемещения в клетку
         """
-        new_x = enemy.x + dx
-        new_y = enemy.y + dy
+        log = self.engine.log
+        if reason == STOP_ENEMY:
+            log.add(EV_AUTO_ENEMY)
+        elif reason == STOP_NO_PATH:
+            log.add(EV_NO_PATH, *goal)
+        elif reason == STOP_ARRIVED:
+            log.add(EV_ARRIVED, *goal)
+        elif reason == STOP_EXPLORED:
+            log.add(EV_EXPLORED)
+        elif reason in (STOP_INTERRUPTED, STOP_LIMIT):
+            log.add(EV_AUTO_STOPPED, turns)
+        PROFILER.count("auto.turns", turns)
         
-        # Проверка, находится ли новая позиция в пределах карты
-        if 0 <= new_x < self.map_width and 0 <= new_y < self.map_height:
-            # Проверка столкновения со стеной
-            if self.current_map[new_y][new_x] == '#':
-                return
-            
-            # Проверка столкновения с игроком
-            if new_x == self.player.x and new_y == self.player.y:
-                # Начать бой с игроком
-                combat_result = process_combat(enemy, self.player)
-                for message in combat_result["messages"]:
-                    self.message_log.append(message)
-                
-                # Если игрок побежден, завершить игру
-                if self.player.hp <= 0:
-                    self.message_log.append("Вы побеждены!")
-                    self.running = False
-                return
-            
-            # Проверка столкновения с другими врагами
-            for other_enemy in self.enemies:
-                if other_enemy != enemy and other_enemy.x == new_x and other_enemy.y == new_y:
-                    return
-            
-            # Переместить врага
-            enemy.x = new_x
-            enemy.y = new_y
-            
+    def update_field_of_view(self):
+        """Обновить поле зрения игрока и отметить видимые клетки как исследованные."""
+        engine = self.engine
+        fov = engine.fov
+        fov.update(engine.player.x, engine.player.y)
+        if fov.updates == self.explored_fov_updates:
+            return
+        self.explored_fov_updates = fov.updates
+        explored = self.explored
+        for x, y in fov.visible_cells():
+            if 0 <= x < engine.map_width and 0 <= y < engine.map_height:
+                index = y * engine.map_width + x
+                if not explored[index]:
+                    explored[index] = 1
+                    self.newly_explored.append((x, y))
+                    if self.minimap is not None:
+                        self.minimap.add(x, y, engine.current_map.get(x, y))
+                        
     def update(self):
         """Обновить состояние игры."""
         # Проверка условия победы
-        if not self.enemies:
-            self.message_log.append("Поздравляем! Вы победили всех врагов!")
-            self.message_log.append("Нажмите любую клавишу для выхода...")
-            input()
+        if self.engine.won and self.running:
+            self.engine.log.add(EV_PRESS_ANY_KEY)
+            self.render()
+            self.ui.wait_for_key()
+        if not self.engine.running:
             self.running = False
             
+        # Изменения дописываются в журнал автосохранения раз в несколько ходов
+        if self.autosave is not None and self.engine.turn - self.autosave.turn >= AUTOSAVE_INTERVAL:
+            with PROFILER.phase("save.autosave"):
+                self.autosave.save()
+                
+    def close(self):
+        """Завершить игру: сохранить последние изменения и закрыть файлы журналов и записи."""
+        if self.autosave is not None:
+            self.autosave.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.engine is not None:
+            self.engine.log.close()
+            
     def render(self):
-        """Отображение текущего состояния игры на консоли."""
-        self.ui.clear_screen()
+        """Отображение текущего состояния игры на консоли (выводятся только изменения кадра)."""
+        with PROFILER.phase("render.compose"):
+            self.update_field_of_view()
+            # Блок под картой сокращается, пока карте не останется хотя бы MIN_VIEW_HEIGHT строк
+            screen_lines = self.renderer.screen_size()[1]
+            for compact in range(STATUS_COMPACT_LEVELS + 1):
+                status = self.status_lines(compact)
+                if screen_lines - len(status) - PROMPT_LINES >= MIN_VIEW_HEIGHT:
+                    break
+            lines = self.compose_map(len(status)) + status
+        with PROFILER.phase("render.write"):
+            self.renderer.draw(lines)
+            
+    def compose_map(self, reserved_lines=0):
+        """
+        Строки окна карты с игроком и видимыми врагами.
         
-        # Создание копии карты для отображения сущностей
-        render_map = [list(row) for row in self.current_map]
+        Окно размером с терминал (за вычетом reserved_lines строк под картой) следует
+        за игроком. Статический слой карты перестраивается целиком только при сдвиге
+        окна, смене режима отладки или изменении самой карты; иначе в нем обновляются
+        лишь клетки, исследованные с прошлого кадра.
         
-        # Добавление врагов на карту
-        for enemy in self.enemies:
-            # Показать разные типы врагов разными символами
-            if enemy.name.lower() == "гоблин":
-                enemy_char = 'г'
-            elif enemy.name.lower() == "орк":
-                enemy_char = 'о'
-            elif enemy.name.lower() == "тролль":
-                enemy_char = 'Т'
-            elif enemy.name.lower() == "скелет":
-                enemy_char = 'с'
-            else:
-                enemy_char = 'В'
-            render_map[enemy.y][enemy.x] = enemy_char
+        Args:
+            reserved_lines (int): Сколько строк экрана занято под картой
             
-        # Добавление игрока на карту
-        render_map[self.player.y][self.player.x] = '@'
+        Returns:
+            list: Строки окна карты
+        """
+        engine = self.engine
+        player = engine.player
+        game_map = engine.current_map
         
-        # Печать карты
-        for row in render_map:
-            print(''.join(row))
-            
-        # Печать характеристик игрока
-        print("\n" + "=" * 40)
-        print(f"Игрок: {self.player.name} ({self.player.char_class})")
-        print(f"HP: {self.player.hp}/{self.player.max_hp} | SP: {self.player.sp}/{self.player.max_sp} | DMG: {self.player.dmg} | ARM: {self.player.arm}")
-        print("=" * 40)
+        columns, screen_lines = self.renderer.screen_size()
+        viewport = self.viewport
+        viewport.resize(max(MIN_VIEW_WIDTH, columns - 1),
+                        max(1, screen_lines - reserved_lines - PROMPT_LINES),
+                        engine.map_width, engine.map_height)
+        viewport.follow(player.x, player.y)
+        view_x, view_y = viewport.left, viewport.top
+        
+        self.update_field_of_view()
+        layer = self.map_layer
+        key = (view_x, view_y, viewport.width, viewport.height, self.debug_mode, game_map.version)
+        if not layer.matches(game_map, key):
+            rows = [line.encode('ascii')
+                    for line in game_map.region_lines(view_x, view_y, viewport.width, viewport.height)]
+            # Неисследованные клетки скрыты (в режиме отладки видна вся карта)
+            if not self.debug_mode:
+                for row_index, row in enumerate(rows):
+                    start = (view_y + row_index) * engine.map_width + view_x
+                    seen = self.explored[start:start + len(row)]
+                    rows[row_index] = bytes(tile if flag else TILE_FLOOR for tile, flag in zip(row, seen))
+            layer.rebuild(game_map, key, view_x, view_y, rows)
+        elif not self.debug_mode:
+            for x, y in self.newly_explored:
+                layer.set_cell(x, y, game_map.get(x, y))
+        self.newly_explored = []
+        
+        # Враги в окне (вне режима отладки - только видимые игроку) и игрок поверх карты
+        if self.debug_mode:
+            enemies = engine.enemies.in_rect(view_x, view_y, viewport.right, viewport.bottom)
+        else:
+            enemies = engine.visible_enemies()
+        overlay = {}
+        for enemy in enemies:
+            # Показать разные типы врагов разными символами
+            overlay[enemy.x, enemy.y] = ENEMY_CHARS[enemy.type_id]
+        overlay[player.x, player.y] = '@'
+        return layer.compose(overlay)
+        
+    def status_lines(self, compact=0):
+        """
+        Строки под картой: характеристики игрока, журнал, управление и отладочная информация.
         
-        # Печать лога сообщений (последние 5 сообщений)
-        print("\nЛог сообщений:")
-        for message in self.message_log[-5:]:
-            print(f"- {message}")
+        Args:
+            compact (int): Насколько сократить блок, чтобы карте хватило места на экране
+                (0 - полностью, до STATUS_COMPACT_LEVELS): 1 - без пустых строк-разделителей,
+                2 - два сообщения журнала и отладочная информация без списков, 3 - без
+                мини-карты, 4 - без рамок и легенды, одно сообщение журнала
+                
+        Returns:
+            list: Строки
+        """
+        engine = self.engine
+        player = engine.player
+        lines = []
+        
+        def section(*section_lines):
+            # Разделы отделяются пустой строкой, если блок не сокращен
+            if compact < 1:
+                lines.append("")
+            lines.extend(section_lines)
             
-        # Печать управления и легенды
-        print("\nУправление: WASD = движение, Q = выход, ВВЕДИТЕ 'debug' = режим отладки")
-        print("\nЛегенда: @ = Игрок, г = Гоблин, о = Орк, Т = Тролль, с = Скелет, # = Стена")
+        # Характеристики игрока
+        stats = [
+            f"Игрок: {player.name} ({player.char_class}) | Позиция: ({player.x}, {player.y})",
+            f"HP: {player.hp}/{player.max_hp} | SP: {player.sp}/{player.max_sp} | DMG: {player.dmg} | ARM: {player.arm}",
+        ]
+        section(*(stats if compact >= 4 else ["=" * 40] + stats + ["=" * 40]))
+        
+        # Лог сообщений (последние 5 сообщений)
+        message_count = 5 if compact < 2 else 2 if compact < 4 else 1
+        section("Лог сообщений:", *(f"- {message}" for message in engine.log.messages(message_count)))
         
-        # Печать отладочной информации если включен режим отладки
+        # Мини-карта всего уровня
+        if self.show_minimap and compact < 3:
+            game_map = engine.current_map
+            minimap = self.minimap
+            if minimap is None or minimap.source is not game_map or minimap.map_version != game_map.version:
+                minimap = self.minimap = Minimap(engine.map_width, engine.map_height)
+                minimap.build(game_map, self.explored)
+            section("Мини-карта:", *minimap.lines(player.x, player.y))
+            
+        # Управление и легенда
+        if self.ui.keyboard is not None:
+            section("Управление: WASD или стрелки = движение, Q = выход, ` = отладка, M = мини-карта",
+                    "Автоперемещение: X = исследовать, T = идти в клетку; любая клавиша прерывает")
+        else:
+            section("Управление: WASD = движение, Q = выход, 'debug' = отладка, 'map' = мини-карта",
+                    "Автоперемещение: 'explore' = исследовать, 'go X Y' = идти в клетку (X, Y)")
+        if compact < 4:
+            section("Легенда: @ = Игрок, г = Гоблин, о = Орк, Т = Тролль, с = Скелет, # = Стена")
+            
+        # Отладочная информация, если включен режим отладки
         if self.debug_mode:
-            print("\n=== ОТЛАДОЧНАЯ ИНФОРМАЦИЯ ===")
-            print(f"Ход: {self.turn}")
-            print(f"Позиция игрока: ({self.player.x}, {self.player.y})")
-            print(f"Количество врагов: {len(self.enemies)}")
-            for i, enemy in enumerate(self.enemies):
-                print(f"Враг {i+1}: {enemy.name} в ({enemy.x}, {enemy.y}) - HP: {enemy.hp}/{enemy.max_hp}")
-            print("==============================")
+            section(
+                "=== ОТЛАДОЧНАЯ ИНФОРМАЦИЯ ===",
+                f"Зерно игры: {engine.seed}",
+                f"Ход: {engine.turn}",
+                f"Позиция игрока: ({player.x}, {player.y})",
+                f"Количество врагов: {len(engine.enemies)}",
+            )
+            if compact < 2:
+                for i, entity_id in enumerate(engine.enemies.ids[:DEBUG_ENEMY_LIMIT]):
+                    enemy = engine.enemies.handle(entity_id)
+                    lines.append(f"Враг {i+1}: {enemy.name} в ({enemy.x}, {enemy.y}) - HP: {enemy.hp}/{enemy.max_hp}")
+                if len(engine.enemies) > DEBUG_ENEMY_LIMIT:
+                    lines.append(f"... и еще {len(engine.enemies) - DEBUG_ENEMY_LIMIT}")
+                if PROFILER.enabled:
+                    section("Время фаз:", *PROFILER.report())
+            lines.append("==============================")
+        return lines
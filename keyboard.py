@@ -0,0 +1,194 @@
+"""
+Модуль посимвольного ввода с клавиатуры.
+
+В терминале (POSIX) нажатия читаются сразу, без Enter: терминал переводится в
+режим cbreak (termios/tty), а чтение идет через select без блокировки, поэтому
+за одно обращение забираются все накопившиеся нажатия. Стрелки распознаются по
+escape-последовательностям. Там, где termios недоступен (Windows) или ввод не
+из терминала, используется построчный ввод через input().
+"""
+import codecs
+import contextlib
+import os
+import select
+
+try:
+    import termios
+    import tty
+except ImportError:  # termios есть только в POSIX; без него остается построчный ввод
+    termios = None
+
+# Действия по клавишам (буквы сравниваются без учета регистра)
+KEY_ACTIONS = {
+    'w': 'w', 'a': 'a', 's': 's', 'd': 'd', 'q': 'q',
+    # Те же клавиши в русской раскладке
+    'ц': 'w', 'ф': 'a', 'ы': 's', 'в': 'd', 'й': 'q',
+    # Стрелки (обычный режим терминала и режим приложения)
+    '\x1b[A': 'w', '\x1b[B': 's', '\x1b[C': 'd', '\x1b[D': 'a',
+    '\x1bOA': 'w', '\x1bOB': 's', '\x1bOC': 'd', '\x1bOD': 'a',
+    # Мини-карта и режим отладки (слова 'map' и 'debug' нельзя ввести посимвольно)
+    'm': 'map', 'ь': 'map',
+    '`': 'debug', 'ё': 'debug',
+    # Автоматическое перемещение: исследование и путь до клетки (координаты вводятся строкой)
+    'x': 'explore', 'ч': 'explore',
+    't': 'travel', 'е': 'travel',
+}
+
+# Сколько ждать продолжения escape-последовательности, прежде чем считать Esc отдельным нажатием
+ESCAPE_TIMEOUT = 0.05
+
+
+def parse_keys(text):
+    """
+    Разобрать введенные символы в действия.
+    
+    Незнакомые клавиши пропускаются. Незаконченная escape-последовательность в
+    конце текста возвращается отдельно, чтобы дополнить ее следующим чтением.
+    
+    Args:
+        text (str): Введенные символы
+        
+    Returns:
+        tuple: (список действий, незаконченный остаток текста)
+    """
+    actions = []
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char != '\x1b':
+            action = KEY_ACTIONS.get(char.lower())
+            index += 1
+        elif index + 1 >= len(text):
+            return actions, text[index:]
+        elif text[index + 1] in '[O':
+            # Последовательность CSI/SS3: параметры, затем завершающий символ '@'..'~'
+            end = index + 2
+            while end < len(text) and not '@' <= text[end] <= '~':
+                end += 1
+            if end >= len(text):
+                return actions, text[index:]
+            sequence = text[index:end + 1]
+            # Стрелки с модификаторами (например, Ctrl: '\x1b[1;5A') - как обычные стрелки
+            action = KEY_ACTIONS.get(sequence) or KEY_ACTIONS.get(sequence[:2] + sequence[-1])
+            index = end + 1
+        else:
+            # Отдельный Esc перед другой клавишей
+            index += 1
+            continue
+        if action is not None:
+            actions.append(action)
+    return actions, ''
+
+
+class RawKeyboard:
+    """
+    Посимвольный ввод из терминала.
+    
+    Используется как контекстный менеджер: на время блока терминал переводится в
+    режим cbreak (без эха и без ожидания Enter, Ctrl+C по-прежнему работает), при
+    выходе прежние настройки восстанавливаются.
+    """
+    
+    def __init__(self, stream):
+        """
+        Инициализация.
+        
+        Args:
+            stream: Поток ввода-терминал (обычно sys.stdin)
+        """
+        self.stream = stream
+        self.fd = None
+        self.saved_attributes = None
+        self.pending = ''  # Незаконченная escape-последовательность
+        self.eof = False
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        
+    @staticmethod
+    def available(stream):
+        """Можно ли читать поток посимвольно (POSIX и поток - терминал)."""
+        return termios is not None and stream.isatty()
+        
+    def __enter__(self):
+        self.fd = self.stream.fileno()
+        self.saved_attributes = termios.tcgetattr(self.fd)
+        tty.setcbreak(self.fd)
+        return self
+        
+    def __exit__(self, *exc_info):
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved_attributes)
+        return False
+        
+    def _read(self, timeout):
+        """
+        Прочитать все доступные байты, ожидая первые не дольше timeout.
+        
+        Args:
+            timeout (float): Время ожидания в секундах (None - без ограничения, 0 - не ждать)
+            
+        Returns:
+            bytes: Прочитанные байты (пусто, если ничего не пришло)
+        """
+        chunks = []
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            chunk = os.read(self.fd, 1024)
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            ready, _, _ = select.select([self.fd], [], [], 0)
+        return b''.join(chunks)
+        
+    def read_actions(self, block=True):
+        """
+        Прочитать действия всех накопившихся нажатий.
+        
+        Args:
+            block (bool): Ждать, пока не будет нажата клавиша с действием
+            
+        Returns:
+            list: Действия в порядке нажатия (при конце ввода - выход 'q')
+        """
+        while not self.eof:
+            if self.pending:
+                timeout = ESCAPE_TIMEOUT
+            else:
+                timeout = None if block else 0
+            data = self._read(timeout)
+            if not data:
+                if self.pending:
+                    # Продолжение не пришло: это был отдельный Esc, он ничего не делает
+                    self.pending = ''
+                    continue
+                if not block:
+                    return []
+                continue
+            actions, self.pending = parse_keys(self.pending + self.decoder.decode(data))
+            if actions or not block:
+                return actions
+        return ['q']
+        
+    def key_pressed(self):
+        """
+        Была ли нажата клавиша с прошлого чтения (нажатия при этом отбрасываются).
+        
+        Returns:
+            bool: Было ли нажатие
+        """
+        self.pending = ''
+        return not self.eof and bool(self._read(0))
+        
+    @contextlib.contextmanager
+    def line_input(self):
+        """Контекст, в котором терминал временно возвращается в построчный режим (для input())."""
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved_attributes)
+        try:
+            yield
+        finally:
+            tty.setcbreak(self.fd)
+            
+    def wait_key(self):
+        """Дождаться нажатия любой клавиши."""
+        self.pending = ''
+        if not self.eof:
+            self._read(None)
@@ -1,17 +1,58 @@
 #!/usr/bin/env python3
+import argparse
+
 from game import Game
+from profiler import PROFILER
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Рогалик приключение на Python")
+    parser.add_argument("--seed", type=int, help="зерно игры для воспроизводимого прохождения")
+    parser.add_argument("--log", help="записать полный журнал событий в файл (JSON Lines)")
+    parser.add_argument("--save", help="автосохранение партии в файл")
+    parser.add_argument("--load", help="продолжить партию из файла сохранения")
+    parser.add_argument("--record", help="записать партию для воспроизведения (python replay.py ФАЙЛ)")
+    parser.add_argument("--line-input", action="store_true",
+                        help="построчный ввод (действие и Enter) вместо чтения отдельных нажатий")
+    parser.add_argument("--profile", action="store_true",
+                        help="измерять время фаз игрового цикла и напечатать перцентили при выходе")
+    parser.add_argument("--profile-sample", type=int, default=1, metavar="N",
+                        help="измерять только каждый N-й вызов фазы (меньше накладных расходов)")
+    parser.add_argument("--profile-log", help="записывать замеры в файл (JSON Lines)")
+    parser.add_argument("--profile-prom", help="записать итоговую статистику в файл формата Prometheus")
+    args = parser.parse_args(argv)
+    if args.profile or args.profile_log or args.profile_prom:
+        PROFILER.enable(args.profile_sample, path=args.profile_log)
+        
     # Запуск
-    game = Game()
+    game = Game(seed=args.seed, log_path=args.log, save_path=args.save,
+                replay_path=args.record)
+                
+    game.ui.raw_input = not args.line_input
     
-    # Старт
-    game.start()
-    while game.running:
-        game.process_input()
-        game.update()
+    # Старт (новая партия или продолжение сохраненной)
+    if args.load:
+        game.load(args.load)
+    else:
+        game.start()
+    with game.ui.game_input():
         game.render()
+        while game.running:
+            game.process_input()
+            with PROFILER.phase("loop.update"):
+                game.update()
+            with PROFILER.phase("loop.render"):
+                game.render()
+    game.close()
+    
+    # Итоговая статистика профилирования
+    if PROFILER.phases:
+        if args.profile_prom:
+            PROFILER.write_prometheus(args.profile_prom)
+        print("\nВремя фаз игрового цикла:")
+        for line in PROFILER.report():
+            print(line)
+    PROFILER.close()
     
     print("Спасибо за тест!")
 
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Модуль пакетной генерации карт на нескольких процессах.
+
+Запуск: python map_batch.py --size 64x64 --seeds 0-999 --workers 4
+"""
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from map_cache import GENERATORS, MapCache, parse_range
+from tiles import TileGrid
+
+
+def _generate_packed(spec):
+    """
+    Сгенерировать одну карту в рабочем процессе.
+    
+    Возвращает байты клеток, а не объект карты: их передача между процессами дешевле.
+    """
+    generator, width, height, seed = spec
+    game_map = GENERATORS[generator](width, height, random.Random(seed))
+    return game_map.width, game_map.height, bytes(game_map.cells)
+
+
+def generate_maps(specs, workers=None, chunksize=None):
+    """
+    Сгенерировать пакет карт, распределив зерна по пулу процессов.
+    
+    Результат для каждого зерна совпадает с последовательной генерацией.
+    
+    Args:
+        specs (list): Описания карт (генератор, ширина, высота, зерно)
+        workers (int): Количество процессов (по умолчанию число ядер; 1 - без пула)
+        chunksize (int): Сколько карт отправлять процессу за раз
+        
+    Returns:
+        list: Карты TileGrid в порядке описаний
+    """
+    specs = list(specs)
+    if workers is None:
+        workers = os.cpu_count() or 1
+        
+    if workers <= 1 or len(specs) <= 1:
+        packed = map(_generate_packed, specs)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(specs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            packed = list(executor.map(_generate_packed, specs, chunksize=chunksize))
+            
+    return [TileGrid(width, height, cells=bytearray(cells)) for width, height, cells in packed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетная генерация карт")
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="random")
+    parser.add_argument("--size", default="50x50", help="размер карты ШИРИНАxВЫСОТА")
+    parser.add_argument("--seeds", default="0-99", help="зерна: '0-999' или '1,5,7'")
+    parser.add_argument("--workers", type=int, default=None, help="количество процессов")
+    parser.add_argument("--cache-dir", help="сохранить карты в дисковый кэш в этом каталоге")
+    args = parser.parse_args()
+    
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    seeds = parse_range(args.seeds)
+    specs = [(args.generator, width, height, seed) for seed in seeds]
+    maps = generate_maps(specs, workers=args.workers)
+    
+    if args.cache_dir:
+        cache = MapCache(args.cache_dir)
+        for (generator, width, height, seed), game_map in zip(specs, maps):
+            cache.store(generator, width, height, seed, game_map, evict=False)
+        cache.evict()
+    print(f"Сгенерировано карт: {len(maps)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Модуль дискового кэша сгенерированных карт.
+
+Карты хранятся в компактном двоичном формате: небольшой заголовок и байты клеток.
+Файлы открываются через mmap, поэтому загрузка не копирует данные.
+
+Запуск: python map_cache.py warm --generator random --size 512x512 --seeds 0-99
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+from map_generator import generate_standard_map, generate_random_map, GENERATOR_VERSION
+from tiles import TileGrid
+
+# Заголовок файла: сигнатура, версия формата, версия генератора, ширина, высота
+MAP_MAGIC = b'RKMP'
+MAP_FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_DIR_ENV = 'RKIS_MAP_CACHE'
+
+# Генераторы карт: (ширина, высота, источник случайных чисел) -> TileGrid
+GENERATORS = {
+    'standard': lambda width, height, rng: generate_standard_map(rng=rng),
+    'random': generate_random_map,
+}
+
+
+def default_cache_dir():
+    """Каталог кэша по умолчанию (можно переопределить переменной окружения RKIS_MAP_CACHE)."""
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(
+        os.path.expanduser('~'), '.cache', 'rkis_roguelike', 'maps')
+
+
+def write_map_file(path, game_map):
+    """
+    Записать карту в двоичный файл атомарно (через временный файл).
+    
+    Args:
+        path (str): Путь к файлу
+        game_map (TileGrid): Карта
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(HEADER.pack(MAP_MAGIC, MAP_FORMAT_VERSION, GENERATOR_VERSION,
+                                   game_map.width, game_map.height))
+            file.write(game_map.view())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def open_map_file(path):
+    """
+    Открыть файл карты через mmap без копирования клеток.
+    
+    Изменения карты остаются в памяти процесса и не попадают в файл.
+    
+    Args:
+        path (str): Путь к файлу
+        
+    Returns:
+        TileGrid: Карта, клетки которой отображены из файла
+        
+    Raises:
+        ValueError: Если файл не является картой поддерживаемого формата или обрезан
+    """
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(mapped) < HEADER.size:
+        mapped.close()
+        raise ValueError(f"Файл карты {path} поврежден")
+    magic, format_version, _, width, height = HEADER.unpack_from(mapped)
+    if magic != MAP_MAGIC or format_version != MAP_FORMAT_VERSION:
+        mapped.close()
+        raise ValueError(f"Файл {path} не является картой поддерживаемого формата")
+    if len(mapped) != HEADER.size + width * height:
+        mapped.close()
+        raise ValueError(f"Файл карты {path} поврежден")
+    return TileGrid(width, height, cells=memoryview(mapped)[HEADER.size:])
+
+
+class MapCache:
+    """Кэш карт на диске с ключом (генератор, ширина, высота, зерно, версия генератора)."""
+    
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Инициализация кэша.
+        
+        Args:
+            directory (str): Каталог кэша (по умолчанию default_cache_dir())
+            max_bytes (int): Максимальный суммарный размер файлов кэша
+        """
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        
+    def path_for(self, generator, width, height, seed):
+        """Путь к файлу карты для ключа кэша."""
+        name = f"{generator}-{width}x{height}-{seed}-v{GENERATOR_VERSION}.map"
+        return os.path.join(self.directory, name)
+        
+    def load(self, generator, width, height, seed):
+        """
+        Загрузить карту из кэша.
+        
+        Returns:
+            TileGrid: Карта или None, если ее нет в кэше
+        """
+        path = self.path_for(generator, width, height, seed)
+        try:
+            game_map = open_map_file(path)
+        except (OSError, ValueError):
+            return None
+        # Время изменения служит отметкой последнего использования для вытеснения
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return game_map
+        
+    def store(self, generator, width, height, seed, game_map, evict=True):
+        """
+        Сохранить карту в кэш.
+        
+        Args:
+            evict (bool): Сразу вытеснить старые файлы при превышении размера
+                (при сохранении пакета карт удобнее вызвать evict() один раз в конце)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        write_map_file(self.path_for(generator, width, height, seed), game_map)
+        if evict:
+            self.evict()
+            
+    def get_or_generate(self, generator, width, height, seed):
+        """
+        Получить карту из кэша или сгенерировать и сохранить ее.
+        
+        Args:
+            generator (str): Имя генератора из GENERATORS
+            width (int): Ширина карты
+            height (int): Высота карты
+            seed (int): Зерно генерации
+            
+        Returns:
+            TileGrid: Карта
+        """
+        game_map = self.load(generator, width, height, seed)
+        if game_map is not None:
+            return game_map
+            
+        game_map = GENERATORS[generator](width, height, random.Random(seed))
+        try:
+            self.store(generator, width, height, seed, game_map)
+        except OSError:
+            pass  # Кэш недоступен для записи: просто работаем без него
+        return game_map
+        
+    def entries(self):
+        """Файлы кэша: список (время использования, размер, путь)."""
+        result = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return result
+        for name in names:
+            if not name.endswith('.map'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            result.append((stat.st_mtime, stat.st_size, path))
+        return result
+        
+    def evict(self):
+        """Удалить давно не использованные карты, пока кэш больше max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            
+    def clear(self):
+        """Удалить все карты из кэша."""
+        for _, _, path in self.entries():
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def parse_range(text):
+    """Разобрать список зерен вида '0-99' или '1,5,7'."""
+    seeds = []
+    for part in text.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            seeds.extend(range(int(start), int(end) + 1))
+        else:
+            seeds.append(int(part))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Дисковый кэш карт")
+    parser.add_argument("--dir", help="каталог кэша")
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="максимальный размер кэша в МБ")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    warm = commands.add_parser("warm", help="заранее сгенерировать карты")
+    warm.add_argument("--generator", choices=sorted(GENERATORS), default="random")
+    warm.add_argument("--size", default="50x50", help="размер карты ШИРИНАxВЫСОТА")
+    warm.add_argument("--seeds", default="0-9", help="зерна: '0-99' или '1,5,7'")
+    
+    commands.add_parser("info", help="показать содержимое кэша")
+    commands.add_parser("clear", help="очистить кэш")
+    args = parser.parse_args()
+    
+    cache = MapCache(args.dir, args.max_mb * 1024 * 1024)
+    if args.command == "warm":
+        width, height = (int(value) for value in args.size.lower().split("x"))
+        seeds = parse_range(args.seeds)
+        for seed in seeds:
+            cache.get_or_generate(args.generator, width, height, seed)
+        print(f"Подготовлено карт: {len(seeds)} в {cache.directory}")
+    elif args.command == "info":
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"{cache.directory}: {len(entries)} карт, {total / (1024 * 1024):.1f} МБ")
+    elif args.command == "clear":
+        cache.clear()
+        print(f"Кэш {cache.directory} очищен")
+
+
+if __name__ == "__main__":
+    main()
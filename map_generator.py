@@ -2,254 +2,628 @@
 Модуль генератора карт для создания игровых карт.
 """
 import random
+from array import array
+from collections import deque
 
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется реализация на чистом Python
+    np = None
 
+from tiles import TileGrid, TILE_FLOOR, TILE_WALL
+from profiler import PROFILER
+
+
+# Версия алгоритмов генерации: увеличивается при любом изменении, влияющем на результат
+GENERATOR_VERSION = 1
+
+# Размер стандартной карты
+STANDARD_WIDTH = 20
+STANDARD_HEIGHT = 10
+
+# Таблица правил клеточного автомата: индекс = клетка * 10 + число стен в окрестности 3x3.
+# Стена остается стеной при 4 и более стенах, пустая клетка становится стеной при 6 и более.
+_AUTOMATON_RULE = bytes(
+    [1 if count > 5 else 0 for count in range(10)] +
+    [1 if count >= 4 else 0 for count in range(10)]
+)
+
+# Таблица перевода флагов стен (1 - стена, 0 - пустое пространство) в коды клеток карты
+_WALLS_TO_TILES = bytes([TILE_FLOOR, TILE_WALL]) + bytes([TILE_WALL]) * 254
+
+
+@PROFILER.timed("map.is_connected")
 def is_connected(game_map):
     """
     Проверяет, связана ли карта (все пустые клетки доступны из любой другой пустой клетки).
     
     Args:
-        game_map (list): 2D список, представляющий карту
+        game_map (TileGrid): Карта
         
     Returns:
         bool: True, если карта связна, False в противном случае
     """
-    height = len(game_map)
-    width = len(game_map[0])
+    width = game_map.width
+    cells = game_map.cells
+    size = len(cells)
     
-    # Найти первую пустую клетку
-    start_x, start_y = None, None
-    for y in range(height):
-        for x in range(width):
-            if game_map[y][x] == ' ':
-                start_x, start_y = x, y
-                break
-        if start_x is not None:
-            break
-    
-    if start_x is None:
+    # Найти первую пустую клетку и посчитать все пустые клетки
+    start = game_map.find(TILE_FLOOR)
+    if start == -1:
         return True  # Нет пустых клеток
+    floor_count = game_map.count(TILE_FLOOR)
     
-    # Провести обход в ширину от начальной точки
-    visited = [[False for _ in range(width)] for _ in range(height)]
-    queue = [(start_x, start_y)]
-    visited[start_y][start_x] = True
+    # Провести обход в ширину от начальной точки, считая посещенные клетки
+    visited = bytearray(size)
+    queue = deque([start])
+    visited[start] = 1
+    visited_count = 1
     
     while queue:
-        x, y = queue.pop(0)
+        index = queue.popleft()
+        x = index % width
         
         # Проверить все соседние клетки
-        for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-            nx, ny = x + dx, y + dy
+        for neighbour, inside in ((index + width, index + width < size), (index + 1, x < width - 1),
+                                  (index - width, index >= width), (index - 1, x > 0)):
+            if inside and cells[neighbour] == TILE_FLOOR and not visited[neighbour]:
+                visited[neighbour] = 1
+                visited_count += 1
+                queue.append(neighbour)
+    
+    # Карта связна, если обход достиг всех пустых клеток
+    return visited_count == floor_count
+
+
+class FloorConnectivity:
+    """
+    Индекс связности пустых клеток на основе системы непересекающихся множеств.
+    
+    Позволяет за почти постоянное время узнать, останется ли карта связной
+    после пробивания стены, и обновляется по мере пробивания клеток.
+    """
+    
+    def __init__(self, game_map):
+        """
+        Построить индекс по текущей карте.
+        
+        Args:
+            game_map (TileGrid): Карта
+        """
+        self.game_map = game_map
+        self.height = game_map.height
+        self.width = width = game_map.width
+        self.parent = array('i', range(width * self.height))
+        self.components = 0
+        
+        # Снимок клеток: у bytes есть быстрый поиск при любом буфере карты
+        cells = bytes(game_map.cells)
+        floor = bytes([TILE_FLOOR])
+        index = cells.find(floor)
+        while index != -1:
+            self.components += 1
+            # Достаточно объединиться с уже обработанными соседями слева и сверху
+            if index % width and cells[index - 1] == TILE_FLOOR:
+                self._union(index, index - 1)
+            if index >= width and cells[index - width] == TILE_FLOOR:
+                self._union(index, index - width)
+            index = cells.find(floor, index + 1)
+    
+    def _find(self, index):
+        """Найти представителя множества со сжатием пути делением пополам."""
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+    
+    def _union(self, a, b):
+        """Объединить множества двух клеток."""
+        root_a = self._find(a)
+        root_b = self._find(b)
+        if root_a != root_b:
+            self.parent[root_a] = root_b
+            self.components -= 1
+    
+    def _floor_neighbour_roots(self, x, y):
+        """Множество представителей соседних пустых клеток."""
+        game_map = self.game_map
+        roots = set()
+        for nx, ny in ((x, y + 1), (x + 1, y), (x, y - 1), (x - 1, y)):
+            if game_map.in_bounds(nx, ny) and game_map.is_floor(nx, ny):
+                roots.add(self._find(ny * self.width + nx))
+        return roots
+    
+    def is_connected(self):
+        """
+        Проверить, связна ли карта.
+        
+        Returns:
+            bool: True, если все пустые клетки образуют не более одной компоненты
+        """
+        return self.components <= 1
+    
+    def can_open(self, x, y):
+        """
+        Проверить, останется ли карта связной после пробивания клетки.
+        
+        Args:
+            x (int): X-координата стены
+            y (int): Y-координата стены
             
-            if (0 <= nx < width and 0 <= ny < height and 
-                game_map[ny][nx] == ' ' and not visited[ny][nx]):
-                visited[ny][nx] = True
-                queue.append((nx, ny))
+        Returns:
+            bool: True, если после пробивания карта будет связной
+        """
+        if self.game_map.is_floor(x, y):
+            return self.is_connected()
+        # Новая клетка добавляет компоненту и сливается со всеми соседними
+        return self.components + 1 - len(self._floor_neighbour_roots(x, y)) <= 1
+    
+    def open(self, x, y):
+        """
+        Пробить клетку и обновить индекс.
+        
+        Args:
+            x (int): X-координата стены
+            y (int): Y-координата стены
+        """
+        if self.game_map.is_floor(x, y):
+            return
+        roots = self._floor_neighbour_roots(x, y)
+        self.game_map.set(x, y, TILE_FLOOR)
+        index = y * self.width + x
+        self.components += 1
+        for root in roots:
+            self._union(index, root)
+
+
+# Состояния клеток в расширенной сетке для соединения регионов
+_BLOCKED = 0  # Рамка вокруг карты и внешняя стена: через них проходы не пробиваются
+_CARVABLE = 1  # Внутренняя стена, которую можно пробить
+_FLOOR = 2  # Пустое пространство
+
+# Направление к родительской клетке при росте регионов: 0 - вверх, 1 - вниз, 2 - влево, 3 - вправо.
+# При нескольких подходящих соседях выбирается направление с меньшим номером.
+_NO_PARENT = 255  # Пустые клетки и клетки, до которых рост не дошел
+
+
+def _region_state(game_map):
+    """
+    Построить плоскую сетку состояний с рамкой в одну клетку вокруг карты.
     
-    # Проверить, все ли пустые клетки посещены
+    Рамка избавляет от проверок границ: соседи любой клетки карты лежат внутри массива.
+    """
+    width = game_map.width
+    height = game_map.height
+    padded_width = width + 2
+    inner_table = bytes(_FLOOR if code == TILE_FLOOR else _CARVABLE for code in range(256))
+    edge_table = bytes(_FLOOR if code == TILE_FLOOR else _BLOCKED for code in range(256))
+    
+    state = bytearray(padded_width)
     for y in range(height):
-        for x in range(width):
-            if game_map[y][x] == ' ' and not visited[y][x]:
-                return False
+        line = bytes(game_map.row(y))
+        if y == 0 or y == height - 1:
+            line = line.translate(edge_table)
+        else:
+            line = bytearray(line.translate(inner_table))
+            # Внешние столбцы карты не пробиваются
+            for x in (0, width - 1):
+                if line[x] == _CARVABLE:
+                    line[x] = _BLOCKED
+        state.append(_BLOCKED)
+        state.extend(line)
+        state.append(_BLOCKED)
+    state.extend(bytes(padded_width))
+    return state
+
+
+def _grow_regions_python(state, padded_width):
+    """
+    Разметить регионы и одновременно вырастить их во все стены (многоисточниковый обход в ширину).
     
-    return True
+    Returns:
+        tuple: (владелец каждой клетки, расстояние до региона, направление к родителю, число регионов)
+    """
+    size = len(state)
+    offsets = (-padded_width, padded_width, -1, 1)
+    owner = [-1] * size
+    
+    # Разметка регионов обходом в ширину по пустым клеткам
+    region_count = 0
+    frontier = []
+    for start in range(size):
+        if state[start] != _FLOOR or owner[start] != -1:
+            continue
+        owner[start] = region_count
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            frontier.append(cell)
+            for offset in offsets:
+                neighbour = cell + offset
+                if state[neighbour] == _FLOOR and owner[neighbour] == -1:
+                    owner[neighbour] = region_count
+                    queue.append(neighbour)
+        region_count += 1
+    
+    # Послойный рост: новая клетка берет владельца у первого по приоритету соседа из предыдущего слоя
+    distance = [0] * size
+    parent = bytearray([_NO_PARENT]) * size
+    layer = 0
+    while frontier:
+        candidates = []
+        for cell in frontier:
+            for offset in offsets:
+                neighbour = cell + offset
+                if state[neighbour] == _CARVABLE and owner[neighbour] == -1 and parent[neighbour] == _NO_PARENT:
+                    parent[neighbour] = 0  # Временная отметка "уже в следующем слое"
+                    candidates.append(neighbour)
+        
+        layer += 1
+        for cell in candidates:
+            distance[cell] = layer
+        for cell in candidates:
+            for direction, offset in enumerate(offsets):
+                neighbour = cell + offset
+                if owner[neighbour] != -1 and distance[neighbour] == layer - 1:
+                    owner[cell] = owner[neighbour]
+                    parent[cell] = direction
+                    break
+        frontier = candidates
+    
+    return owner, distance, parent, region_count
+
+
+def _region_links_python(owner, distance, padded_width):
+    """Кратчайшие связи для каждой пары соседних регионов: [(длина, клетка1, клетка2, регион1, регион2)]."""
+    links = {}
+    size = len(owner)
+    for a in range(size - padded_width):
+        owner_a = owner[a]
+        if owner_a == -1:
+            continue
+        for b in (a + 1, a + padded_width):
+            owner_b = owner[b]
+            if owner_b == -1 or owner_b == owner_a:
+                continue
+            key = (owner_a, owner_b) if owner_a < owner_b else (owner_b, owner_a)
+            link = (distance[a] + distance[b], a, b)
+            if key not in links or link < links[key]:
+                links[key] = link
+    return [link + key for key, link in links.items()]
+
 
+def _grow_regions_numpy(state, padded_width):
+    """Та же разметка и рост регионов, векторизованные на NumPy."""
+    cells = np.frombuffer(bytes(state), dtype=np.uint8)
+    
+    # Разметка регионов: отрезки пустых клеток в строках объединяются с перекрывающимися отрезками ниже
+    floor = (cells == _FLOOR).astype(np.int8)
+    edges = np.diff(floor, prepend=np.int8(0))
+    run_starts = np.flatnonzero(edges == 1)
+    run_of_cell = np.cumsum(edges == 1) - 1
+    
+    # Соседние по вертикали пустые клетки дают пары отрезков; подряд идущие повторы отбрасываются
+    below = np.flatnonzero(floor[:-padded_width] & floor[padded_width:])
+    upper_runs = run_of_cell[below]
+    lower_runs = run_of_cell[below + padded_width]
+    changed = np.ones(len(below), dtype=bool)
+    changed[1:] = (upper_runs[1:] != upper_runs[:-1]) | (lower_runs[1:] != lower_runs[:-1])
+    run_pairs = zip(upper_runs[changed].tolist(), lower_runs[changed].tolist())
+    
+    run_parent = list(range(len(run_starts)))
+    
+    def find(run):
+        while run_parent[run] != run:
+            run_parent[run] = run_parent[run_parent[run]]
+            run = run_parent[run]
+        return run
+    
+    for upper, lower in run_pairs:
+        root_upper, root_lower = find(upper), find(lower)
+        if root_upper != root_lower:
+            run_parent[max(root_upper, root_lower)] = min(root_upper, root_lower)
+    
+    run_roots = np.array([find(run) for run in range(len(run_starts))], dtype=np.int64)
+    _, run_labels = np.unique(run_roots, return_inverse=True)
+    region_count = int(run_labels.max()) + 1 if len(run_labels) else 0
+    
+    owner = np.full(len(cells), -1, dtype=np.int32)
+    floor_cells = np.flatnonzero(floor)
+    owner[floor_cells] = run_labels.reshape(-1)[run_of_cell[floor_cells]]
+    
+    # Послойный рост регионов в стены: обрабатывается только текущий фронт
+    owner = owner.reshape(-1)
+    carvable = cells == _CARVABLE
+    distance = np.zeros(len(cells), dtype=np.int32)
+    parent = np.full(len(cells), _NO_PARENT, dtype=np.uint8)
+    offsets = np.array((-padded_width, padded_width, -1, 1), dtype=np.int64)
+    frontier = floor_cells
+    layer = 0
+    while len(frontier):
+        # Клетка frontier - offsets[d] получает родителя frontier в направлении d
+        targets = (frontier[None, :] - offsets[:, None]).reshape(-1)
+        directions = np.repeat(np.arange(4, dtype=np.uint8), len(frontier))
+        free = carvable[targets] & (owner[targets] < 0)
+        targets = targets[free]
+        directions = directions[free]
+        # У каждой клетки остается сосед с наименьшим номером направления
+        order = np.lexsort((directions, targets))
+        targets = targets[order]
+        directions = directions[order]
+        first = np.ones(len(targets), dtype=bool)
+        first[1:] = targets[1:] != targets[:-1]
+        targets = targets[first]
+        directions = directions[first]
+        
+        layer += 1
+        owner[targets] = owner[targets + offsets[directions]]
+        distance[targets] = layer
+        parent[targets] = directions
+        frontier = targets
+    
+    return owner, distance, parent, region_count
+
+
+def _region_links_numpy(owner, distance, padded_width):
+    """Кратчайшие связи для каждой пары соседних регионов, векторизованные на NumPy."""
+    candidates = []
+    for step in (1, padded_width):
+        a = np.flatnonzero(
+            (owner[:-step] >= 0) & (owner[step:] >= 0) & (owner[:-step] != owner[step:])
+        )
+        candidates.append((a, a + step))
+    a = np.concatenate([pair[0] for pair in candidates])
+    b = np.concatenate([pair[1] for pair in candidates])
+    if not len(a):
+        return []
+    
+    owner_a = owner[a].astype(np.int64)
+    owner_b = owner[b].astype(np.int64)
+    low = np.minimum(owner_a, owner_b)
+    high = np.maximum(owner_a, owner_b)
+    key = low * (int(owner.max()) + 1) + high
+    length = distance[a].astype(np.int64) + distance[b]
+    
+    # Для каждой пары регионов берется минимальная связь по (длина, клетка1, клетка2)
+    order = np.lexsort((b, a, length, key))
+    _, first = np.unique(key[order], return_index=True)
+    best = order[first]
+    return list(zip(
+        length[best].tolist(), a[best].tolist(), b[best].tolist(),
+        low[best].tolist(), high[best].tolist()
+    ))
+
+
+@PROFILER.timed("map.connect_regions")
 def connect_regions(game_map):
     """
     Соединяет несвязанные регионы на карте, пробивая проходы.
     
+    Все регионы одновременно растут в стены обходом в ширину, после чего между
+    соседними регионами выбираются кратчайшие связи, образующие остовное дерево.
+    Внешняя граница карты никогда не пробивается.
+    
     Args:
-        game_map (list): 2D список, представляющий карту
+        game_map (TileGrid): Карта
         
     Returns:
-        list: Обновленная карта с соединенными регионами
+        TileGrid: Та же карта с соединенными регионами
     """
-    height = len(game_map)
-    width = len(game_map[0])
+    padded_width = game_map.width + 2
+    state = _region_state(game_map)
     
-    # Найти все пустые регионы
-    visited = [[False for _ in range(width)] for _ in range(height)]
-    regions = []
-    
-    for y in range(height):
-        for x in range(width):
-            if game_map[y][x] == ' ' and not visited[y][x]:
-                # Новый регион
-                region = []
-                queue = [(x, y)]
-                visited[y][x] = True
-                
-                while queue:
-                    cx, cy = queue.pop(0)
-                    region.append((cx, cy))
-                    
-                    for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                        nx, ny = cx + dx, cy + dy
-                        
-                        if (0 <= nx < width and 0 <= ny < height and 
-                            game_map[ny][nx] == ' ' and not visited[ny][nx]):
-                            visited[ny][nx] = True
-                            queue.append((nx, ny))
-                
-                regions.append(region)
+    if np is not None:
+        owner, distance, parent, region_count = _grow_regions_numpy(state, padded_width)
+    else:
+        owner, distance, parent, region_count = _grow_regions_python(state, padded_width)
     
     # Если только один регион, карта уже связна
-    if len(regions) <= 1:
+    if region_count <= 1:
         return game_map
     
-    # Соединить все регионы
-    connected = [0]  # Список индексов уже соединенных регионов
+    if np is not None:
+        links = _region_links_numpy(owner, distance, padded_width)
+    else:
+        links = _region_links_python(owner, distance, padded_width)
+    
+    # Алгоритм Краскала по регионам: самые короткие связи, не создающие циклов
+    region_parent = list(range(region_count))
     
-    while len(connected) < len(regions):
-        best_distance = float('inf')
-        best_connection = None
+    def find(region):
+        while region_parent[region] != region:
+            region_parent[region] = region_parent[region_parent[region]]
+            region = region_parent[region]
+        return region
+    
+    offsets = (-padded_width, padded_width, -1, 1)
+    parent = bytes(parent)
+    merges = 0
+    for _, a, b, region_a, region_b in sorted(links):
+        root_a, root_b = find(region_a), find(region_b)
+        if root_a == root_b:
+            continue
+        region_parent[root_a] = root_b
         
-        # Перебрать все возможные соединения между соединенными и несоединенными регионами
-        for i in connected:
-            for j in range(len(regions)):
-                if j not in connected:
-                    # Найти ближайшие клетки между регионами
-                    for cell1 in regions[i]:
-                        for cell2 in regions[j]:
-                            dist = abs(cell1[0] - cell2[0]) + abs(cell1[1] - cell2[1])
-                            
-                            if dist < best_distance:
-                                best_distance = dist
-                                best_connection = (cell1, cell2)
+        # Пробиваем проход от обеих клеток связи назад к их регионам
+        for cell in (a, b):
+            while state[cell] == _CARVABLE:
+                state[cell] = _FLOOR
+                game_map.set(cell % padded_width - 1, cell // padded_width - 1, TILE_FLOOR)
+                cell += offsets[parent[cell]]
         
-        # Создать путь между ближайшими клетками
-        if best_connection:
-            cell1, cell2 = best_connection
-            x1, y1 = cell1
-            x2, y2 = cell2
-            
-            # Определить направление пути
-            path_cells = []
-            x, y = x1, y1
-            
-            # Сначала двигаемся по x
-            while x != x2:
-                x += 1 if x2 > x else -1
-                path_cells.append((x, y))
-            
-            # Затем по y
-            while y != y2:
-                y += 1 if y2 > y else -1
-                path_cells.append((x, y))
-            
-            # Пробиваем проход
-            for x, y in path_cells:
-                game_map[y][x] = ' '
-            
-            # Добавляем новый соединенный регион
-            for j in range(len(regions)):
-                if j not in connected and any((x, y) in regions[j] for x, y in path_cells):
-                    connected.append(j)
+        merges += 1
+        if merges == region_count - 1:
+            break
     
     return game_map
 
 
-def generate_standard_map():
+def _apply_automaton_numpy(walls, width, height, passes):
+    """Векторизованные проходы клеточного автомата на NumPy."""
+    grid = np.frombuffer(bytes(walls), dtype=np.uint8).reshape(height, width).copy()
+    
+    for _ in range(passes):
+        # Число стен в окрестности 3x3 для всех внутренних клеток сразу
+        counts = (
+            grid[:-2, :-2] + grid[:-2, 1:-1] + grid[:-2, 2:] +
+            grid[1:-1, :-2] + grid[1:-1, 1:-1] + grid[1:-1, 2:] +
+            grid[2:, :-2] + grid[2:, 1:-1] + grid[2:, 2:]
+        )
+        inner = grid[1:-1, 1:-1]
+        grid[1:-1, 1:-1] = np.where(inner == 1, counts >= 4, counts > 5)
+    
+    return bytearray(grid.tobytes())
+
+
+def _apply_automaton_python(walls, width, height, passes):
+    """Проходы клеточного автомата на чистом Python с построчными суммами."""
+    rows = [list(walls[y * width:(y + 1) * width]) for y in range(height)]
+    rule = _AUTOMATON_RULE
+    
+    for _ in range(passes):
+        # Горизонтальные суммы по тройкам клеток: элемент x-1 соответствует столбцу x
+        row_sums = [[a + b + c for a, b, c in zip(row, row[1:], row[2:])] for row in rows]
+        new_rows = [rows[0]]
+        
+        for y in range(1, height - 1):
+            row = rows[y]
+            new_row = [row[0]]
+            new_row.extend(
+                rule[cell * 10 + above + middle + below]
+                for cell, above, middle, below in zip(row[1:-1], row_sums[y - 1], row_sums[y], row_sums[y + 1])
+            )
+            new_row.append(row[-1])
+            new_rows.append(new_row)
+        
+        new_rows.append(rows[-1])
+        rows = new_rows
+    
+    result = bytearray()
+    for row in rows:
+        result.extend(row)
+    return result
+
+
+@PROFILER.timed("map.automaton")
+def apply_cellular_automaton(walls, width, height, passes=3, use_numpy=None):
+    """
+    Применить правила клеточного автомата ко всей карте сразу.
+    
+    Args:
+        walls (bytearray): Плоский массив клеток построчно, 1 - стена, 0 - пустое пространство
+        width (int): Ширина карты
+        height (int): Высота карты
+        passes (int): Количество проходов автомата
+        use_numpy (bool): Использовать NumPy (None - если он установлен)
+        
+    Returns:
+        bytearray: Новый плоский массив клеток после всех проходов
+    """
+    if use_numpy is None:
+        use_numpy = np is not None
+    
+    # У карт уже 3 клеток нет внутренней области, менять нечего
+    if width < 3 or height < 3 or passes <= 0:
+        return bytearray(walls)
+    
+    if use_numpy:
+        return _apply_automaton_numpy(walls, width, height, passes)
+    return _apply_automaton_python(walls, width, height, passes)
+
+
+@PROFILER.timed("map.standard")
+def generate_standard_map(rng=None):
     """
     Создать стандартную карту с предопределенной планировкой.
     
+    Args:
+        rng (random.Random): Источник случайных чисел (по умолчанию модуль random)
+        
     Returns:
-        list: 2D список, представляющий карту, где '#' - стена, а ' ' - пустое пространство
+        TileGrid: Карта, где '#' - стена, а ' ' - пустое пространство
     """
+    if rng is None:
+        rng = random
+    
     # Создать стандартную карту 20x10
-    width, height = 20, 10
+    width, height = STANDARD_WIDTH, STANDARD_HEIGHT
     
     # Инициализировать карту только со стенами
-    game_map = [['#' for _ in range(width)] for _ in range(height)]
+    game_map = TileGrid(width, height, fill=TILE_WALL)
     
     # Создать пустые пространства в центре
     for y in range(1, height - 1):
         for x in range(1, width - 1):
-            game_map[y][x] = ' '
+            game_map.set(x, y, TILE_FLOOR)
     
     # Добавить несколько внутренних стен для более интересной карты
     # Добавить вертикальную стену с проходом
     wall_x = width // 2
     for y in range(1, height - 1):
         if y != height // 2:
-            game_map[y][wall_x] = '#'
+            game_map.set(wall_x, y, TILE_WALL)
     
     # Добавить горизонтальную стену с проходом
     wall_y = height // 2
     for x in range(1, width - 1):
         if x != width // 3:
-            game_map[wall_y][x] = '#'
+            game_map.set(x, wall_y, TILE_WALL)
     
     # Добавить несколько случайных проходов через вертикальную стену
     for _ in range(2):  # Добавим еще пару проходов
-        y = random.randint(1, height - 2)
+        y = rng.randint(1, height - 2)
         if y != height // 2:  # Не трогаем уже существующий проход
-            game_map[y][wall_x] = ' '
+            game_map.set(wall_x, y, TILE_FLOOR)
     
     # Добавить несколько случайных проходов через горизонтальную стену
     for _ in range(2):  # Добавим еще пару проходов
-        x = random.randint(1, width - 2)
+        x = rng.randint(1, width - 2)
         if x != width // 3:  # Не трогаем уже существующий проход
-            game_map[wall_y][x] = ' '
+            game_map.set(x, wall_y, TILE_FLOOR)
     
     # Добавить несколько случайных стен
     for _ in range(10):
-        x = random.randint(1, width - 2)
-        y = random.randint(1, height - 2)
-        game_map[y][x] = '#'
+        x = rng.randint(1, width - 2)
+        y = rng.randint(1, height - 2)
+        game_map.set(x, y, TILE_WALL)
         
     return game_map
 
 
-def generate_random_map(width, height):
+@PROFILER.timed("map.random")
+def generate_random_map(width, height, rng=None):
     """
     Создать случайную карту с заданными размерами.
     
     Args:
         width (int): Ширина карты
         height (int): Высота карты
+        rng (random.Random): Источник случайных чисел (по умолчанию модуль random)
         
     Returns:
-        list: 2D список, представляющий карту, где '#' - стена, а ' ' - пустое пространство
+        TileGrid: Карта, где '#' - стена, а ' ' - пустое пространство
     """
-    # Инициализировать карту только со стенами
-    game_map = [['#' for _ in range(width)] for _ in range(height)]
+    if rng is None:
+        rng = random
+    
+    # Инициализировать карту только со стенами (1 - стена, 0 - пустое пространство)
+    walls = bytearray(b'\x01') * (width * height)
     
     # Создать пустые пространства с помощью клеточного автомата
     # Сначала случайно заполнить внутреннюю область стенами и пустыми пространствами
     for y in range(1, height - 1):
+        row_start = y * width
         for x in range(1, width - 1):
-            if random.random() < 0.6:  # 60% шанс быть пустым
-                game_map[y][x] = ' '
+            if rng.random() < 0.6:  # 60% шанс быть пустым
+                walls[row_start + x] = 0
     
     # Применить правила клеточного автомата для создания более естественных пещер
-    for _ in range(3):  # Применить правила несколько раз
-        new_map = [row[:] for row in game_map]  # Создать копию карты
-        
-        for y in range(1, height - 1):
-            for x in range(1, width - 1):
-                # Подсчитать стены в окрестности 3x3
-                wall_count = 0
-                for ny in range(y - 1, y + 2):
-                    for nx in range(x - 1, x + 2):
-                        if 0 <= ny < height and 0 <= nx < width and game_map[ny][nx] == '#':
-                            wall_count += 1
-                
-                # Применить правила клеточного автомата
-                if game_map[y][x] == '#':
-                    # Если у стены меньше 4 соседей-стен, сделать её пустой
-                    if wall_count < 4:
-                        new_map[y][x] = ' '
-                else:
-                    # Если у пустого пространства больше 5 соседей-стен, сделать его стеной
-                    if wall_count > 5:
-                        new_map[y][x] = '#'
-        
-        game_map = new_map
+    walls = apply_cellular_automaton(walls, width, height, passes=3)
+    game_map = TileGrid(width, height, cells=walls.translate(_WALLS_TO_TILES))
     
     # Убедиться, что достаточно пустых пространств (не менее 40% внутренней области)
-    empty_count = sum(row.count(' ') for row in game_map)
+    empty_count = game_map.count(TILE_FLOOR)
     inner_area = (width - 2) * (height - 2)
     min_empty = int(inner_area * 0.4)
     
@@ -259,39 +633,36 @@ def generate_random_map(width, height):
         attempts = 0
         
         while spaces_to_add > 0 and attempts < 1000:
-            x = random.randint(1, width - 2)
-            y = random.randint(1, height - 2)
+            x = rng.randint(1, width - 2)
+            y = rng.randint(1, height - 2)
             
-            if game_map[y][x] == '#':
-                game_map[y][x] = ' '
+            if game_map.is_wall(x, y):
+                game_map.set(x, y, TILE_FLOOR)
                 spaces_to_add -= 1
             
             attempts += 1
             
     # Убедиться, что внешняя граница состоит только из стен
     for y in range(height):
-        game_map[y][0] = '#'
-        game_map[y][width - 1] = '#'
+        game_map.set(0, y, TILE_WALL)
+        game_map.set(width - 1, y, TILE_WALL)
     
     for x in range(width):
-        game_map[0][x] = '#'
-        game_map[height - 1][x] = '#'
+        game_map.set(x, 0, TILE_WALL)
+        game_map.set(x, height - 1, TILE_WALL)
     
     # Проверить связность карты и соединить несвязанные регионы
     if not is_connected(game_map):
         game_map = connect_regions(game_map)
     
     # Сделать дополнительные проходы для улучшения соединения
+    connectivity = FloorConnectivity(game_map)
     for _ in range(width * height // 100):  # Количество проходов зависит от размера карты
-        x = random.randint(1, width - 2)
-        y = random.randint(1, height - 2)
+        x = rng.randint(1, width - 2)
+        y = rng.randint(1, height - 2)
         
-        # Проверяем, не создаем ли мы острова путем удаления этой стены
-        if game_map[y][x] == '#':
-            game_map[y][x] = ' '
-            
-            # Если карта стала несвязной, возвращаем стену на место
-            if not is_connected(game_map):
-                game_map[y][x] = '#'
+        # Пробиваем стену, только если это не создаст остров
+        if game_map.is_wall(x, y) and connectivity.can_open(x, y):
+            connectivity.open(x, y)
     
     return game_map
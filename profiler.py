@@ -0,0 +1,293 @@
+"""
+Модуль профилирования игрового цикла.
+
+Именованные таймеры (фазы) и счетчики для фаз игрового цикла, этапов генерации
+карты, хода врагов и боя. Профилировщик по умолчанию выключен: замер фазы тогда
+стоит одного вызова метода, который возвращает пустой контекстный менеджер.
+В режиме выборки (sample_every > 1) время измеряется только у каждого N-го вызова
+фазы, а количество вызовов считается точно.
+
+    with PROFILER.phase("turn.ai"):
+        ...
+    PROFILER.count("combat.attacks")
+
+Замеры можно писать в файл JSON Lines по мере измерения, итоговую статистику -
+в текстовый файл формата Prometheus, а при выходе - напечатать перцентили
+p50/p95/p99 по фазам.
+"""
+import functools
+import json
+import math
+import time
+from array import array
+
+# Сколько последних замеров каждой фазы хранить для перцентилей
+SAMPLE_CAPACITY = 4096
+
+# Перцентили итоговой статистики
+PERCENTILES = (50, 95, 99)
+
+# Префикс метрик в формате Prometheus
+METRIC_PREFIX = "roguelike"
+
+
+class _NullPhase:
+    """Пустой контекстный менеджер для выключенного профилировщика и пропущенных замеров."""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """Замер одного вызова фазы."""
+    
+    __slots__ = ('profiler', 'name', 'stats', 'start')
+    
+    def __init__(self, profiler, name, stats):
+        self.profiler = profiler
+        self.name = name
+        self.stats = stats
+        
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+        
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.start
+        self.stats.add(seconds)
+        if self.profiler.sink is not None:
+            self.profiler._write(self.name, seconds)
+        return False
+
+
+class PhaseStats:
+    """
+    Статистика фазы: точные количество вызовов, замеров и их сумма, а также
+    последние замеры (кольцевой буфер) для перцентилей.
+    """
+    
+    __slots__ = ('calls', 'count', 'total', 'last', 'samples')
+    
+    def __init__(self, capacity=SAMPLE_CAPACITY):
+        self.calls = 0  # Вызовов фазы, включая не попавшие в выборку
+        self.count = 0  # Измеренных вызовов
+        self.total = 0.0
+        self.last = 0.0
+        self.samples = array('d', [0.0]) * capacity
+        
+    def add(self, seconds):
+        """Добавить замер (в секундах)."""
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        
+    def percentile(self, percent):
+        """
+        Перцентиль последних замеров (по ближайшему рангу).
+        
+        Args:
+            percent (float): Перцентиль от 0 до 100
+            
+        Returns:
+            float: Время в секундах (0.0, если замеров нет)
+        """
+        values = sorted(self.samples[:min(self.count, len(self.samples))])
+        if not values:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * len(values)))
+        return values[rank - 1]
+        
+    def estimated_total(self):
+        """Оценка суммарного времени всех вызовов (с учетом пропущенных выборкой)."""
+        if not self.count:
+            return 0.0
+        return self.total / self.count * self.calls
+
+
+class Profiler:
+    """Именованные таймеры и счетчики."""
+    
+    def __init__(self, enabled=False, sample_every=1, capacity=SAMPLE_CAPACITY, path=None):
+        """
+        Инициализация профилировщика.
+        
+        Args:
+            enabled (bool): Измерять ли время и считать ли счетчики
+            sample_every (int): Измерять каждый N-й вызов фазы (1 - все вызовы)
+            capacity (int): Сколько последних замеров каждой фазы хранить
+            path (str): Файл для замеров в формате JSON Lines (None - не писать)
+        """
+        self.enabled = False
+        self.sample_every = 1
+        self.capacity = capacity
+        self.phases = {}
+        self.counters = {}
+        self.sink = None
+        if enabled:
+            self.enable(sample_every, path)
+            
+    def enable(self, sample_every=1, path=None):
+        """
+        Включить профилирование.
+        
+        Args:
+            sample_every (int): Измерять каждый N-й вызов фазы (1 - все вызовы)
+            path (str): Файл для замеров в формате JSON Lines (None - не писать)
+            
+        Raises:
+            ValueError: Если sample_every меньше 1
+        """
+        if sample_every < 1:
+            raise ValueError(f"Шаг выборки должен быть не меньше 1, получено {sample_every}")
+        self.sample_every = sample_every
+        if path:
+            self.close()
+            self.sink = open(path, 'w', encoding='utf-8')
+        self.enabled = True
+        
+    def disable(self):
+        """Выключить профилирование (накопленная статистика сохраняется)."""
+        self.enabled = False
+        
+    def reset(self):
+        """Удалить накопленную статистику и счетчики."""
+        self.phases = {}
+        self.counters = {}
+        
+    def phase(self, name):
+        """
+        Контекстный менеджер, измеряющий время фазы.
+        
+        Args:
+            name (str): Имя фазы (например, "loop.render" или "turn.ai")
+            
+        Returns:
+            Контекстный менеджер (пустой, если профилировщик выключен или вызов не попал в выборку)
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = PhaseStats(self.capacity)
+        stats.calls += 1
+        if self.sample_every > 1 and stats.calls % self.sample_every:
+            return _NULL_PHASE
+        return _Phase(self, name, stats)
+        
+    def timed(self, name):
+        """
+        Декоратор, измеряющий время каждого вызова функции как фазы.
+        
+        Args:
+            name (str): Имя фазы
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+        
+    def count(self, name, value=1):
+        """
+        Увеличить счетчик (если профилировщик включен).
+        
+        Args:
+            name (str): Имя счетчика
+            value (int): Приращение
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+            
+    def summary(self):
+        """
+        Итоговая статистика по фазам.
+        
+        Returns:
+            dict: Имя фазы -> {"calls", "count", "total", "last", "p50", "p95", "p99"} (время в секундах)
+        """
+        result = {}
+        for name, stats in sorted(self.phases.items()):
+            entry = {
+                "calls": stats.calls,
+                "count": stats.count,
+                "total": stats.estimated_total(),
+                "last": stats.last,
+            }
+            for percent in PERCENTILES:
+                entry[f"p{percent}"] = stats.percentile(percent)
+            result[name] = entry
+        return result
+        
+    def report(self):
+        """
+        Таблица статистики фаз и счетчиков для вывода на экран.
+        
+        Returns:
+            list: Строки таблицы
+        """
+        lines = [f"{'фаза':<22} {'вызовов':>8} {'сумма, с':>9} {'посл., мс':>9} "
+                 + " ".join(f"{f'p{percent}, мс':>9}" for percent in PERCENTILES)]
+        for name, entry in self.summary().items():
+            if not entry["count"]:
+                # Ни один вызов фазы не попал в выборку
+                lines.append(f"{name:<22} {entry['calls']:>8} {'-':>9}")
+                continue
+            lines.append(f"{name:<22} {entry['calls']:>8} {entry['total']:>9.3f} {entry['last'] * 1000:>9.3f} "
+                         + " ".join(f"{entry[f'p{percent}'] * 1000:>9.3f}" for percent in PERCENTILES))
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<22} {value:>8}")
+        return lines
+        
+    def write_prometheus(self, path):
+        """
+        Записать статистику в текстовый файл формата Prometheus.
+        
+        Фазы - метрика-сводка {METRIC_PREFIX}_phase_seconds с перцентилями,
+        счетчики - {METRIC_PREFIX}_events_total.
+        
+        Args:
+            path (str): Файл (например, для node_exporter textfile collector)
+        """
+        metric = f"{METRIC_PREFIX}_phase_seconds"
+        lines = [f"# HELP {metric} Время фаз игрового цикла.", f"# TYPE {metric} summary"]
+        for name, entry in self.summary().items():
+            for percent in PERCENTILES:
+                lines.append(f'{metric}{{phase="{name}",quantile="{percent / 100}"}} {entry[f"p{percent}"]:.9f}')
+            lines.append(f'{metric}_sum{{phase="{name}"}} {entry["total"]:.9f}')
+            lines.append(f'{metric}_count{{phase="{name}"}} {entry["calls"]}')
+        counter = f"{METRIC_PREFIX}_events_total"
+        lines += [f"# HELP {counter} Счетчики событий игры.", f"# TYPE {counter} counter"]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{counter}{{name="{name}"}} {value}')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("\n".join(lines) + "\n")
+            
+    def _write(self, name, seconds):
+        """Записать замер в файл одной строкой JSON."""
+        self.sink.write(json.dumps({"type": "sample", "phase": name, "seconds": seconds}) + "\n")
+        
+    def close(self):
+        """Дописать итоговую статистику в файл замеров (если он открыт) и закрыть его."""
+        if self.sink is None:
+            return
+        for name, entry in self.summary().items():
+            self.sink.write(json.dumps({"type": "summary", "phase": name, **entry}) + "\n")
+        for name, value in sorted(self.counters.items()):
+            self.sink.write(json.dumps({"type": "counter", "name": name, "value": value}) + "\n")
+        self.sink.close()
+        self.sink = None
+
+
+# Общий профилировщик игры (выключен, пока его не включат явно)
+PROFILER = Profiler()
@@ -0,0 +1,238 @@
+"""
+Модуль отрисовки кадров в терминале.
+
+FrameRenderer помнит предыдущий кадр и выводит только изменившиеся участки строк,
+перемещая курсор ANSI-последовательностями; кадр записывается одним вызовом
+write без запуска внешних команд очистки экрана. MapLayer хранит статический слой
+карты (клетки видимой области, скрытые до исследования) и пересобирает только
+строки, в которых изменились клетки или стоят сущности.
+"""
+import os
+import shutil
+import sys
+
+# ANSI-последовательности управления терминалом
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE_END = "\x1b[K"
+CLEAR_BELOW = "\x1b[J"
+
+# Сколько строк под кадром оставить для приглашения ввода и эха введенной строки
+PROMPT_LINES = 2
+
+# Неизменившиеся символы между двумя изменениями, которые дешевле перепечатать, чем
+# переместить курсор (последовательность перемещения занимает 6-8 байт)
+MERGE_GAP = 6
+
+
+def move_to(row, column):
+    """ANSI-последовательность перемещения курсора (строка и столбец с нуля)."""
+    return f"\x1b[{row + 1};{column + 1}H"
+
+
+def changed_spans(old, new):
+    """
+    Участки строки, которые отличаются в новой версии.
+    
+    Близкие участки объединяются, если перепечатать символы между ними дешевле,
+    чем переместить курсор.
+    
+    Args:
+        old (str): Предыдущая строка
+        new (str): Новая строка
+        
+    Returns:
+        list: Пары (начало, конец) участков новой строки
+    """
+    spans = []
+    start = None
+    last = None
+    for index in range(min(len(old), len(new))):
+        if old[index] != new[index]:
+            if start is None:
+                start = index
+            elif index - last > MERGE_GAP:
+                spans.append((start, last + 1))
+                start = index
+            last = index
+    if len(new) > len(old):
+        if start is not None and len(old) - last > MERGE_GAP:
+            spans.append((start, last + 1))
+            start = None
+        spans.append((len(old) if start is None else start, len(new)))
+    elif start is not None:
+        spans.append((start, last + 1))
+    return spans
+
+
+class FrameRenderer:
+    """
+    Вывод кадров с перерисовкой только изменившихся символов.
+    
+    В терминале каждая строка кадра обрезается по ширине экрана: перенесенная
+    терминалом строка заняла бы две строки экрана, и перемещения курсора по номерам
+    строк кадра попадали бы не туда. Если поток вывода не терминал (перенаправлен в
+    файл или канал), кадры выводятся целиком без управляющих последовательностей.
+    """
+    
+    def __init__(self, stream=None, screen_lines=None):
+        """
+        Инициализация.
+        
+        Args:
+            stream: Поток вывода (по умолчанию текущий sys.stdout)
+            screen_lines (int): Высота экрана в строках (None - узнавать у терминала)
+        """
+        self.stream = stream
+        self.screen_lines = screen_lines
+        self.previous = None  # Строки последнего выведенного кадра
+        if os.name == 'nt':
+            os.system('')  # Один раз включает обработку ANSI-последовательностей в консоли Windows
+            
+    def screen_size(self):
+        """
+        Размер экрана.
+        
+        Returns:
+            tuple: (столбцов, строк); высота - screen_lines, если она задана
+        """
+        columns, lines = shutil.get_terminal_size()
+        return columns, self.screen_lines or lines
+        
+    def invalidate(self):
+        """Перерисовать следующий кадр целиком (например, после вывода в обход рендерера)."""
+        self.previous = None
+        
+    def draw(self, lines):
+        """
+        Вывести кадр.
+        
+        Args:
+            lines (list): Строки кадра
+        """
+        stream = self.stream if self.stream is not None else sys.stdout
+        if not stream.isatty():
+            stream.write("\n".join(lines) + "\n")
+            return
+            
+        columns, screen_lines = self.screen_size()
+        # Последний столбец не занимается: в части терминалов вывод в него сразу переносит курсор
+        width = max(1, columns - 1)
+        lines = [line if len(line) <= width else line[:width] for line in lines]
+        
+        previous = self.previous
+        if previous is None or len(lines) + PROMPT_LINES > screen_lines:
+            # Первый кадр, или кадр не помещается на экран и терминал будет прокручиваться
+            parts = [CLEAR_SCREEN, "\n".join(lines), "\n"]
+        else:
+            # Сначала стираются приглашение и эхо ввода под прошлым кадром
+            parts = [move_to(len(previous), 0), CLEAR_BELOW]
+            for row, line in enumerate(lines):
+                old = previous[row] if row < len(previous) else ""
+                if line is old or line == old:
+                    continue
+                for start, end in changed_spans(old, line):
+                    parts.append(move_to(row, start))
+                    parts.append(line[start:end])
+                if len(line) < len(old):
+                    parts.append(move_to(row, len(line)))
+                    parts.append(CLEAR_LINE_END)
+            # Курсор под кадр (там же стираются лишние строки прошлого кадра)
+            parts.append(move_to(len(lines), 0))
+            parts.append(CLEAR_BELOW)
+        stream.write("".join(parts))
+        stream.flush()
+        self.previous = list(lines)
+
+
+class MapLayer:
+    """
+    Статический слой видимой области карты с кэшем строк.
+    
+    Клетки хранятся байтами (коды клеток TileGrid), строки пересобираются, только
+    если в них изменились клетки или стоят (стояли в прошлом кадре) сущности.
+    """
+    
+    def __init__(self):
+        """Инициализация пустого слоя."""
+        self.source = None  # Карта, из которой построен слой
+        self.key = None  # Область, режим и версия карты, для которых построен слой
+        self.left = 0
+        self.top = 0
+        self.width = 0
+        self.height = 0
+        self.cells = bytearray()
+        self.rows = []
+        self.dirty = set()  # Строки, которые нужно пересобрать
+        self.overlay_rows = set()  # Строки, в которых в прошлом кадре стояли сущности
+        
+    def matches(self, source, key):
+        """Построен ли слой для этой карты и этого ключа (области, режима, версии карты)."""
+        return self.source is source and self.key == key
+        
+    def rebuild(self, source, key, left, top, rows):
+        """
+        Построить слой заново.
+        
+        Args:
+            source: Карта
+            key (tuple): Ключ слоя для matches()
+            left (int): X-координата левого верхнего угла области
+            top (int): Y-координата левого верхнего угла области
+            rows (list): Строки клеток области (bytes одинаковой длины)
+        """
+        self.source = source
+        self.key = key
+        self.left = left
+        self.top = top
+        self.height = len(rows)
+        self.width = len(rows[0]) if rows else 0
+        self.cells = bytearray(b''.join(rows))
+        self.rows = [""] * self.height
+        self.dirty = set(range(self.height))
+        self.overlay_rows = set()
+        
+    def set_cell(self, x, y, tile):
+        """
+        Изменить клетку слоя (клетки вне области игнорируются).
+        
+        Args:
+            x (int): X-координата на карте
+            y (int): Y-координата на карте
+            tile (int): Код клетки
+        """
+        column = x - self.left
+        row = y - self.top
+        if 0 <= column < self.width and 0 <= row < self.height:
+            self.cells[row * self.width + column] = tile
+            self.dirty.add(row)
+            
+    def compose(self, overlay):
+        """
+        Строки области с сущностями поверх статического слоя.
+        
+        Args:
+            overlay (dict): Символы сущностей {(x, y): символ} в координатах карты;
+                при совпадении клеток побеждает добавленный позже
+                
+        Returns:
+            list: Строки области (неизменившиеся строки - те же объекты, что в прошлом кадре)
+        """
+        overlay_by_row = {}
+        for (x, y), char in overlay.items():
+            column = x - self.left
+            row = y - self.top
+            if 0 <= column < self.width and 0 <= row < self.height:
+                overlay_by_row.setdefault(row, []).append((column, char))
+                
+        width = self.width
+        for row in self.dirty | self.overlay_rows | overlay_by_row.keys():
+            text = self.cells[row * width:(row + 1) * width].decode('ascii')
+            if row in overlay_by_row:
+                chars = list(text)
+                for column, char in overlay_by_row[row]:
+                    chars[column] = char
+                text = ''.join(chars)
+            self.rows[row] = text
+        self.dirty = set()
+        self.overlay_rows = set(overlay_by_row)
+        return self.rows
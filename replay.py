@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Модуль записи и воспроизведения партий.
+
+Запись (replay) - это зерно и параметры партии и поток действий, переданных
+движку, с периодическими полными снимками состояния. Движок детерминирован,
+поэтому действия воспроизводят партию точно, а снимки позволяют перейти к
+любому ходу, не проигрывая партию с начала.
+
+Запуск: python replay.py game.rpl [--seek 500] [--show]
+"""
+import argparse
+import json
+import struct
+import time
+
+from engine import GameConfig, new_game
+from savegame import snapshot_bytes, load_snapshot
+
+# Заголовок записи: сигнатура, версия формата, длина JSON с параметрами партии
+REPLAY_MAGIC = b'RKRP'
+REPLAY_FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHI')
+
+# Записи: действие (тег и символ действия) и снимок (тег, номер действия, ход, длина)
+ACTION_TAG = b'A'
+SNAPSHOT_TAG = b'S'
+SNAPSHOT = struct.Struct('<cIII')
+
+# Через сколько ходов записывать снимок состояния
+SNAPSHOT_INTERVAL = 100
+
+
+class ReplayRecorder:
+    """Запись действий партии и периодических снимков в файл."""
+    
+    def __init__(self, engine, path, snapshot_every=SNAPSHOT_INTERVAL, initial_snapshot=False):
+        """
+        Начать запись.
+        
+        Args:
+            engine (GameEngine): Партия
+            path (str): Файл записи
+            snapshot_every (int): Через сколько ходов записывать снимок
+            initial_snapshot (bool): Записать снимок начального состояния (нужно, если
+                партия не только что создана new_game, например загружена из сохранения)
+        """
+        self.engine = engine
+        self.snapshot_every = snapshot_every
+        self.actions = 0
+        self.file = open(path, 'wb')
+        header = json.dumps({"config": vars(engine.config), "seed": engine.seed},
+                            ensure_ascii=False).encode('utf-8')
+        self.file.write(HEADER.pack(REPLAY_MAGIC, REPLAY_FORMAT_VERSION, len(header)) + header)
+        self.snapshot_turn = engine.turn
+        if initial_snapshot:
+            self.snapshot()
+            
+    def record(self, action):
+        """
+        Записать действие, уже выполненное движком (и снимок, если пора).
+        
+        Args:
+            action (str): Действие (один символ)
+            
+        Raises:
+            ValueError: Если действие не умещается в один байт
+        """
+        code = action.encode('ascii')
+        if len(code) != 1:
+            raise ValueError(f"Действие {action!r} нельзя записать")
+        self.file.write(ACTION_TAG + code)
+        self.actions += 1
+        if self.engine.turn - self.snapshot_turn >= self.snapshot_every:
+            self.snapshot()
+            
+    def snapshot(self):
+        """Записать снимок текущего состояния партии."""
+        data = snapshot_bytes(self.engine)
+        self.file.write(SNAPSHOT.pack(SNAPSHOT_TAG, self.actions, self.engine.turn, len(data)) + data)
+        self.file.flush()
+        self.snapshot_turn = self.engine.turn
+        
+    def close(self):
+        """Закрыть файл записи."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Replay:
+    """Воспроизведение записанной партии."""
+    
+    def __init__(self, path):
+        """
+        Прочитать запись.
+        
+        Оборванный хвост файла (например, после сбоя) отбрасывается.
+        
+        Args:
+            path (str): Файл записи
+            
+        Raises:
+            ValueError: Если файл не является записью поддерживаемого формата
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Файл {path} не является записью партии")
+        magic, version, header_size = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_FORMAT_VERSION:
+            raise ValueError(f"Файл {path} не является записью поддерживаемого формата")
+        offset = HEADER.size + header_size
+        header = json.loads(data[HEADER.size:offset].decode('utf-8'))
+        self.config = GameConfig(**header["config"])
+        self.seed = header["seed"]
+        
+        actions = bytearray()
+        self.snapshots = []  # (номер действия, ход, данные снимка) по возрастанию
+        view = memoryview(data)
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            if tag == ACTION_TAG and offset + 2 <= len(data):
+                actions.append(data[offset + 1])
+                offset += 2
+            elif tag == SNAPSHOT_TAG and offset + SNAPSHOT.size <= len(data):
+                _, action_index, turn, length = SNAPSHOT.unpack_from(data, offset)
+                offset += SNAPSHOT.size
+                if offset + length > len(data):
+                    break
+                self.snapshots.append((action_index, turn, view[offset:offset + length]))
+                offset += length
+            else:
+                break
+        self.actions = actions.decode('ascii')
+        
+    def __len__(self):
+        """Количество записанных действий."""
+        return len(self.actions)
+        
+    def start(self):
+        """
+        Начальное состояние партии.
+        
+        Returns:
+            tuple: (движок, номер следующего действия)
+        """
+        if self.snapshots and self.snapshots[0][0] == 0:
+            return load_snapshot(self.snapshots[0][2]), 0
+        return new_game(self.config, seed=self.seed), 0
+        
+    def play(self, engine, start, stop=None, turn=None):
+        """
+        Проиграть действия без отображения с максимальной скоростью.
+        
+        Args:
+            engine (GameEngine): Партия в состоянии перед действием start
+            start (int): Номер первого действия
+            stop (int): Номер действия, перед которым остановиться (None - до конца)
+            turn (int): Остановиться, как только партия дойдет до этого хода
+            
+        Returns:
+            int: Номер следующего непроигранного действия
+        """
+        if stop is None:
+            stop = len(self.actions)
+        step = engine.step
+        index = start
+        while index < stop and (turn is None or engine.turn < turn):
+            step(self.actions[index])
+            index += 1
+        return index
+        
+    def seek(self, turn):
+        """
+        Перейти к ходу: загрузить последний снимок не позже хода и доиграть от него.
+        
+        Args:
+            turn (int): Номер хода (если партия короче, результат - ее конец)
+            
+        Returns:
+            tuple: (движок, номер следующего действия)
+        """
+        engine, index = None, 0
+        for action_index, snapshot_turn, data in reversed(self.snapshots):
+            if snapshot_turn <= turn:
+                engine, index = load_snapshot(data), action_index
+                break
+        if engine is None:
+            engine, index = self.start()
+        return engine, self.play(engine, index, turn=turn)
+        
+    def run(self):
+        """
+        Проиграть запись до конца (с последнего снимка).
+        
+        Returns:
+            GameEngine: Партия в конечном состоянии
+        """
+        if self.snapshots:
+            action_index, _, data = self.snapshots[-1]
+            engine = load_snapshot(data)
+        else:
+            engine, action_index = self.start()
+        self.play(engine, action_index)
+        return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанной партии")
+    parser.add_argument("path", help="файл записи")
+    parser.add_argument("--seek", type=int, help="перейти к ходу (по умолчанию - к концу)")
+    parser.add_argument("--full", action="store_true", help="проиграть с начала, не используя снимки")
+    parser.add_argument("--show", action="store_true", help="показать карту на этом ходу")
+    args = parser.parse_args()
+    
+    replay = Replay(args.path)
+    start = time.perf_counter()
+    if args.full:
+        engine, index = replay.start()
+        replay.play(engine, index, turn=args.seek)
+    elif args.seek is not None:
+        engine, _ = replay.seek(args.seek)
+    else:
+        engine = replay.run()
+    elapsed = time.perf_counter() - start
+    
+    if args.show:
+        from game import Game  # game импортирует этот модуль, поэтому импорт здесь
+        game = Game()
+        game.engine = engine
+        game.explored = bytearray(engine.map_width * engine.map_height)
+        game.debug_mode = True
+        game.render()
+    print(f"Зерно: {replay.seed}, действий: {len(replay)}, снимков: {len(replay.snapshots)}")
+    print(f"Ход: {engine.turn}, HP игрока: {engine.player.hp}, врагов: {len(engine.enemies)}")
+    print(f"Время: {elapsed * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
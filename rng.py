@@ -0,0 +1,48 @@
+"""
+Модуль детерминированных источников случайных чисел для игровых подсистем.
+"""
+import random
+
+# Независимые потоки случайных чисел, выводимые из одного зерна игры
+STREAMS = ('map', 'spawn', 'ai', 'combat')
+
+
+def derive_rng(seed, name):
+    """
+    Создать независимый поток случайных чисел для подсистемы.
+
+    Args:
+        seed (int): Зерно игры
+        name (str): Имя подсистемы
+
+    Returns:
+        random.Random: Поток, зависящий только от зерна и имени
+    """
+    return random.Random(f"{seed}:{name}")
+
+
+def new_seed():
+    """Случайное зерно для новой игры."""
+    return random.SystemRandom().randrange(2 ** 63)
+
+
+class GameRandom:
+    """
+    Набор потоков случайных чисел игры: карта, появление врагов, ИИ и бой.
+
+    Потоки не влияют друг на друга, поэтому, например, дополнительный бросок
+    в бою не меняет поведение врагов.
+    """
+
+    def __init__(self, seed=None):
+        """
+        Инициализация потоков.
+
+        Args:
+            seed (int): Зерно игры (None - выбрать случайно)
+        """
+        if seed is None:
+            seed = new_seed()
+        self.seed = seed
+        for name in STREAMS:
+            setattr(self, name, derive_rng(seed, name))
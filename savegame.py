@@ -0,0 +1,710 @@
+"""
+Модуль сохранения и загрузки партии.
+
+Сохранение - двоичный файл с версией формата: заголовок и секции (тег, длина,
+данные). Карта хранится байтами клеток, враги - столбцами целых чисел хранилища
+EntityStore, журнал событий - своим кольцевым буфером, а параметры партии и имена -
+небольшой секцией JSON.
+
+Автосохранение (Autosave) записывает полный снимок редко, а между снимками дописывает
+в журнал изменений (файл с суффиксом JOURNAL_SUFFIX) только то, что изменилось с
+прошлого автосохранения: врагов, клетки карты, новые события и состояние генераторов
+случайных чисел. Журнал сворачивается в новый снимок каждые COMPACT_EVERY записей
+или когда становится больше снимка.
+"""
+import json
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+
+from chunked_map import ChunkedMap
+from engine import GameEngine, GameConfig
+from entities import Player
+from entity_store import EntityStore, COLUMNS
+from event_log import EventLog, EVENT_ARGS
+from rng import GameRandom, STREAMS
+from tiles import TileGrid
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него используется обычный Python
+    np = None
+
+# Заголовок сохранения: сигнатура, версия формата
+SAVE_MAGIC = b'RKSV'
+SAVE_FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sH')
+
+# Заголовок журнала изменений: сигнатура, версия формата, метка снимка, к которому он относится
+JOURNAL_MAGIC = b'RKJR'
+JOURNAL_HEADER = struct.Struct('<4sHQ')
+JOURNAL_SUFFIX = '.journal'
+
+# Запись журнала: длина данных и их CRC32 (оборванная при сбое запись отбрасывается)
+RECORD = struct.Struct('<II')
+
+# Секция: тег и длина данных
+SECTION = struct.Struct('<4sI')
+
+# Состояние генератора random.Random: версия, 625 слов, есть ли gauss_next, gauss_next
+RNG_STATE = struct.Struct('<B625I?d')
+
+# Характеристики игрока: x, y, hp, max_hp, sp, max_sp, dmg, arm
+PLAYER = struct.Struct('<8i')
+
+# Измененная клетка: чанк (cx, cy), номер клетки в чанке, код клетки
+# (у карты TileGrid один "чанк" (0, 0) размером со всю карту)
+TILE = struct.Struct('<iiIB')
+
+COUNT = struct.Struct('<I')
+COUNTS = struct.Struct('<II')
+
+# Через сколько записей журнал изменений сворачивается в новый снимок
+COMPACT_EVERY = 50
+
+
+def _int_bytes(values):
+    """Байты массива array('i') в порядке little-endian."""
+    if sys.byteorder == 'big':
+        values = array('i', values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _int_array(data):
+    """Массив array('i') из байтов в порядке little-endian."""
+    values = array('i')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _section(tag, payload):
+    """Секция файла: заголовок и данные."""
+    return SECTION.pack(tag, len(payload)) + payload
+
+
+def _read_sections(data):
+    """
+    Разобрать последовательность секций.
+    
+    Args:
+        data (memoryview): Данные секций
+        
+    Returns:
+        dict: Данные (memoryview, без копирования) по тегам
+        
+    Raises:
+        ValueError: Если секция обрезана
+    """
+    sections = {}
+    offset = 0
+    while offset < len(data):
+        if offset + SECTION.size > len(data):
+            raise ValueError("Сохранение повреждено: обрезан заголовок секции")
+        tag, length = SECTION.unpack_from(data, offset)
+        offset += SECTION.size
+        if offset + length > len(data):
+            raise ValueError(f"Сохранение повреждено: обрезана секция {tag!r}")
+        sections[tag] = data[offset:offset + length]
+        offset += length
+    return sections
+
+
+def _pack_rng_state(state):
+    """Упаковать состояние random.Random."""
+    version, internal, gauss = state
+    return RNG_STATE.pack(version, *internal, gauss is not None, gauss or 0.0)
+
+
+def _unpack_rng_state(data, offset=0):
+    """Распаковать состояние random.Random."""
+    values = RNG_STATE.unpack_from(data, offset)
+    return values[0], values[1:626], values[627] if values[626] else None
+
+
+def _pack_player(player):
+    """Упаковать характеристики игрока."""
+    return PLAYER.pack(player.x, player.y, player.hp, player.max_hp,
+                       player.sp, player.max_sp, player.dmg, player.arm)
+
+
+def _pack_tiles(changes):
+    """Упаковать измененные клетки (cx, cy, номер, код)."""
+    return COUNT.pack(len(changes)) + b''.join(TILE.pack(*change) for change in changes)
+
+
+def _unpack_tiles(data):
+    """Распаковать измененные клетки."""
+    count, = COUNT.unpack_from(data)
+    return [TILE.unpack_from(data, COUNT.size + index * TILE.size) for index in range(count)]
+
+
+def _pack_events(log, first):
+    """Упаковать события журнала, начиная с номера first (вытесненные пропускаются)."""
+    events = log.since(first)
+    codes = bytes(code for code, _ in events)
+    args = array('i', [value for _, event_args in events for value in event_args])
+    return COUNTS.pack(log.total, len(events)) + codes + _int_bytes(args)
+
+
+def _map_meta(game_map):
+    """Описание карты для секции META."""
+    if isinstance(game_map, ChunkedMap):
+        return {"kind": "chunked", "seed": game_map.seed, "chunk_size": game_map.chunk_size,
+                "world_width": game_map.world_width, "world_height": game_map.world_height,
+                "cache_size": game_map.cache_size}
+    return {"kind": "grid"}
+
+
+def _map_overrides(game_map):
+    """Измененные клетки мира из чанков (cx, cy, номер, код)."""
+    return [(cx, cy, index, tile)
+            for (cx, cy), cells in game_map.overrides.items()
+            for index, tile in cells.items()]
+
+
+def snapshot_bytes(engine, token=0):
+    """
+    Полное сохранение партии.
+    
+    Args:
+        engine (GameEngine): Партия
+        token (int): Метка снимка (связывает снимок с его журналом изменений)
+        
+    Returns:
+        bytes: Содержимое файла сохранения
+    """
+    enemies = engine.enemies
+    meta = {
+        "token": token,
+        "config": vars(engine.config),
+        "seed": engine.seed,
+        "turn": engine.turn,
+        "running": engine.running,
+        "won": engine.won,
+        "player": {"name": engine.player.name, "char_class": engine.player.char_class},
+        "map": _map_meta(engine.current_map),
+        "enemy_names": enemies.names,
+        "log_names": engine.log.names,
+    }
+    
+    game_map = engine.current_map
+    if isinstance(game_map, ChunkedMap):
+        map_data = _pack_tiles(_map_overrides(game_map))
+    else:
+        map_data = COUNTS.pack(game_map.width, game_map.height) + bytes(game_map.cells)
+        
+    entity_data = [COUNTS.pack(len(enemies.ids), len(enemies.slot_of)),
+                   _int_bytes(enemies.ids), _int_bytes(enemies.slot_of)]
+    entity_data.extend(_int_bytes(getattr(enemies, column)) for column in COLUMNS)
+    
+    log = engine.log
+    log_data = COUNTS.pack(log.capacity, log.total) + bytes(log.codes) + _int_bytes(log.args)
+    
+    return b''.join((
+        HEADER.pack(SAVE_MAGIC, SAVE_FORMAT_VERSION),
+        _section(b'META', json.dumps(meta, ensure_ascii=False).encode('utf-8')),
+        _section(b'RNG ', b''.join(_pack_rng_state(getattr(engine.rng, name).getstate()) for name in STREAMS)),
+        _section(b'MAP ', map_data),
+        _section(b'PLYR', _pack_player(engine.player)),
+        _section(b'ENTS', b''.join(entity_data)),
+        _section(b'LOG ', log_data),
+    ))
+
+
+def _write_atomic(path, data):
+    """Записать файл атомарно (через временный файл)."""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def save_game(engine, path, token=0):
+    """
+    Сохранить партию в файл целиком.
+    
+    Args:
+        engine (GameEngine): Партия
+        path (str): Путь к файлу сохранения
+        token (int): Метка снимка
+        
+    Returns:
+        int: Размер сохранения в байтах
+    """
+    data = snapshot_bytes(engine, token)
+    _write_atomic(path, data)
+    return len(data)
+
+
+class _SavedState:
+    """Разобранное сохранение, к которому применяются записи журнала изменений."""
+    
+    def __init__(self, data):
+        """
+        Разобрать полное сохранение.
+        
+        Args:
+            data (memoryview): Содержимое файла сохранения
+            
+        Raises:
+            ValueError: Если файл не является сохранением поддерживаемого формата
+        """
+        if len(data) < HEADER.size:
+            raise ValueError("Файл не является сохранением")
+        magic, version = HEADER.unpack_from(data)
+        if magic != SAVE_MAGIC or version != SAVE_FORMAT_VERSION:
+            raise ValueError("Файл не является сохранением поддерживаемого формата")
+        sections = _read_sections(data[HEADER.size:])
+        
+        self.meta = json.loads(bytes(sections[b'META']).decode('utf-8'))
+        self.rng_states = [_unpack_rng_state(sections[b'RNG '], index * RNG_STATE.size)
+                           for index in range(len(STREAMS))]
+        self.player = PLAYER.unpack(sections[b'PLYR'])
+        
+        map_meta = self.meta["map"]
+        map_data = sections[b'MAP ']
+        if map_meta["kind"] == "chunked":
+            self.game_map = ChunkedMap(map_meta["seed"], chunk_size=map_meta["chunk_size"],
+                                       world_width=map_meta["world_width"],
+                                       world_height=map_meta["world_height"],
+                                       cache_size=map_meta["cache_size"])
+            self.apply_tiles(_unpack_tiles(map_data))
+        else:
+            width, height = COUNTS.unpack_from(map_data)
+            self.game_map = TileGrid(width, height, cells=bytearray(map_data[COUNTS.size:]))
+            
+        entity_data = sections[b'ENTS']
+        count, id_count = COUNTS.unpack_from(entity_data)
+        offset = COUNTS.size
+        self.ids = _int_array(entity_data[offset:offset + 4 * count])
+        offset += 4 * count
+        self.slot_of = _int_array(entity_data[offset:offset + 4 * id_count])
+        offset += 4 * id_count
+        self.columns = {}
+        for column in COLUMNS:
+            self.columns[column] = _int_array(entity_data[offset:offset + 4 * count])
+            offset += 4 * count
+        self.enemy_names = list(self.meta["enemy_names"])
+        
+        log_data = sections[b'LOG ']
+        capacity, total = COUNTS.unpack_from(log_data)
+        self.log = EventLog(capacity)
+        self.log.total = total
+        offset = COUNTS.size
+        self.log.codes = bytearray(log_data[offset:offset + capacity])
+        self.log.args = _int_array(log_data[offset + capacity:])
+        for name in self.meta["log_names"]:
+            self.log.name_id(name)
+            
+    def apply_tiles(self, changes):
+        """Применить измененные клетки карты."""
+        game_map = self.game_map
+        if isinstance(game_map, ChunkedMap):
+            for cx, cy, index, tile in changes:
+                game_map.overrides.setdefault((cx, cy), {})[index] = tile
+        else:
+            for _, _, index, tile in changes:
+                game_map.cells[index] = tile
+                
+    def apply_delta(self, data):
+        """
+        Применить одну запись журнала изменений.
+        
+        Args:
+            data (memoryview): Данные записи
+        """
+        sections = _read_sections(data)
+        meta = json.loads(bytes(sections[b'META']).decode('utf-8'))
+        for key in ("turn", "running", "won"):
+            self.meta[key] = meta[key]
+        self.enemy_names.extend(meta["enemy_names"])
+        for name in meta["log_names"]:
+            self.log.name_id(name)
+            
+        rng_data = sections[b'RNG ']
+        for offset in range(0, len(rng_data), 1 + RNG_STATE.size):
+            self.rng_states[rng_data[offset]] = _unpack_rng_state(rng_data, offset + 1)
+        self.player = PLAYER.unpack(sections[b'PLYR'])
+        
+        if b'TILE' in sections:
+            self.apply_tiles(_unpack_tiles(sections[b'TILE']))
+        if b'EIDS' in sections:
+            self._reorder_entities(sections[b'EIDS'])
+        if b'ECOL' in sections:
+            self._update_entities(sections[b'ECOL'])
+        if b'LOGE' in sections:
+            self._append_events(sections[b'LOGE'])
+            
+    def _reorder_entities(self, data):
+        """Установить новый порядок врагов (после удаления или добавления)."""
+        count, id_count = COUNTS.unpack_from(data)
+        ids = _int_array(data[COUNTS.size:COUNTS.size + 4 * count])
+        old_slot_of = self.slot_of
+        slot_of = array('i', [-1]) * id_count
+        for slot, entity_id in enumerate(ids):
+            slot_of[entity_id] = slot
+            
+        # Значения врагов переносятся на новые слоты; значения новых врагов придут в ECOL
+        if np is not None:
+            # Новый враг может стоять в середине: удаление переносит последнего врага на место удаленного
+            ids_np = np.frombuffer(ids, dtype=np.intc)
+            old_slots = np.full(count, -1, dtype=np.intp)
+            known = ids_np < len(old_slot_of)
+            old_slots[known] = np.frombuffer(old_slot_of, dtype=np.intc)[ids_np[known]]
+            present = old_slots != -1
+            for column in COLUMNS:
+                values = np.zeros(count, dtype=np.intc)
+                values[present] = np.frombuffer(self.columns[column], dtype=np.intc)[old_slots[present]]
+                self.columns[column] = array('i', values.tobytes())
+        else:
+            old_slots = [old_slot_of[entity_id] if entity_id < len(old_slot_of) else -1 for entity_id in ids]
+            for column in COLUMNS:
+                old_values = self.columns[column]
+                self.columns[column] = array('i', [old_values[slot] if slot != -1 else 0 for slot in old_slots])
+        self.ids = ids
+        self.slot_of = slot_of
+        
+    def _update_entities(self, data):
+        """Записать новые значения врагов: по каждому столбцу - идентификаторы и значения."""
+        offset = 0
+        while offset < len(data):
+            column_index, count = COUNTS.unpack_from(data, offset)
+            offset += COUNTS.size
+            ids = _int_array(data[offset:offset + 4 * count])
+            offset += 4 * count
+            values = _int_array(data[offset:offset + 4 * count])
+            offset += 4 * count
+            target = self.columns[COLUMNS[column_index]]
+            if np is not None:
+                slots = np.frombuffer(self.slot_of, dtype=np.intc)[np.frombuffer(ids, dtype=np.intc)]
+                view = np.frombuffer(target, dtype=np.intc)
+                view[slots] = np.frombuffer(values, dtype=np.intc)
+                del view  # Пока представление существует, размер массива нельзя менять
+            else:
+                slot_of = self.slot_of
+                for entity_id, value in zip(ids, values):
+                    target[slot_of[entity_id]] = value
+                    
+    def _append_events(self, data):
+        """Добавить новые события в журнал событий."""
+        total, count = COUNTS.unpack_from(data)
+        codes = data[COUNTS.size:COUNTS.size + count]
+        args = _int_array(data[COUNTS.size + count:])
+        log = self.log
+        log.total = total - count
+        for index, code in enumerate(codes):
+            log.add(code, *args[index * EVENT_ARGS:(index + 1) * EVENT_ARGS])
+            
+    def build_engine(self):
+        """Создать движок с восстановленной партией."""
+        meta = self.meta
+        engine = GameEngine.__new__(GameEngine)
+        engine.config = GameConfig(**meta["config"])
+        engine.rng = GameRandom(meta["seed"])
+        for name, state in zip(STREAMS, self.rng_states):
+            getattr(engine.rng, name).setstate(state)
+        engine.seed = meta["seed"]
+        engine.running = meta["running"]
+        engine.won = meta["won"]
+        engine.turn = meta["turn"]
+        engine.enemies = EntityStore.from_arrays(self.ids, self.slot_of, self.columns, self.enemy_names)
+        engine.log = self.log
+        engine.attach_map(self.game_map)
+        
+        x, y, hp, max_hp, sp, max_sp, dmg, arm = self.player
+        player = Player(meta["player"]["name"], meta["player"]["char_class"], x, y)
+        player.hp, player.max_hp, player.sp, player.max_sp, player.dmg, player.arm = hp, max_hp, sp, max_sp, dmg, arm
+        engine.player = player
+        return engine
+
+
+def _read_journal(path, token):
+    """
+    Прочитать записи журнала изменений, относящиеся к снимку с меткой token.
+    
+    Журнал от другого снимка (например, оставшийся после сбоя во время сворачивания)
+    игнорируется, а чтение останавливается на первой оборванной или поврежденной записи.
+    
+    Returns:
+        list: Данные записей (memoryview)
+    """
+    try:
+        with open(path, 'rb') as file:
+            data = memoryview(file.read())
+    except FileNotFoundError:
+        return []
+    if len(data) < JOURNAL_HEADER.size:
+        return []
+    magic, version, journal_token = JOURNAL_HEADER.unpack_from(data)
+    if magic != JOURNAL_MAGIC or version != SAVE_FORMAT_VERSION or journal_token != token:
+        return []
+        
+    records = []
+    offset = JOURNAL_HEADER.size
+    while offset + RECORD.size <= len(data):
+        length, checksum = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        record = data[offset:offset + length]
+        if len(record) != length or zlib.crc32(record) != checksum:
+            break
+        records.append(record)
+        offset += length
+    return records
+
+
+def load_snapshot(data):
+    """
+    Восстановить партию из полного снимка в памяти (без журнала изменений).
+    
+    Args:
+        data (bytes): Содержимое снимка (например, из snapshot_bytes)
+        
+    Returns:
+        GameEngine: Движок с восстановленной партией
+        
+    Raises:
+        ValueError: Если данные не являются сохранением поддерживаемого формата
+    """
+    return _SavedState(memoryview(data)).build_engine()
+
+
+def load_game(path):
+    """
+    Загрузить партию: полный снимок и, если есть, записи журнала изменений к нему.
+    
+    Args:
+        path (str): Путь к файлу сохранения
+        
+    Returns:
+        GameEngine: Движок с восстановленной партией
+        
+    Raises:
+        ValueError: Если файл не является сохранением поддерживаемого формата
+    """
+    with open(path, 'rb') as file:
+        state = _SavedState(memoryview(file.read()))
+    for record in _read_journal(path + JOURNAL_SUFFIX, state.meta["token"]):
+        state.apply_delta(record)
+    return state.build_engine()
+
+
+class Autosave:
+    """
+    Автосохранение партии: полный снимок и дописываемый журнал изменений к нему.
+    
+    Для вычисления изменений хранится копия состояния на момент прошлого
+    автосохранения; столбцы врагов и клетки карты сравниваются целиком на уровне
+    массивов, поэтому запись журнала стоит немногим больше копирования этих массивов.
+    """
+    
+    def __init__(self, engine, path, compact_every=COMPACT_EVERY):
+        """
+        Начать автосохранение: записать полный снимок.
+        
+        Args:
+            engine (GameEngine): Партия
+            path (str): Путь к файлу сохранения (журнал - рядом, с суффиксом JOURNAL_SUFFIX)
+            compact_every (int): Через сколько записей журнал сворачивается в снимок
+        """
+        self.engine = engine
+        self.path = path
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.compact_every = compact_every
+        self.journal = None
+        self.tiles = None
+        self.map_version = None
+        self.checkpoint()
+        
+    def checkpoint(self):
+        """Записать полный снимок и начать новый журнал изменений."""
+        self.token = int.from_bytes(os.urandom(8), 'little')
+        self.snapshot_size = save_game(self.engine, self.path, self.token)
+        if self.journal is not None:
+            self.journal.close()
+        self.journal = open(self.journal_path, 'wb')
+        self.journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, SAVE_FORMAT_VERSION, self.token))
+        self.journal.flush()
+        self.journal_size = JOURNAL_HEADER.size
+        self.records = 0
+        self._remember()
+        
+    def _remember(self):
+        """Запомнить текущее состояние как основу для следующей записи журнала."""
+        engine = self.engine
+        enemies = engine.enemies
+        self.turn = engine.turn
+        self.ids = array('i', enemies.ids)
+        self.slot_of = array('i', enemies.slot_of)
+        self.columns = {column: array('i', getattr(enemies, column)) for column in COLUMNS}
+        self.enemy_names = len(enemies.names)
+        self.log_names = len(engine.log.names)
+        self.log_total = engine.log.total
+        self.rng_states = [getattr(engine.rng, name).getstate() for name in STREAMS]
+        # Копия клеток нужна, только если карта изменилась с прошлого раза
+        game_map = engine.current_map
+        if self.tiles is None or game_map.version != self.map_version:
+            self.map_version = game_map.version
+            if isinstance(game_map, ChunkedMap):
+                self.tiles = {key: dict(cells) for key, cells in game_map.overrides.items()}
+            else:
+                self.tiles = bytes(game_map.cells)
+                
+    def _entity_changes(self):
+        """
+        Изменения врагов с прошлой записи по столбцам.
+        
+        Враг попадает в столбец, только если изменилось именно это значение (обычно
+        меняются лишь координаты), а новые враги - во все столбцы.
+        
+        Returns:
+            list: Кортежи (номер столбца, байты идентификаторов, байты значений)
+        """
+        enemies = self.engine.enemies
+        same_order = enemies.ids == self.ids
+        changes = []
+        if np is not None:
+            ids = np.frombuffer(enemies.ids, dtype=np.intc)
+            if not same_order:
+                old_slots = np.full(len(ids), -1, dtype=np.intp)
+                known = ids < len(self.slot_of)
+                old_slots[known] = np.frombuffer(self.slot_of, dtype=np.intc)[ids[known]]
+                kept = old_slots != -1
+            for column_index, column in enumerate(COLUMNS):
+                values = getattr(enemies, column)
+                old_values = self.columns[column]
+                if same_order and values == old_values:
+                    continue
+                values = np.frombuffer(values, dtype=np.intc)
+                old_values = np.frombuffer(old_values, dtype=np.intc)
+                if same_order:
+                    changed = values != old_values
+                else:
+                    changed = ~kept
+                    changed[kept] = values[kept] != old_values[old_slots[kept]]
+                slots = np.flatnonzero(changed)
+                if len(slots):
+                    changes.append((column_index, ids[slots].astype('<i4').tobytes(),
+                                    values[slots].astype('<i4').tobytes()))
+            return changes
+            
+        ids = enemies.ids
+        if not same_order:
+            old_slot_of = self.slot_of
+            old_slots = [old_slot_of[entity_id] if entity_id < len(old_slot_of) else -1 for entity_id in ids]
+        for column_index, column in enumerate(COLUMNS):
+            values = getattr(enemies, column)
+            old_values = self.columns[column]
+            if same_order:
+                if values == old_values:
+                    continue
+                slots = [slot for slot, (value, old_value) in enumerate(zip(values, old_values))
+                         if value != old_value]
+            else:
+                slots = [slot for slot, (value, old_slot) in enumerate(zip(values, old_slots))
+                         if old_slot == -1 or value != old_values[old_slot]]
+            if slots:
+                changes.append((column_index, _int_bytes(array('i', [ids[slot] for slot in slots])),
+                                _int_bytes(array('i', [values[slot] for slot in slots]))))
+        return changes
+        
+    def _changed_tiles(self):
+        """Клетки карты, изменившиеся с прошлой записи (cx, cy, номер, код)."""
+        game_map = self.engine.current_map
+        if game_map.version == self.map_version:
+            return []
+        if isinstance(game_map, ChunkedMap):
+            return [(cx, cy, index, tile)
+                    for (cx, cy), cells in game_map.overrides.items()
+                    for index, tile in cells.items()
+                    if self.tiles.get((cx, cy), {}).get(index) != tile]
+        cells = game_map.cells
+        if np is not None:
+            indices = np.flatnonzero(np.frombuffer(cells, dtype=np.uint8) !=
+                                     np.frombuffer(self.tiles, dtype=np.uint8)).tolist()
+        else:
+            indices = [index for index, (tile, old_tile) in enumerate(zip(cells, self.tiles))
+                       if tile != old_tile]
+        return [(0, 0, index, cells[index]) for index in indices]
+        
+    def delta_bytes(self):
+        """
+        Запись журнала изменений с прошлого автосохранения.
+        
+        Returns:
+            bytes: Данные записи
+        """
+        engine = self.engine
+        enemies = engine.enemies
+        log = engine.log
+        meta = {
+            "turn": engine.turn,
+            "running": engine.running,
+            "won": engine.won,
+            "enemy_names": enemies.names[self.enemy_names:],
+            "log_names": log.names[self.log_names:],
+        }
+        rng_data = []
+        for index, name in enumerate(STREAMS):
+            state = getattr(engine.rng, name).getstate()
+            if state != self.rng_states[index]:
+                rng_data.append(bytes((index,)) + _pack_rng_state(state))
+        sections = [
+            _section(b'META', json.dumps(meta, ensure_ascii=False).encode('utf-8')),
+            _section(b'RNG ', b''.join(rng_data)),
+            _section(b'PLYR', _pack_player(engine.player)),
+        ]
+        
+        tiles = self._changed_tiles()
+        if tiles:
+            sections.append(_section(b'TILE', _pack_tiles(tiles)))
+            
+        if enemies.ids != self.ids:
+            sections.append(_section(b'EIDS', COUNTS.pack(len(enemies.ids), len(enemies.slot_of)) +
+                                     _int_bytes(enemies.ids)))
+        changes = self._entity_changes()
+        if changes:
+            sections.append(_section(b'ECOL', b''.join(COUNTS.pack(column_index, len(ids) // 4) + ids + values
+                                                       for column_index, ids, values in changes)))
+                                                       
+        if log.total != self.log_total:
+            sections.append(_section(b'LOGE', _pack_events(log, self.log_total)))
+        return b''.join(sections)
+        
+    def save(self):
+        """
+        Дописать в журнал изменения с прошлого автосохранения (и свернуть журнал, если пора).
+        
+        Returns:
+            int: Сколько байт записано
+        """
+        record = self.delta_bytes()
+        self.journal.write(RECORD.pack(len(record), zlib.crc32(record)) + record)
+        self.journal.flush()
+        self.journal_size += RECORD.size + len(record)
+        self.records += 1
+        written = RECORD.size + len(record)
+        
+        if self.records >= self.compact_every or self.journal_size > self.snapshot_size:
+            self.checkpoint()
+            written += self.snapshot_size
+        else:
+            self._remember()
+        return written
+        
+    def close(self):
+        """Дописать последние изменения и закрыть журнал."""
+        if self.journal is not None:
+            self.save()
+            self.journal.close()
+            self.journal = None
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Модуль пакетного проигрывания партий без интерфейса.
+
+Партии идут на движке GameEngine с агентом вместо игрока и распределяются по
+пулу процессов. Агент - функция agent(engine) -> действие; он создается
+фабрикой из AGENTS по зерну партии, поэтому результат партии зависит только
+от зерна и параметров.
+
+Запуск: python simulate.py --seeds 0-9999 --agent random --workers 4
+"""
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import GameConfig, new_game, MOVES, MAP_STANDARD, MAP_RANDOM, MAP_WORLD
+from map_cache import parse_range
+from travel import find_path, path_to_unexplored, mark_explored
+
+# Ограничение длины партии по умолчанию (в действиях агента)
+MAX_TURNS = 500
+
+# Исходы партии
+OUTCOME_WIN = 'win'
+OUTCOME_LOSS = 'loss'
+OUTCOME_TIMEOUT = 'timeout'
+
+_MOVE_ACTIONS = tuple(MOVES)
+
+
+def random_agent(seed):
+    """
+    Агент, выбирающий направление случайно.
+    
+    Args:
+        seed (int): Зерно партии (поток агента от него независим от потоков игры)
+        
+    Returns:
+        callable: Агент agent(engine) -> действие
+    """
+    choice = random.Random(f"{seed}:agent").choice
+    return lambda engine: choice(_MOVE_ACTIONS)
+
+
+def greedy_agent(seed):
+    """
+    Агент, идущий к ближайшему врагу (при упоре в стену - случайный шаг).
+    
+    Args:
+        seed (int): Зерно партии
+        
+    Returns:
+        callable: Агент agent(engine) -> действие
+    """
+    rng = random.Random(f"{seed}:agent")
+    
+    def agent(engine):
+        player = engine.player
+        target = min(engine.enemies, key=lambda enemy: abs(enemy.x - player.x) + abs(enemy.y - player.y))
+        dx = target.x - player.x
+        dy = target.y - player.y
+        if abs(dx) >= abs(dy):
+            action = 'd' if dx > 0 else 'a'
+        else:
+            action = 's' if dy > 0 else 'w'
+        step_x, step_y = MOVES[action]
+        if engine.current_map.is_wall(player.x + step_x, player.y + step_y):
+            action = rng.choice(_MOVE_ACTIONS)
+        return action
+        
+    return agent
+
+
+def explore_agent(seed):
+    """
+    Агент, исследующий карту: идет к ближайшей неисследованной клетке, а увидев
+    врага - к нему по кратчайшему пути (когда все исследовано - к ближайшему врагу).
+    
+    Args:
+        seed (int): Зерно партии
+        
+    Returns:
+        callable: Агент agent(engine) -> действие
+    """
+    rng = random.Random(f"{seed}:agent")
+    explored = None
+    
+    def agent(engine):
+        nonlocal explored
+        if explored is None:
+            explored = bytearray(engine.map_width * engine.map_height)
+        mark_explored(engine, explored)
+        player = engine.player
+        position = (player.x, player.y)
+        
+        def distance(enemy):
+            return abs(enemy.x - player.x) + abs(enemy.y - player.y)
+            
+        path = None
+        enemies = engine.visible_enemies()
+        if not enemies:
+            path = path_to_unexplored(engine.current_map, position, explored, engine.map_width)
+            if path is None:
+                enemies = [min(engine.enemies, key=distance)]
+        if enemies:
+            target = min(enemies, key=distance)
+            path = find_path(engine.current_map, position, (target.x, target.y))
+        return path[0] if path else rng.choice(_MOVE_ACTIONS)
+        
+    return agent
+
+
+# Фабрики агентов по имени (имя, а не функция, передается в рабочие процессы)
+AGENTS = {
+    'random': random_agent,
+    'greedy': greedy_agent,
+    'explore': explore_agent,
+}
+
+
+def play_game(config, seed, agent='random', max_turns=MAX_TURNS):
+    """
+    Проиграть одну партию.
+    
+    Args:
+        config (GameConfig): Параметры партии
+        seed (int): Зерно партии
+        agent (str или callable): Имя агента из AGENTS или фабрика agent_factory(seed)
+        max_turns (int): Максимум действий агента
+        
+    Returns:
+        tuple: (зерно, исход, количество ходов, оставшиеся HP игрока)
+    """
+    engine = new_game(config, seed=seed)
+    factory = AGENTS[agent] if isinstance(agent, str) else agent
+    act = factory(seed)
+    
+    step = engine.step
+    for _ in range(max_turns):
+        step(act(engine))
+        if not engine.running:
+            break
+            
+    if engine.won:
+        outcome = OUTCOME_WIN
+    elif engine.player.hp <= 0:
+        outcome = OUTCOME_LOSS
+    else:
+        outcome = OUTCOME_TIMEOUT
+    return seed, outcome, engine.turn, engine.player.hp
+
+
+def _play_chunk(job):
+    """Проиграть партии для группы зерен в рабочем процессе."""
+    config, seeds, agent, max_turns = job
+    return [play_game(config, seed, agent, max_turns) for seed in seeds]
+
+
+def run_games(seeds, config=None, agent='random', max_turns=MAX_TURNS, workers=None, chunksize=None):
+    """
+    Проиграть пакет партий, распределив зерна по пулу процессов.
+    
+    Результат для каждого зерна совпадает с последовательным проигрыванием.
+    
+    Args:
+        seeds (list): Зерна партий
+        config (GameConfig): Параметры партий (None - стандартная карта)
+        agent (str или callable): Имя агента из AGENTS или фабрика agent_factory(seed);
+            для нескольких процессов фабрика должна быть функцией уровня модуля
+        max_turns (int): Максимум действий агента в партии
+        workers (int): Количество процессов (по умолчанию число ядер; 1 - без пула)
+        chunksize (int): Сколько партий отправлять процессу за раз
+        
+    Returns:
+        list: Результаты (зерно, исход, количество ходов, HP игрока) в порядке зерен
+    """
+    seeds = list(seeds)
+    if config is None:
+        config = GameConfig()
+    if workers is None:
+        workers = os.cpu_count() or 1
+        
+    if workers <= 1 or len(seeds) <= 1:
+        return _play_chunk((config, seeds, agent, max_turns))
+        
+    # Партии короткие, поэтому зерна передаются группами, а не по одному
+    if chunksize is None:
+        chunksize = max(1, len(seeds) // (workers * 4))
+    jobs = [(config, seeds[start:start + chunksize], agent, max_turns)
+            for start in range(0, len(seeds), chunksize)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(_play_chunk, jobs):
+            results.extend(chunk)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пакетное проигрывание партий без интерфейса")
+    parser.add_argument("--seeds", default="0-999", help="зерна: '0-999' или '1,5,7'")
+    parser.add_argument("--agent", choices=sorted(AGENTS), default="random")
+    parser.add_argument("--map", choices=(MAP_STANDARD, MAP_RANDOM, MAP_WORLD), default=MAP_STANDARD)
+    parser.add_argument("--size", default="50x30", help="размер случайной карты ШИРИНАxВЫСОТА")
+    parser.add_argument("--more", action="store_true", help="режим с увеличенным количеством врагов")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, help="максимум ходов в партии")
+    parser.add_argument("--workers", type=int, default=None, help="количество процессов")
+    args = parser.parse_args()
+    
+    width, height = (int(value) for value in args.size.lower().split("x"))
+    config = GameConfig(map_type=args.map, width=width, height=height, more_enemies=args.more)
+    seeds = parse_range(args.seeds)
+    
+    start = time.perf_counter()
+    results = run_games(seeds, config, agent=args.agent, max_turns=args.max_turns, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    
+    outcomes = [outcome for _, outcome, _, _ in results]
+    turns = sum(turn for _, _, turn, _ in results)
+    print(f"Партий: {len(results)}")
+    print(f"Победы: {outcomes.count(OUTCOME_WIN)}, поражения: {outcomes.count(OUTCOME_LOSS)}, "
+          f"без исхода: {outcomes.count(OUTCOME_TIMEOUT)}")
+    print(f"Ходов в среднем: {turns / max(1, len(results)):.1f}")
+    print(f"Время: {elapsed:.2f} с ({len(results) / elapsed:.0f} партий/с, {turns / elapsed:.0f} ходов/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Модуль размещения сущностей: индекс свободных клеток по секторам и расстановка
+врагов с минимальными расстояниями (выборка по Пуассону, "синий шум").
+"""
+from entity_store import cell_key
+from tiles import TILE_FLOOR
+
+# Размер стороны сектора индекса в клетках
+SECTOR_SIZE = 16
+
+# Сколько случайных клеток проверяется до перехода к перебору по индексу
+RANDOM_ATTEMPTS = 200
+
+
+def _diamond(radius):
+    """Смещения клеток на расстоянии не больше radius (по Манхэттену)."""
+    return [(dx, dy) for dy in range(-radius, radius + 1)
+            for dx in range(-(radius - abs(dy)), radius - abs(dy) + 1)]
+
+
+class FreeCellIndex:
+    """
+    Индекс клеток пола, разбитых на квадратные секторы.
+    
+    Секторы строятся лениво, при первом обращении (на карте из чанков это не
+    заставляет создавать весь мир), и сбрасываются при изменении карты (по
+    счетчику version). Занятость клеток сущностями индекс не хранит: она
+    проверяется по индексу занятости EntityStore, который всегда актуален.
+    """
+    
+    def __init__(self, game_map, sector_size=SECTOR_SIZE):
+        """
+        Инициализация индекса.
+        
+        Args:
+            game_map (TileGrid или ChunkedMap): Карта
+            sector_size (int): Размер стороны сектора в клетках
+        """
+        self.game_map = game_map
+        self.sector_size = sector_size
+        self.sectors = {}
+        self.map_version = getattr(game_map, 'version', 0)
+        
+    def sector_cells(self, sx, sy):
+        """
+        Клетки пола сектора.
+        
+        Args:
+            sx (int): X-координата сектора
+            sy (int): Y-координата сектора
+            
+        Returns:
+            list: Клетки (x, y) в порядке строк
+        """
+        version = getattr(self.game_map, 'version', 0)
+        if version != self.map_version:
+            self.sectors.clear()
+            self.map_version = version
+            
+        cells = self.sectors.get((sx, sy))
+        if cells is None:
+            size = self.sector_size
+            left = sx * size
+            top = sy * size
+            right = left + size
+            bottom = top + size
+            # Сектор на краю карты обрезается по ее границам
+            if self.game_map.width is not None:
+                right = min(right, self.game_map.width)
+            if self.game_map.height is not None:
+                bottom = min(bottom, self.game_map.height)
+            cells = []
+            if left < right and top < bottom:
+                floor = chr(TILE_FLOOR)
+                lines = self.game_map.region_lines(left, top, right - left, bottom - top)
+                for row, line in enumerate(lines, top):
+                    cells.extend((column, row) for column, tile in enumerate(line, left) if tile == floor)
+            self.sectors[(sx, sy)] = cells
+        return cells
+        
+    def sectors_in(self, x1, y1, x2, y2):
+        """Координаты секторов, пересекающих прямоугольник [x1, x2) x [y1, y2)."""
+        size = self.sector_size
+        return [(sx, sy)
+                for sy in range(y1 // size, (y2 - 1) // size + 1)
+                for sx in range(x1 // size, (x2 - 1) // size + 1)]
+
+
+def find_free_cell(index, rng, region, is_free=None, attempts=RANDOM_ATTEMPTS):
+    """
+    Найти случайную клетку пола в прямоугольнике.
+    
+    Сначала проверяется не более attempts случайных клеток, затем (на картах, где
+    пола мало) секторы перебираются по индексу в случайном порядке. Время работы
+    ограничено, а если подходящей клетки нет, возбуждается исключение.
+    
+    Args:
+        index (FreeCellIndex): Индекс клеток пола
+        rng (random.Random): Источник случайных чисел
+        region (tuple): Прямоугольник (x1, y1, x2, y2), правая и нижняя границы не входят
+        is_free (callable): Дополнительная проверка клетки is_free(x, y)
+        attempts (int): Количество случайных попыток
+        
+    Returns:
+        tuple: Клетка (x, y)
+        
+    Raises:
+        ValueError: Если в прямоугольнике нет подходящей клетки
+    """
+    x1, y1, x2, y2 = region
+    game_map = index.game_map
+    for _ in range(attempts):
+        x = rng.randrange(x1, x2)
+        y = rng.randrange(y1, y2)
+        if game_map.is_floor(x, y) and (is_free is None or is_free(x, y)):
+            return x, y
+            
+    sectors = index.sectors_in(x1, y1, x2, y2)
+    rng.shuffle(sectors)
+    for sector in sectors:
+        cells = [(x, y) for x, y in index.sector_cells(*sector)
+                 if x1 <= x < x2 and y1 <= y < y2 and (is_free is None or is_free(x, y))]
+        if cells:
+            return rng.choice(cells)
+    raise ValueError(f"В области {region} нет свободных клеток")
+
+
+def poisson_disk_positions(index, count, rng, region, enemies, player,
+                           min_player_distance=6, min_distance=3, placed=None):
+    """
+    Расставить точки в прямоугольнике так, чтобы они не стояли слишком близко
+    к игроку, к существующим сущностям и друг к другу (по Манхэттену).
+    
+    Секторы обходятся по кругу в случайном порядке, и из каждого берется по одной
+    точке, поэтому точки распределяются по области равномерно. Каждая клетка
+    проверяется не больше одного раза: ограничения со временем только добавляются,
+    поэтому отвергнутая клетка подойти уже не может, а общее время линейно по
+    количеству клеток области.
+    
+    Args:
+        index (FreeCellIndex): Индекс клеток пола
+        count (int): Сколько точек нужно
+        rng (random.Random): Источник случайных чисел
+        region (tuple): Прямоугольник (x1, y1, x2, y2), правая и нижняя границы не входят
+        enemies (EntityStore): Уже размещенные сущности
+        player (Entity): Игрок (None - без ограничения расстояния до игрока)
+        min_player_distance (int): Минимальное расстояние до игрока
+        min_distance (int): Минимальное расстояние между сущностями
+        placed (set): Ключи cell_key клеток, закрытых точками из предыдущих вызовов;
+            дополняется новыми точками
+            
+    Returns:
+        list: Клетки (x, y); их может быть меньше count, если область заполнена
+    """
+    x1, y1, x2, y2 = region
+    if placed is None:
+        placed = set()
+    # Смещения ключей cell_key для окрестности точки (ключ линеен по координатам)
+    neighbourhood = [cell_key(dx, dy) for dx, dy in _diamond(min_distance - 1)]
+    
+    def acceptable(x, y):
+        if not (x1 <= x < x2 and y1 <= y < y2) or cell_key(x, y) in placed:
+            return False
+        if player is not None and abs(x - player.x) + abs(y - player.y) < min_player_distance:
+            return False
+        return not enemies or not enemies.within(x, y, min_distance - 1)
+        
+    sectors = index.sectors_in(x1, y1, x2, y2)
+    rng.shuffle(sectors)
+    candidates = {}  # Непроверенные клетки каждого сектора
+    positions = []
+    while len(positions) < count and sectors:
+        remaining = []
+        for sector in sectors:
+            cells = candidates.get(sector)
+            if cells is None:
+                cells = list(index.sector_cells(*sector))
+                candidates[sector] = cells
+            while cells:
+                # Случайная непроверенная клетка (перемешивание по мере надобности)
+                choice = rng.randrange(len(cells))
+                cells[choice], cells[-1] = cells[-1], cells[choice]
+                x, y = cells.pop()
+                if acceptable(x, y):
+                    positions.append((x, y))
+                    # Закрываем окрестность новой точки для следующих
+                    key = cell_key(x, y)
+                    placed.update([key + offset for offset in neighbourhood])
+                    break
+            if cells:
+                remaining.append(sector)
+            if len(positions) == count:
+                break
+        sectors = remaining
+    return positions
@@ -0,0 +1,179 @@
+"""
+Модуль компактного хранения игровой карты.
+"""
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него доступен только memoryview
+    np = None
+
+
+# Коды клеток совпадают с символами отображения, поэтому строку карты можно вывести без преобразований
+TILE_FLOOR = ord(' ')
+TILE_WALL = ord('#')
+
+# Сколько байтов memoryview копируется за раз при поиске (копировать всю карту дорого)
+SEARCH_CHUNK = 1 << 16
+
+
+class TileGrid:
+    """
+    Прямоугольная карта клеток в одном плоском bytearray (по байту на клетку, построчно).
+    """
+    
+    def __init__(self, width, height, fill=TILE_WALL, cells=None):
+        """
+        Инициализация карты.
+        
+        Args:
+            width (int): Ширина карты
+            height (int): Высота карты
+            fill (int): Код клетки, которым заполняется новая карта
+            cells (bytearray): Готовый изменяемый буфер клеток длиной width * height
+                (bytearray или memoryview, используется без копирования)
+        """
+        if cells is None:
+            cells = bytearray([fill]) * (width * height)
+        elif len(cells) != width * height:
+            raise ValueError(f"Размер буфера {len(cells)} не совпадает с картой {width}x{height}")
+        self.width = width
+        self.height = height
+        self.cells = cells
+        self.version = 0  # Увеличивается при каждом изменении через set()
+        
+    @classmethod
+    def from_lines(cls, lines):
+        """
+        Создать карту из списка строк или списка списков символов.
+        
+        Args:
+            lines (list): Строки карты одинаковой длины
+            
+        Returns:
+            TileGrid: Новая карта
+        """
+        cells = bytearray()
+        for line in lines:
+            cells.extend(''.join(line).encode('ascii'))
+        return cls(len(lines[0]), len(lines), cells=cells)
+        
+    def in_bounds(self, x, y):
+        """Проверить, находится ли клетка в пределах карты."""
+        return 0 <= x < self.width and 0 <= y < self.height
+        
+    def get(self, x, y):
+        """Получить код клетки."""
+        return self.cells[y * self.width + x]
+        
+    def set(self, x, y, tile):
+        """Установить код клетки."""
+        self.cells[y * self.width + x] = tile
+        self.version += 1
+        
+    def is_wall(self, x, y):
+        """Проверить, является ли клетка стеной."""
+        return self.cells[y * self.width + x] == TILE_WALL
+        
+    def is_floor(self, x, y):
+        """Проверить, является ли клетка пустым пространством."""
+        return self.cells[y * self.width + x] == TILE_FLOOR
+        
+    def _chunks(self, start=0):
+        """
+        Участки буфера клеток с методами поиска и их начальные индексы.
+        
+        bytearray отдается целиком; memoryview (например, над mmap) методов поиска
+        не имеет, поэтому копируется участками по SEARCH_CHUNK байтов, а не весь сразу.
+        """
+        cells = self.cells
+        if not isinstance(cells, memoryview):
+            yield 0, cells
+            return
+        for offset in range(start, len(cells), SEARCH_CHUNK):
+            yield offset, cells[offset:offset + SEARCH_CHUNK].tobytes()
+            
+    def count(self, tile):
+        """Подсчитать клетки с указанным кодом."""
+        needle = bytes([tile])
+        return sum(chunk.count(needle) for _, chunk in self._chunks())
+        
+    def find(self, tile, start=0):
+        """
+        Найти первую клетку с указанным кодом.
+        
+        Args:
+            tile (int): Код клетки
+            start (int): Плоский индекс, с которого начинается поиск
+            
+        Returns:
+            int: Плоский индекс клетки (y * width + x) или -1, если клетка не найдена
+        """
+        needle = bytes([tile])
+        for offset, chunk in self._chunks(start):
+            index = chunk.find(needle, max(0, start - offset))
+            if index != -1:
+                return offset + index
+        return -1
+        
+    def row(self, y):
+        """
+        Получить строку карты без копирования.
+        
+        Args:
+            y (int): Номер строки
+            
+        Returns:
+            memoryview: Представление байтов строки
+        """
+        start = y * self.width
+        return self.view()[start:start + self.width]
+        
+    def view(self):
+        """Экспорт всех клеток как memoryview без копирования."""
+        return memoryview(self.cells)
+        
+    def as_array(self):
+        """
+        Представить карту как массив NumPy формы (height, width) без копирования.
+        
+        Returns:
+            numpy.ndarray: Массив uint8, разделяющий память с картой
+        """
+        if np is None:
+            raise RuntimeError("Для as_array() требуется NumPy")
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+        
+    def region_lines(self, x, y, width, height):
+        """
+        Получить прямоугольную область карты как список строк.
+        
+        Args:
+            x (int): X-координата левого верхнего угла
+            y (int): Y-координата левого верхнего угла
+            width (int): Ширина области
+            height (int): Высота области
+            
+        Returns:
+            list: Строки области
+        """
+        cells = self.cells
+        lines = []
+        for row_y in range(y, y + height):
+            start = row_y * self.width + x
+            lines.append(bytes(cells[start:start + width]).decode('ascii'))
+        return lines
+        
+    def to_lines(self):
+        """Получить карту как список строк для отображения."""
+        return [bytes(self.row(y)).decode('ascii') for y in range(self.height)]
+        
+    def copy(self):
+        """Создать независимую копию карты."""
+        return TileGrid(self.width, self.height, cells=bytearray(self.cells))
+        
+    def __eq__(self, other):
+        if not isinstance(other, TileGrid):
+            return NotImplemented
+        return self.width == other.width and self.height == other.height and self.cells == other.cells
+        
+    def __str__(self):
+        return '\n'.join(self.to_lines())
@@ -0,0 +1,263 @@
+"""
+Модуль автоматического перемещения: путь до клетки и исследование карты.
+
+Путь до цели ищется алгоритмом A* (манхэттенская эвристика), путь к ближайшей
+неисследованной клетке - поиском в ширину (карта расстояний от игрока, поиск
+останавливается на первой неисследованной клетке). Ходы маршрута выполняются
+подряд без отрисовки и прекращаются, как только игрок видит врага, начинается
+бой или что-то мешает пройти.
+"""
+import heapq
+from collections import deque
+
+from engine import MOVES
+from entity_store import cell_key
+from event_log import EV_ATTACK
+
+# Наибольшее количество клеток, которые просматривает один поиск пути
+MAX_SEARCH_NODES = 200000
+
+# Наибольшее количество ходов одной команды перемещения
+MAX_AUTO_TURNS = 1000
+
+# Причины остановки
+STOP_ARRIVED = 'arrived'  # Игрок дошел до цели
+STOP_EXPLORED = 'explored'  # Неисследованных достижимых клеток не осталось
+STOP_NO_PATH = 'no_path'  # До цели нет пути
+STOP_ENEMY = 'enemy'  # Игрок видит врага
+STOP_COMBAT = 'combat'  # Начался бой
+STOP_BLOCKED = 'blocked'  # Ход не сдвинул игрока
+STOP_INTERRUPTED = 'interrupted'  # Игрок нажал клавишу
+STOP_LIMIT = 'limit'  # Сделано MAX_AUTO_TURNS ходов
+STOP_GAME_OVER = 'game_over'  # Партия закончилась
+
+
+def _trace_actions(came_from, key):
+    """Восстановить действия пути по ссылкам на предыдущие клетки (до клетки key)."""
+    actions = []
+    step = came_from[key]
+    while step is not None:
+        key, action = step
+        actions.append(action)
+        step = came_from[key]
+    actions.reverse()
+    return actions
+
+
+def find_path(game_map, start, goal, max_nodes=MAX_SEARCH_NODES):
+    """
+    Кратчайший путь по полу алгоритмом A*.
+    
+    Args:
+        game_map (TileGrid или ChunkedMap): Карта
+        start (tuple): Начальная клетка (x, y)
+        goal (tuple): Целевая клетка (x, y)
+        max_nodes (int): Наибольшее количество раскрытых клеток
+        
+    Returns:
+        list: Действия движения ('w', 'a', 's', 'd') от start до goal; None, если
+            цель - стена, вне карты или недостижима в пределах max_nodes клеток
+    """
+    goal_x, goal_y = goal
+    if not game_map.in_bounds(goal_x, goal_y) or game_map.is_wall(goal_x, goal_y):
+        return None
+    start_x, start_y = start
+    start_key = cell_key(start_x, start_y)
+    goal_key = cell_key(goal_x, goal_y)
+    came_from = {start_key: None}  # Ключ клетки -> (ключ предыдущей клетки, действие)
+    cost = {start_key: 0}
+    # При равной оценке первой раскрывается клетка, дальше ушедшая от начала (ближе к цели)
+    heap = [(abs(goal_x - start_x) + abs(goal_y - start_y), 0, start_x, start_y)]
+    expanded = 0
+    while heap:
+        _, negative_cost, x, y = heapq.heappop(heap)
+        key = cell_key(x, y)
+        if key == goal_key:
+            return _trace_actions(came_from, key)
+        if -negative_cost > cost[key]:
+            continue  # Клетка уже раскрыта с меньшей стоимостью
+        step_cost = 1 - negative_cost
+        expanded += 1
+        if expanded > max_nodes:
+            return None
+        for action, (dx, dy) in MOVES.items():
+            next_x, next_y = x + dx, y + dy
+            next_key = cell_key(next_x, next_y)
+            if step_cost >= cost.get(next_key, step_cost + 1):
+                continue
+            if not game_map.in_bounds(next_x, next_y) or game_map.is_wall(next_x, next_y):
+                continue
+            cost[next_key] = step_cost
+            came_from[next_key] = (key, action)
+            estimate = step_cost + abs(goal_x - next_x) + abs(goal_y - next_y)
+            heapq.heappush(heap, (estimate, -step_cost, next_x, next_y))
+    return None
+
+
+def path_to_unexplored(game_map, start, explored, map_width, max_nodes=MAX_SEARCH_NODES):
+    """
+    Путь к ближайшей неисследованной клетке пола (поиск в ширину от игрока).
+    
+    Поиск останавливается на первой же неисследованной клетке, поэтому весь путь,
+    кроме последнего шага, проходит по исследованным клеткам.
+    
+    Args:
+        game_map (TileGrid или ChunkedMap): Карта
+        start (tuple): Клетка игрока (x, y)
+        explored (bytearray): Исследованные клетки (по байту на клетку карты)
+        map_width (int): Ширина карты
+        max_nodes (int): Наибольшее количество просмотренных клеток
+        
+    Returns:
+        list: Действия движения; None, если достижимые клетки в пределах max_nodes исследованы
+    """
+    start_x, start_y = start
+    start_key = cell_key(start_x, start_y)
+    came_from = {start_key: None}
+    queue = deque([(start_x, start_y, start_key)])
+    while queue and len(came_from) <= max_nodes:
+        x, y, key = queue.popleft()
+        if key != start_key and not explored[y * map_width + x]:
+            return _trace_actions(came_from, key)
+        for action, (dx, dy) in MOVES.items():
+            next_x, next_y = x + dx, y + dy
+            next_key = cell_key(next_x, next_y)
+            if next_key in came_from:
+                continue
+            if not game_map.in_bounds(next_x, next_y) or game_map.is_wall(next_x, next_y):
+                continue
+            came_from[next_key] = (key, action)
+            queue.append((next_x, next_y, next_key))
+    return None
+
+
+def mark_explored(engine, explored):
+    """
+    Отметить клетки, видимые игроку, как исследованные (для игры без интерфейса).
+    
+    Args:
+        engine (GameEngine): Движок
+        explored (bytearray): Исследованные клетки (по байту на клетку карты)
+    """
+    fov = engine.fov
+    fov.update(engine.player.x, engine.player.y)
+    for x, y in fov.visible_cells():
+        if 0 <= x < engine.map_width and 0 <= y < engine.map_height:
+            explored[y * engine.map_width + x] = 1
+
+
+def _new_enemy_in_view(engine, known):
+    """Видит ли игрок врага, которого нет среди известных (номера в known)."""
+    return any(enemy.id not in known for enemy in engine.visible_enemies())
+
+
+def run_turns(engine, plan, step, max_turns=MAX_AUTO_TURNS, interrupted=None, known_enemies=False):
+    """
+    Выполнять ходы, которые предлагает plan, пока не сработает условие остановки.
+    
+    После каждого хода проверяются конец партии, бой (атака в событиях хода),
+    упор (игрок не сдвинулся) и появление врага в поле зрения.
+    
+    Args:
+        engine (GameEngine): Движок
+        plan (callable): plan() -> (действие, None) или (None, причина остановки)
+        step (callable): step(действие) -> события хода; выполняет ход (и, например,
+            записывает его и обновляет исследованные клетки)
+        max_turns (int): Наибольшее количество ходов
+        interrupted (callable): interrupted() -> bool, прервать ли перемещение (None - не проверять)
+        known_enemies (bool): Не останавливаться из-за врагов, которых игрок видел до
+            начала (иначе при видимом враге ходы не начинаются)
+            
+    Returns:
+        tuple: (причина остановки STOP_*, количество сделанных ходов)
+    """
+    if not engine.running:
+        return STOP_GAME_OVER, 0
+    visible = engine.visible_enemies()
+    if visible and not known_enemies:
+        return STOP_ENEMY, 0
+    known = {enemy.id for enemy in visible}
+    player = engine.player
+    for turns in range(1, max_turns + 1):
+        action, reason = plan()
+        if action is None:
+            return reason, turns - 1
+        position = (player.x, player.y)
+        events = step(action)
+        if not engine.running:
+            return STOP_GAME_OVER, turns
+        if any(code == EV_ATTACK for code, _ in events):
+            return STOP_COMBAT, turns
+        if (player.x, player.y) == position:
+            return STOP_BLOCKED, turns
+        if _new_enemy_in_view(engine, known):
+            return STOP_ENEMY, turns
+        if interrupted is not None and interrupted():
+            return STOP_INTERRUPTED, turns
+    return STOP_LIMIT, max_turns
+
+
+def travel(engine, goal, step, max_turns=MAX_AUTO_TURNS, interrupted=None):
+    """
+    Дойти до клетки по кратчайшему пути.
+    
+    Путь ищется один раз; если его перекрыл враг, ход в него становится атакой
+    и перемещение останавливается как бой. Цель выбрана игроком, поэтому враги,
+    которых он уже видит, перемещению не мешают - останавливает только новый враг.
+    
+    Args:
+        engine (GameEngine): Движок
+        goal (tuple): Целевая клетка (x, y)
+        step (callable): step(действие) -> события хода
+        max_turns (int): Наибольшее количество ходов
+        interrupted (callable): interrupted() -> bool (None - не проверять)
+        
+    Returns:
+        tuple: (причина остановки STOP_*, количество сделанных ходов)
+    """
+    player = engine.player
+    if (player.x, player.y) == tuple(goal):
+        return STOP_ARRIVED, 0
+    path = find_path(engine.current_map, (player.x, player.y), goal)
+    if path is None:
+        return STOP_NO_PATH, 0
+    actions = iter(path)
+    
+    def plan():
+        return next(actions, None), STOP_ARRIVED
+        
+    return run_turns(engine, plan, step, max_turns, interrupted, known_enemies=True)
+
+
+def explore(engine, explored, step, max_turns=MAX_AUTO_TURNS, interrupted=None):
+    """
+    Идти к ближайшим неисследованным клеткам, пока они достижимы.
+    
+    Найденный путь проходится до конца и только затем ищется следующий: цель
+    обычно открывается полем зрения за несколько шагов до нее, но путь к ней все
+    равно ведет к краю исследованной области, а поиск на каждом ходу стоил бы
+    дороже самого хода. Поиск локальный (обычно до клетки на краю поля зрения),
+    поэтому не зависит от размера карты. При видимом враге исследование не начинается.
+    
+    Args:
+        engine (GameEngine): Движок
+        explored (bytearray): Исследованные клетки; step должен отмечать в нем увиденное
+        step (callable): step(действие) -> события хода
+        max_turns (int): Наибольшее количество ходов
+        interrupted (callable): interrupted() -> bool (None - не проверять)
+        
+    Returns:
+        tuple: (причина остановки STOP_*, количество сделанных ходов)
+    """
+    player = engine.player
+    path = deque()
+    
+    def plan():
+        if not path:
+            found = path_to_unexplored(engine.current_map, (player.x, player.y), explored, engine.map_width)
+            if not found:
+                return None, STOP_EXPLORED
+            path.extend(found)
+        return path.popleft(), None
+        
+    return run_turns(engine, plan, step, max_turns, interrupted)
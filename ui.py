@@ -1,17 +1,47 @@
 """
 Модуль пользовательского интерфейса для обработки интерфейса и ввода.
 """
+import contextlib
 import sys
 import os
 
+from renderer import CLEAR_SCREEN
+from keyboard import RawKeyboard, parse_keys
+
+
+def parse_target(words):
+    """
+    Разобрать координаты клетки.
+    
+    Args:
+        words (list): Слова ввода
+        
+    Returns:
+        tuple: (x, y) или None, если слов не два или это не целые числа
+    """
+    if len(words) != 2:
+        return None
+    try:
+        return int(words[0]), int(words[1])
+    except ValueError:
+        return None
+
 
 class UI:
     """Класс для обработки пользовательского интерфейса и ввода."""
     
-    def __init__(self):
-        """Инициализация UI."""
+    def __init__(self, raw_input=True):
+        """
+        Инициализация UI.
+        
+        Args:
+            raw_input (bool): Читать нажатия в игре посимвольно, если ввод из терминала
+                (False - всегда построчно через input())
+        """
         self.debug_mode = False
-    
+        self.raw_input = raw_input
+        self.keyboard = None  # Посимвольный ввод, пока идет игровой цикл
+        
     def show_welcome_screen(self):
         """Отображение приветственного экрана."""
         self.clear_screen()
@@ -22,35 +52,45 @@ class UI:
         print("Исследуйте подземелье, побеждайте врагов и постарайтесь выжить!\n")
         print("\nУправление:")
         print("  WASD или стрелки: Перемещение")
+        print("  X: Исследовать подземелье, пока не появится враг")
+        print("  T: Идти в клетку с заданными координатами (построчно: 'go X Y')")
         print("  Q: Выход из игры")
         print("  Введите 'debug' в любой момент: Переключение режима отладки")
+        print("  Введите 'map' в любой момент: Показать или скрыть мини-карту")
+        print("  В терминале клавиши действуют сразу, без Enter: ` - режим отладки, M - мини-карта")
+        print("  Автоматическое перемещение прерывается любой клавишей")
         print("  Введите 'more' во время выбора типа карты: Больше врагов")
         print("=" * 60)
         input("\nНажмите Enter для продолжения...")
         
     def clear_screen(self):
-        """Очистка экрана консоли."""
-        os.system('cls' if os.name == 'nt' else 'clear')
-        
+        """Очистка экрана консоли (ANSI-последовательностью, без запуска внешней команды)."""
+        if os.name == 'nt':
+            os.system('cls')
+        elif sys.stdout.isatty():
+            sys.stdout.write(CLEAR_SCREEN)
+            sys.stdout.flush()
+            
     def get_map_choice(self):
         """
         Получение выбора типа карты игроком.
         
         Returns:
-            str: '1' для стандартной карты, '2' для случайной карты
+            str: '1' для стандартной карты, '2' для случайной карты, '3' для большого мира
         """
         while True:
             print("\nВыберите тип карты:")
             print("1. Стандартная карта")
             print("2. Случайная карта с настраиваемым размером")
+            print("3. Большой мир, создаваемый по мере исследования")
             print("Введите 'more' для режима с увеличенным количеством врагов")
             
-            choice = input("Введите ваш выбор (1, 2 или more): ").strip()
+            choice = input("Введите ваш выбор (1, 2, 3 или more): ").strip()
             
-            if choice in ('1', '2', 'more'):
+            if choice in ('1', '2', '3', 'more'):
                 return choice
             else:
-                print("Неверный выбор. Пожалуйста, введите 1, 2 или more.")
+                print("Неверный выбор. Пожалуйста, введите 1, 2, 3 или more.")
                 
     def get_map_size(self, dimension):
         """
@@ -113,22 +153,85 @@ class UI:
             else:
                 print("Неверный выбор. Пожалуйста, введите 1, 2 или 3.")
                 
-    def get_player_action(self):
+    @contextlib.contextmanager
+    def game_input(self):
+        """
+        Контекст игрового цикла: посимвольный ввод, если он доступен, иначе построчный.
+        
+        Меню и вопросы перед игрой читаются построчно, поэтому терминал переводится
+        в посимвольный режим только на время этого блока.
+        """
+        if not self.raw_input or not RawKeyboard.available(sys.stdin):
+            yield
+            return
+        with RawKeyboard(sys.stdin) as keyboard:
+            self.keyboard = keyboard
+            try:
+                yield
+            finally:
+                self.keyboard = None
+                
+    def get_player_actions(self):
         """
-        Получение следующего действия игрока.
+        Получение следующих действий игрока (ждет ввода).
+        
+        В посимвольном режиме возвращаются все уже нажатые клавиши; в построчном -
+        действия всех символов введенной строки ("wwdd" - четыре хода), команда
+        'debug'/'map'/'explore' или перемещение в клетку "go X Y" - ('travel', X, Y).
         
         Returns:
-            str: Действие игрока
+            list: Действия игрока по порядку (может быть пустым)
+        """
+        if self.keyboard is not None:
+            return self.keyboard.read_actions()
+            
+        line = input("Введите действие (w/a/s/d/q/explore/go X Y/debug/map): ").strip().lower()
+        
+        # Проверка на команды отладки, мини-карты и автоматического перемещения
+        if line in ('debug', 'map', 'explore'):
+            return [line]
+        words = line.split()
+        if words and words[0] == 'go':
+            target = parse_target(words[1:])
+            return [('travel',) + target] if target is not None else []
+        actions, _ = parse_keys(line)
+        return actions
+        
+    def get_travel_target(self):
         """
-        # Упрощенная версия, работающая в любой системе
-        action = input("Введите действие (w/a/s/d/q/debug): ").lower()
+        Спросить клетку, в которую идти (в посимвольном режиме терминал на время
+        ввода переводится в построчный).
         
-        # Проверка на команду отладки
-        if action.lower() == 'debug':
-            return 'debug'
+        Returns:
+            tuple: (x, y) или None, если введены не два целых числа
+        """
+        with self.keyboard.line_input() if self.keyboard is not None else contextlib.nullcontext():
+            text = input("Куда идти (X Y): ")
+        return parse_target(text.replace(',', ' ').split())
+        
+    def key_pressed(self):
+        """
+        Нажал ли игрок клавишу с прошлого чтения (нажатие отбрасывается).
+        
+        Returns:
+            bool: Было ли нажатие (в построчном режиме всегда False)
+        """
+        return self.keyboard is not None and self.keyboard.key_pressed()
+        
+    def poll_player_actions(self):
+        """
+        Действия клавиш, нажатых с прошлого чтения, без ожидания.
+        
+        Returns:
+            list: Действия (в построчном режиме всегда пусто)
+        """
+        if self.keyboard is not None:
+            return self.keyboard.read_actions(block=False)
+        return []
         
-        # Принимаем только первый символ введенной строки
-        if action and action[0] in ['w', 'a', 's', 'd', 'q']:
-            return action[0]
+    def wait_for_key(self):
+        """Дождаться нажатия любой клавиши (в построчном режиме - Enter)."""
+        if self.keyboard is not None:
+            self.keyboard.wait_key()
         else:
-            return ' '  # Пробел означает "нет действия"
+            input()
@@ -0,0 +1,172 @@
+"""
+Модуль окна просмотра карты.
+
+Viewport - прямоугольное окно карты размером с терминал, которое следует за
+игроком: окно сдвигается, только когда игрок подходит к его краю ближе
+отступа, поэтому при обычном перемещении статический слой карты не
+перестраивается. Minimap - уменьшенная карта всего уровня, которая строится
+один раз и обновляется по мере исследования клеток.
+"""
+from tiles import TILE_FLOOR
+
+# Наименьшая ширина окна (если терминал уже) и высота, которую окну стараются оставить,
+# сокращая блок под картой
+MIN_VIEW_WIDTH = 20
+MIN_VIEW_HEIGHT = 10
+
+# Доля размера окна, на которую игрок может подойти к краю до сдвига окна
+SCROLL_MARGIN = 0.25
+
+# Наибольший размер мини-карты в символах
+MINIMAP_WIDTH = 32
+MINIMAP_HEIGHT = 12
+
+
+class Viewport:
+    """Окно карты, следующее за игроком."""
+    
+    def __init__(self, margin=SCROLL_MARGIN):
+        """
+        Инициализация.
+        
+        Args:
+            margin (float): Доля ширины и высоты окна, на которую игрок может подойти к краю
+        """
+        self.margin = margin
+        self.left = 0
+        self.top = 0
+        self.width = 0
+        self.height = 0
+        self.map_width = 0
+        self.map_height = 0
+        
+    def resize(self, width, height, map_width, map_height):
+        """
+        Задать размер окна (не больше карты) и размер карты.
+        
+        Args:
+            width (int): Желаемая ширина окна
+            height (int): Желаемая высота окна
+            map_width (int): Ширина карты
+            map_height (int): Высота карты
+        """
+        self.width = max(1, min(width, map_width))
+        self.height = max(1, min(height, map_height))
+        self.map_width = map_width
+        self.map_height = map_height
+        self._clamp()
+        
+    def follow(self, x, y):
+        """
+        Сдвинуть окно так, чтобы клетка была не ближе отступа к его краю.
+        
+        Если клетка вышла за отступ, окно центрируется на ней.
+        
+        Args:
+            x (int): X-координата игрока
+            y (int): Y-координата игрока
+            
+        Returns:
+            bool: Сдвинулось ли окно
+        """
+        margin_x = int(self.width * self.margin)
+        margin_y = int(self.height * self.margin)
+        left, top = self.left, self.top
+        if not left + margin_x <= x < left + self.width - margin_x:
+            self.left = x - self.width // 2
+        if not top + margin_y <= y < top + self.height - margin_y:
+            self.top = y - self.height // 2
+        self._clamp()
+        return (self.left, self.top) != (left, top)
+        
+    def _clamp(self):
+        """Не выпускать окно за пределы карты."""
+        self.left = max(0, min(self.left, self.map_width - self.width))
+        self.top = max(0, min(self.top, self.map_height - self.height))
+        
+    @property
+    def right(self):
+        return self.left + self.width
+        
+    @property
+    def bottom(self):
+        return self.top + self.height
+
+
+class Minimap:
+    """
+    Уменьшенная карта уровня: каждый символ - блок клеток.
+    
+    Для блока хранится, сколько в нем исследованных клеток и сколько из них пол;
+    исследование клетки меняет только счетчики ее блока.
+    """
+    
+    def __init__(self, map_width, map_height, width=MINIMAP_WIDTH, height=MINIMAP_HEIGHT):
+        """
+        Инициализация пустой мини-карты.
+        
+        Args:
+            map_width (int): Ширина карты
+            map_height (int): Высота карты
+            width (int): Наибольшая ширина мини-карты в символах
+            height (int): Наибольшая высота мини-карты в символах
+        """
+        self.map_width = map_width
+        self.map_height = map_height
+        self.block_width = -(-map_width // width)
+        self.block_height = -(-map_height // height)
+        self.width = -(-map_width // self.block_width)
+        self.height = -(-map_height // self.block_height)
+        self.explored = [0] * (self.width * self.height)
+        self.floor = [0] * (self.width * self.height)
+        self.source = None  # Карта, по которой построены счетчики
+        self.map_version = None  # Версия карты, по которой построены счетчики
+        
+    def build(self, game_map, explored):
+        """
+        Пересчитать счетчики всех блоков по карте и исследованным клеткам.
+        
+        Args:
+            game_map (TileGrid или ChunkedMap): Карта
+            explored (bytearray): Исследованные клетки (по байту на клетку карты)
+        """
+        self.explored = [0] * (self.width * self.height)
+        self.floor = [0] * (self.width * self.height)
+        map_width = self.map_width
+        index = explored.find(1)
+        while index != -1:
+            x, y = index % map_width, index // map_width
+            self.add(x, y, game_map.get(x, y))
+            index = explored.find(1, index + 1)
+        self.source = game_map
+        self.map_version = game_map.version
+        
+    def add(self, x, y, tile):
+        """
+        Учесть новую исследованную клетку.
+        
+        Args:
+            x (int): X-координата
+            y (int): Y-координата
+            tile (int): Код клетки
+        """
+        block = (y // self.block_height) * self.width + x // self.block_width
+        self.explored[block] += 1
+        if tile == TILE_FLOOR:
+            self.floor[block] += 1
+            
+    def lines(self, player_x, player_y):
+        """
+        Строки мини-карты: ' ' - не исследовано, '.' - больше пола, '#' - больше стен, '@' - игрок.
+        
+        Args:
+            player_x (int): X-координата игрока
+            player_y (int): Y-координата игрока
+            
+        Returns:
+            list: Строки
+        """
+        chars = [' ' if not explored else '.' if 2 * floor >= explored else '#'
+                 for explored, floor in zip(self.explored, self.floor)]
+        chars[(player_y // self.block_height) * self.width + player_x // self.block_width] = '@'
+        return [''.join(chars[row * self.width:(row + 1) * self.width]) for row in range(self.height)]